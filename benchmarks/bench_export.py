@@ -0,0 +1,112 @@
+# benchmarks/bench_export.py
+"""
+Export benchmark: NDJSON → CSV vs NDJSON → Parquet.
+
+Generates a synthetic NDJSON file (posts spread over several months), then
+runs each exporter in a fresh child process and reports wall time, output
+size on disk, peak RSS and – for a rough "analyst" view – how long it takes
+to load the comments back.
+
+    python benchmarks/bench_export.py --posts 2000 --comments 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bench_serialize import synthetic_tree  # noqa: E402
+
+from reddit_scraper.core import jsonio  # noqa: E402
+
+MONTH = 30 * 86_400
+
+
+def make_input(path: Path, posts: int, comments: int) -> None:
+    with path.open("wb") as fp:
+        for i in range(posts):
+            raw = synthetic_tree(max(0, comments + (i % 7 - 3) * comments // 4), i)
+            created = 1_700_000_000 + i * (6 * MONTH // max(1, posts))
+            fp.write(jsonio.dumps({**raw["submission"], "created_utc": created,
+                                   "comments": raw["comments"]}) + b"\n")
+
+
+def du(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def child(kind: str, src: Path, out: Path) -> None:
+    """Runs in a fresh process so peak RSS belongs to one exporter."""
+    t0 = time.perf_counter()
+    if kind.startswith("csv"):
+        from reddit_scraper.services.csv_export import ndjson_to_csv
+
+        ndjson_to_csv(src, out / "subs.csv", out / "comments.csv",
+                      workers=1 if kind == "csv-1" else None)
+        written = time.perf_counter() - t0
+        rss = max(resource.getrusage(who).ru_maxrss  # pool workers count too
+                  for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+        import csv
+
+        t1 = time.perf_counter()
+        with open(out / "comments.csv", newline="", encoding="utf-8") as fp:
+            list(csv.reader(fp))
+    else:
+        from reddit_scraper.services.parquet_export import ndjson_to_parquet
+
+        ndjson_to_parquet(src, out / "subs", out / "comments",
+                          partition_by_month=kind == "parquet-month")
+        written = time.perf_counter() - t0
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        import pyarrow.parquet as pq
+
+        t1 = time.perf_counter()
+        pq.read_table(out / "comments")
+    load = time.perf_counter() - t1
+    print(json.dumps({"write_s": written, "load_s": load, "rss_kib": rss}))
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="CSV vs Parquet export benchmark")
+    p.add_argument("--posts", type=int, default=2000)
+    p.add_argument("--comments", type=int, default=300, help="mean comments per post")
+    p.add_argument("--kinds", default="csv,csv-1,parquet,parquet-month",
+                   help="csv = all cores, csv-1 = single process")
+    p.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = p.parse_args()
+    if args.child:
+        kind, src, out = args.child
+        return child(kind, Path(src), Path(out))
+
+    with tempfile.TemporaryDirectory(prefix="bench-export-") as tmp:
+        src = Path(tmp, "in.ndjson")
+        make_input(src, args.posts, args.comments)
+        print(f"input: {args.posts} posts, {du(src) / 1e6:.1f} MB NDJSON")
+        print(f"{'export':<15}{'write s':>9}{'MB on disk':>12}{'export RSS MiB':>16}{'load s':>9}")
+        for kind in args.kinds.split(","):
+            out = Path(tmp, kind)
+            out.mkdir()
+            res = subprocess.run(
+                [sys.executable, __file__, "--child", kind, str(src), str(out)],
+                capture_output=True, text=True,
+            )
+            if res.returncode:
+                print(f"{kind:<15} failed: {res.stderr.strip().splitlines()[-1]}")
+                continue
+            r = json.loads(res.stdout.strip().splitlines()[-1])
+            print(f"{kind:<15}{r['write_s']:>9.2f}{du(out) / 1e6:>12.1f}"
+                  f"{r['rss_kib'] / 1024:>16.0f}{r['load_s']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
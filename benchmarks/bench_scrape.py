@@ -0,0 +1,178 @@
+# benchmarks/bench_scrape.py
+"""
+End-to-end scrape benchmark against the local fake Reddit server.
+
+Starts ``fake_reddit`` in-process, runs the real CLI (``python -m
+reddit_scraper.cli``) as a subprocess pointed at it, and reports:
+
+* posts/s and requests/s (wall clock of the CLI process)
+* p50 / p99 per-post latency (first → last request the server saw per post)
+* peak RSS of the CLI process
+* throttled (429) responses
+
+Each run is appended as one JSON line to ``--results`` together with the git
+SHA and all parameters; ``--baseline`` compares against the latest earlier
+result with identical parameters.
+
+    python benchmarks/bench_scrape.py --posts 300 --shape stubs --workers 8
+    python benchmarks/bench_scrape.py --posts 300 --shape stubs --workers 8 --baseline
+
+``--processes N`` runs N cooperating worker processes with one fake app
+credential each; the fake server counts ``--budget`` per app, so with a small
+budget this shows how throughput scales with the credential pool:
+
+    python benchmarks/bench_scrape.py --posts 100 --budget 300 --processes 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from fake_reddit import add_data_args, build_server  # noqa: E402
+
+ROOT = Path(__file__).parent.parent
+RESULTS = Path(__file__).parent / "results.jsonl"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def git_sha() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+            text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_cli(cmd: List[str], env: Dict[str, str]) -> tuple[int, float, int]:
+    """Run ``cmd``; return (exit code, wall seconds, peak RSS in KiB)."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env)
+    _, status, rusage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - t0
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return proc.returncode, wall, rusage.ru_maxrss  # ru_maxrss is KiB on Linux
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    add_data_args(p)
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--enumerate", choices=("listing", "search"), default="listing")
+    p.add_argument("--processes", type=int, default=1,
+                   help="worker processes, each with its own credential set")
+    p.add_argument("--repeat", type=int, default=1)
+    p.add_argument("--results", type=Path, default=RESULTS)
+    p.add_argument("--baseline", action="store_true",
+                   help="compare with the latest stored run using the same parameters")
+    p.add_argument("cli_args", nargs=argparse.REMAINDER,
+                   help="extra CLI flags after '--', e.g. -- --max-expansions 5")
+    args = p.parse_args()
+    extra = [a for a in args.cli_args if a != "--"]
+
+    params = {
+        k: v for k, v in vars(args).items()
+        if k not in ("results", "baseline", "repeat", "cli_args")
+    }
+    params["cli_args"] = extra
+
+    for _ in range(max(1, args.repeat)):
+        result = bench_once(args, extra)
+        record = {"ts": int(time.time()), "git": git_sha(), "params": params, **result}
+        print(json.dumps(result, indent=2))
+        if args.baseline:
+            compare(args.results, params, result)
+        with args.results.open("a", encoding="utf-8") as fp:
+            fp.write(json.dumps(record) + "\n")
+
+
+def bench_once(args: argparse.Namespace, extra: List[str]) -> Dict:
+    server = build_server(args).start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-scrape-") as out:
+            env = {
+                **os.environ,
+                "REDDIT_OAUTH_URL": server.url,
+                "REDDIT_URL": server.url,
+                "REDDIT_SCRAPER_OUTPUTS": out,
+                "REDDIT_CLIENT_ID": "bench",
+                "REDDIT_CLIENT_SECRET": "bench",
+                "REDDIT_USER_AGENT": "reddit-scraper-bench",
+            }
+            cmd = [
+                sys.executable, "-m", "reddit_scraper.cli", "scrape",
+                args.subreddit, args.start, args.end,
+                "--workers", str(args.workers),
+                "--enumerate", args.enumerate,
+                "--log-level", "WARNING",
+                *extra,
+            ]
+            if args.processes > 1:
+                pool = Path(out, "credentials.json")
+                pool.write_text(json.dumps([
+                    {"client_id": f"bench{i}", "client_secret": "bench",
+                     "user_agent": "reddit-scraper-bench"}
+                    for i in range(args.processes)
+                ]))
+                cmd += ["--processes", str(args.processes), "--credentials", str(pool)]
+            code, wall, rss_kib = run_cli(cmd, env)
+            written = sum(
+                1 for f in Path(out, "data").glob("*.ndjson") for _ in f.open("rb")
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    stats = server.stats.snapshot()
+    latencies = list(stats["post_seconds"].values())
+    return {
+        "exit_code": code,
+        "wall_s": round(wall, 3),
+        "posts": written,
+        "posts_per_s": round(written / wall, 2) if wall else None,
+        "requests": stats["requests"],
+        "requests_per_s": round(stats["requests"] / wall, 2) if wall else None,
+        "p50_post_s": round(percentile(latencies, 50), 4),
+        "p99_post_s": round(percentile(latencies, 99), 4),
+        "throttled": stats["throttled"],
+        "peak_rss_mib": round(rss_kib / 1024, 1),
+        "by_route": stats["by_route"],
+    }
+
+
+def compare(path: Path, params: Dict, result: Dict) -> None:
+    baseline = None
+    if path.exists():
+        for line in path.read_text(encoding="utf-8").splitlines():
+            rec = json.loads(line)
+            if rec.get("params") == params:
+                baseline = rec
+    if baseline is None:
+        print("no baseline with identical parameters")
+        return
+    print(f"vs {baseline.get('git')} ({time.ctime(baseline['ts'])}):")
+    for key in ("wall_s", "posts_per_s", "requests", "p50_post_s", "p99_post_s", "peak_rss_mib"):
+        old, new = baseline.get(key), result.get(key)
+        if old:
+            print(f"  {key:<14} {old:>10} → {new:>10}  ({(new - old) / old:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/bench_serialize.py
+"""
+Microbenchmark: raw tree → NDJSON bytes.
+
+Compares the validated path (pydantic ``Submission`` per tree, ``Comment`` per
+node) with the fast ``RawSubmission`` path, with orjson and with the stdlib
+encoder. Reports throughput (trees/s, comments/s, MB/s) and peak traced
+allocation per tree.
+
+    python benchmarks/bench_serialize.py --comments 5000 --trees 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from reddit_scraper.core import jsonio  # noqa: E402
+from reddit_scraper.core.models import RawSubmission, Submission  # noqa: E402
+
+
+def synthetic_tree(n: int, seed: int) -> Dict:
+    """Raw tree in ``RedditClient.fetch_submission_tree`` shape, ``n`` comments."""
+    rng = random.Random(seed)
+    nodes: List[Dict] = []
+    top: List[Dict] = []
+    for i in range(n):
+        parent = nodes[rng.randrange(i)] if i and rng.random() < 0.7 else None
+        node = {
+            "id": f"c{seed}_{i}",
+            "parent_id": f"t1_{parent['id']}" if parent else f"t3_p{seed}",
+            "link_id": f"t3_p{seed}",
+            "author": None if i % 17 == 0 else f"user{i % 211}",
+            "body": "lorem ipsum dolor – ünïcode " * rng.randint(1, 30),
+            "created_utc": 1_750_000_000 + i,
+            "score": rng.randint(-5, 500),
+            "depth": parent["depth"] + 1 if parent else 0,
+            "replies": [],
+        }
+        (parent["replies"] if parent else top).append(node)
+        nodes.append(node)
+    return {
+        "submission": {
+            "id": f"p{seed}", "title": "Synthetic", "selftext": "body " * 100,
+            "created_utc": 1_750_000_000, "author": "op", "score": 42, "num_comments": n,
+            "link_flair_text": None, "url": "https://example.invalid/", "permalink": "/r/x/",
+            "fetched_at": 1_750_000_500, "complete": True,
+        },
+        "comments": top,
+    }
+
+
+def validated(raw: Dict) -> bytes:
+    return Submission.from_pushshift_reddit(raw).to_json_bytes()
+
+
+def fast(raw: Dict) -> bytes:
+    return RawSubmission(raw).to_json_bytes()
+
+
+def fast_stdlib(raw: Dict) -> bytes:
+    saved, jsonio.orjson = jsonio.orjson, None
+    try:
+        return RawSubmission(raw).to_json_bytes()
+    finally:
+        jsonio.orjson = saved
+
+
+def measure(fn: Callable[[Dict], bytes], trees: List[Dict], comments: int) -> Dict:
+    fn(trees[0])  # warm-up
+    t0 = time.perf_counter()
+    size = sum(len(fn(t)) for t in trees)
+    secs = time.perf_counter() - t0
+
+    tracemalloc.start()
+    fn(trees[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "trees/s": len(trees) / secs,
+        "comments/s": len(trees) * comments / secs,
+        "MB/s": size / secs / 1e6,
+        "peak KiB/tree": peak / 1024,
+    }
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Serialization microbenchmark")
+    p.add_argument("--comments", type=int, default=5000, help="comments per tree")
+    p.add_argument("--trees", type=int, default=20)
+    args = p.parse_args()
+    warnings.simplefilter("ignore", DeprecationWarning)  # pydantic v2 .dict()
+
+    trees = [synthetic_tree(args.comments, seed) for seed in range(args.trees)]
+    paths = {"validated (pydantic)": validated, "fast (stdlib json)": fast_stdlib}
+    if jsonio.HAS_ORJSON:
+        paths["fast (orjson)"] = fast
+    else:
+        print("orjson not installed – `pip install reddit-scraper[fast]` to compare it")
+
+    base = None
+    print(f"{args.trees} trees × {args.comments} comments")
+    print(
+        f"{'path':<22}{'trees/s':>10}{'comments/s':>14}{'MB/s':>9}"
+        f"{'peak KiB/tree':>16}{'speed-up':>10}"
+    )
+    for name, fn in paths.items():
+        r = measure(fn, trees, args.comments)
+        base = base or r["trees/s"]
+        print(
+            f"{name:<22}{r['trees/s']:>10.1f}{r['comments/s']:>14,.0f}{r['MB/s']:>9.1f}"
+            f"{r['peak KiB/tree']:>16,.0f}{r['trees/s'] / base:>9.1f}×"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_startup.py
+"""
+CLI startup budget.
+
+Runs a few cheap invocations in fresh interpreters and fails (exit 1) when
+one of them is over budget:
+
+* ``import reddit_scraper.cli`` must not pull in any heavy backend
+  (praw, tqdm, pyarrow, dotenv, requests, pydantic, …)
+* ``--help`` / ``export txt --help`` must not create the outputs directory
+* the median wall time of each command, minus a bare ``python -c pass``,
+  must stay under ``--budget-ms``
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 80 --runs 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY = (
+    "praw", "prawcore", "asyncpraw", "tqdm", "pyarrow", "pandas", "dotenv",
+    "requests", "httpx", "pydantic", "zstandard", "orjson", "sqlite3",
+)
+
+COMMANDS = {
+    "import": ["-c", "import reddit_scraper.cli"],
+    "help": ["-m", "reddit_scraper.cli", "--help"],
+    "export-help": ["-m", "reddit_scraper.cli", "export", "--help"],
+}
+
+
+def run(argv: List[str], env: Dict[str, str]) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, *argv], env=env, cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL)
+    return (time.perf_counter() - t0) * 1000
+
+
+def heavy_imports(env: Dict[str, str]) -> List[str]:
+    probe = (
+        "import sys, reddit_scraper.cli; "
+        f"print(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", probe], env=env, cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout
+    return out.split()
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--runs", type=int, default=9)
+    p.add_argument("--budget-ms", type=float, default=60.0,
+                   help="Allowed median overhead over a bare interpreter")
+    args = p.parse_args()
+
+    failures: List[str] = []
+    with tempfile.TemporaryDirectory(prefix="bench-startup-") as tmp:
+        outputs = Path(tmp, "outputs")
+        env = {**os.environ, "REDDIT_SCRAPER_OUTPUTS": str(outputs),
+               "PYTHONPATH": str(ROOT), "PYTHONDONTWRITEBYTECODE": "1"}
+
+        loaded = heavy_imports(env)
+        if loaded:
+            failures.append(f"importing the CLI loads {', '.join(loaded)}")
+
+        bare = statistics.median(run(["-c", "pass"], env) for _ in range(args.runs))
+        result = {"bare_ms": round(bare, 1)}
+        for name, argv in COMMANDS.items():
+            ms = statistics.median(run(argv, env) for _ in range(args.runs))
+            result[f"{name}_ms"] = round(ms, 1)
+            if ms - bare > args.budget_ms:
+                failures.append(f"{name}: {ms - bare:.1f} ms over bare python "
+                                f"(budget {args.budget_ms:g} ms)")
+        if outputs.exists():
+            failures.append("--help created the outputs directory")
+
+    print(json.dumps(result))
+    for f in failures:
+        print(f"FAIL {f}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
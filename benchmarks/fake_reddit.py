@@ -0,0 +1,487 @@
+# benchmarks/fake_reddit.py
+"""
+Local stand-in for the parts of the Reddit API the scraper uses.
+
+Serves a synthetic subreddit whose posts and comment trees are generated
+deterministically from a seed, so repeated runs see identical data:
+
+    POST /api/v1/access_token          GET /r/<sub>/new        GET /r/<sub>/search
+    GET  /comments/<id>[/_/<comment>]  POST /api/morechildren  GET /api/info
+    GET  /_stats                       (request counters + per-post timings)
+
+Tree shapes: ``wide`` (big fan-out), ``deep`` (long reply chains), ``stubs``
+(tiny initial page → many MoreComments stubs) and ``mixed``.
+Latency, 429 injection and the advertised rate budget are configurable; the
+budget is counted per OAuth client, like Reddit's.
+
+Run standalone:
+    python benchmarks/fake_reddit.py --posts 500 --shape mixed --port 8765
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+SHAPES = ("wide", "deep", "stubs", "mixed")
+
+INITIAL_LIMIT = {"wide": 200, "deep": 200, "stubs": 20, "mixed": 100}
+MAX_DEPTH = 10  # deeper replies become "continue this thread" stubs
+
+
+# --------------------------------------------------------------------------- #
+#   synthetic data                                                            #
+# --------------------------------------------------------------------------- #
+def b36(n: int) -> str:
+    chars = "0123456789abcdefghijklmnopqrstuvwxyz"
+    out = ""
+    while True:
+        n, r = divmod(n, 36)
+        out = chars[r] + out
+        if not n:
+            return out
+
+
+class Tree:
+    """Comment tree of one post: parallel lists indexed by comment number."""
+
+    def __init__(self, post_idx: int, n: int, shape: str, seed: int) -> None:
+        rng = random.Random(seed * 1_000_003 + post_idx)
+        if shape == "mixed":
+            shape = rng.choice(("wide", "deep", "stubs"))
+        self.shape = shape
+        self.ids = [b36(10_000_000 + post_idx * 100_000 + i) for i in range(n)]
+        self.parent: List[int] = []
+        self.depth: List[int] = []
+        for i in range(n):
+            if i == 0 or (shape == "wide" and rng.random() < 0.5):
+                p = -1
+            elif shape == "deep":
+                p = i - 1 if rng.random() < 0.9 else rng.randrange(i)
+            else:
+                p = rng.randrange(-1, i)
+            self.parent.append(p)
+            self.depth.append(0 if p < 0 else self.depth[p] + 1)
+        self.children: Dict[int, List[int]] = {}
+        for i, p in enumerate(self.parent):
+            self.children.setdefault(p, []).append(i)
+        self.index = {cid: i for i, cid in enumerate(self.ids)}
+        self.score = [rng.randint(-5, 500) for _ in range(n)]
+        self.body = [f"comment {i} " + "lorem ipsum " * rng.randint(1, 40) for i in range(n)]
+
+    def subtree_size(self, i: int) -> int:
+        total, stack = 0, list(self.children.get(i, []))
+        while stack:
+            j = stack.pop()
+            total += 1
+            stack.extend(self.children.get(j, []))
+        return total
+
+
+class Synthetic:
+    """Deterministic subreddit: ``posts`` posts spread evenly over [start, end]."""
+
+    def __init__(
+        self, name: str, posts: int, comments: int, shape: str, start: int, end: int, seed: int
+    ) -> None:
+        self.name = name
+        self.posts = posts
+        self.comments = comments
+        self.shape = shape
+        self.start, self.end = start, end
+        self.seed = seed
+        self._trees: "OrderedDict[int, Tree]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # newest first: post 0 is the most recent
+    def post_id(self, idx: int) -> str:
+        return b36(1_000_000 + idx)
+
+    def post_idx(self, pid: str) -> Optional[int]:
+        idx = int(pid, 36) - 1_000_000
+        return idx if 0 <= idx < self.posts else None
+
+    def created(self, idx: int) -> int:
+        step = (self.end - self.start) / max(1, self.posts)
+        return int(self.end - idx * step)
+
+    def n_comments(self, idx: int) -> int:
+        rng = random.Random(self.seed + idx)
+        return max(0, int(rng.expovariate(1 / max(1, self.comments))))
+
+    def tree(self, idx: int) -> Tree:
+        with self._lock:
+            tree = self._trees.get(idx)
+            if tree is None:
+                tree = self._trees[idx] = Tree(idx, self.n_comments(idx), self.shape, self.seed)
+                if len(self._trees) > 256:
+                    self._trees.popitem(last=False)
+            else:
+                self._trees.move_to_end(idx)
+            return tree
+
+    # ---- JSON things ----
+    def post_thing(self, idx: int) -> Dict:
+        pid = self.post_id(idx)
+        return {
+            "kind": "t3",
+            "data": {
+                "id": pid,
+                "name": f"t3_{pid}",
+                "title": f"Synthetic post {idx}",
+                "selftext": "body " * (idx % 50),
+                "created_utc": float(self.created(idx)),
+                "author": f"user{idx % 97}",
+                "score": (idx * 7919) % 1000,
+                "num_comments": self.n_comments(idx),
+                "link_flair_text": ("Idea", "Question", None)[idx % 3],
+                "url": f"https://reddit.example/r/{self.name}/comments/{pid}/",
+                "permalink": f"/r/{self.name}/comments/{pid}/",
+                "subreddit": self.name,
+            },
+        }
+
+    def comment_thing(self, tree: Tree, idx: int, pid: str, replies: Any = "") -> Dict:
+        p = tree.parent[idx]
+        return {
+            "kind": "t1",
+            "data": {
+                "id": tree.ids[idx],
+                "name": f"t1_{tree.ids[idx]}",
+                "parent_id": f"t3_{pid}" if p < 0 else f"t1_{tree.ids[p]}",
+                "link_id": f"t3_{pid}",
+                "author": "[deleted]" if idx % 17 == 0 else f"user{idx % 211}",
+                "body": tree.body[idx],
+                "created_utc": float(self.created(self.post_idx(pid) or 0) + 60 + idx),
+                "score": tree.score[idx],
+                "depth": tree.depth[idx],
+                "replies": replies,
+            },
+        }
+
+    def render(self, tree: Tree, pid: str, roots: List[int], budget: int, max_depth: int) -> Dict:
+        """Nested listing for ``roots`` (siblings), at most ``budget`` comments."""
+        parent_of = tree.parent[roots[0]] if roots else -1
+        out: List[Dict] = []
+        # breadth-first over a shared budget, like Reddit's initial page
+        holders: Dict[int, List[Dict]] = {parent_of: out}
+        queue = [(i, parent_of) for i in roots]
+        pending: Dict[int, List[int]] = {}
+        while queue:
+            nxt = []
+            for i, par in queue:
+                if budget <= 0 or tree.depth[i] > max_depth:
+                    pending.setdefault(par, []).append(i)
+                    continue
+                budget -= 1
+                kids: List[Dict] = []
+                holders[i] = kids
+                thing = self.comment_thing(tree, i, pid)
+                holders[par].append(thing)
+                thing["_kids"] = kids
+                nxt.extend((c, i) for c in tree.children.get(i, []))
+            queue = nxt
+        for par, hidden in pending.items():
+            holders[par].append(self.more_thing(tree, pid, par, hidden, max_depth))
+        return _listing(_finalize(out))
+
+    def more_thing(
+        self, tree: Tree, pid: str, parent: int, hidden: List[int], max_depth: int
+    ) -> Dict:
+        parent_name = f"t3_{pid}" if parent < 0 else f"t1_{tree.ids[parent]}"
+        depth = 0 if parent < 0 else tree.depth[parent] + 1
+        if depth > max_depth:  # "continue this thread"
+            return {
+                "kind": "more",
+                "data": {"id": "_", "name": "t1__", "parent_id": parent_name, "depth": depth,
+                         "count": 0, "children": []},
+            }
+        return {
+            "kind": "more",
+            "data": {
+                "id": tree.ids[hidden[0]],
+                "name": f"t1_{tree.ids[hidden[0]]}",
+                "parent_id": parent_name,
+                "depth": depth,
+                "count": sum(1 + tree.subtree_size(i) for i in hidden),
+                "children": [tree.ids[i] for i in hidden],
+            },
+        }
+
+
+def _finalize(things: List[Dict]) -> List[Dict]:
+    stack = list(things)
+    while stack:
+        t = stack.pop()
+        kids = t.pop("_kids", None)
+        if kids is not None:
+            t["data"]["replies"] = _listing(kids) if kids else ""
+            stack.extend(kids)
+    return things
+
+
+def _listing(children: List[Dict], after: Optional[str] = None) -> Dict:
+    return {"kind": "Listing", "data": {"children": children, "after": after, "before": None}}
+
+
+# --------------------------------------------------------------------------- #
+#   HTTP server                                                               #
+# --------------------------------------------------------------------------- #
+class Stats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.by_route: Dict[str, int] = {}
+        self.post_times: Dict[str, List[float]] = {}  # id → [first, last]
+
+    def hit(self, route: str, post: Optional[str]) -> None:
+        now = time.monotonic()
+        with self.lock:
+            self.requests += 1
+            self.by_route[route] = self.by_route.get(route, 0) + 1
+            if post:
+                span = self.post_times.setdefault(post, [now, now])
+                span[1] = now
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "by_route": dict(self.by_route),
+                "post_seconds": {k: v[1] - v[0] for k, v in self.post_times.items()},
+            }
+
+
+class FakeReddit(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        addr: Tuple[str, int],
+        data: Synthetic,
+        *,
+        latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+        budget: int = 1_000_000,
+        window: int = 600,
+    ) -> None:
+        super().__init__(addr, Handler)
+        self.data = data
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.budget = budget
+        self.window = window
+        self.windows: Dict[str, Tuple[float, int]] = {}  # token → (window start, used)
+        self.stats = Stats()
+        self.rng = random.Random(data.seed)
+        self.rng_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeReddit":
+        threading.Thread(target=self.serve_forever, name="fake-reddit", daemon=True).start()
+        return self
+
+    def ratelimit_headers(self, token: str) -> Dict[str, str]:
+        with self.rng_lock:
+            now = time.time()
+            start, used = self.windows.get(token, (now, 0))
+            if now - start >= self.window:
+                start, used = now, 0
+            used += 1
+            self.windows[token] = (start, used)
+            reset = self.window - (now - start)
+            return {
+                "x-ratelimit-used": str(used),
+                "x-ratelimit-remaining": str(max(0, self.budget - used)),
+                "x-ratelimit-reset": str(int(reset)),
+            }
+
+    def inject_error(self) -> bool:
+        with self.rng_lock:
+            return self.rng.random() < self.error_rate
+
+
+class Handler(BaseHTTPRequestHandler):
+    server: FakeReddit
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args: Any) -> None:  # keep benchmark output clean
+        pass
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    # ---- routing ----
+    def _dispatch(self, method: str) -> None:
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if method == "POST":
+            length = int(self.headers.get("content-length") or 0)
+            body = self.rfile.read(length).decode("utf-8")
+            query.update({k: v[-1] for k, v in parse_qs(body).items()})
+        path = url.path.rstrip("/")
+
+        if path == "/_stats":
+            return self._send(200, self.server.stats.snapshot())
+        if path == "/api/v1/access_token":
+            auth = self.headers.get("authorization", "").partition(" ")[2]
+            try:
+                client = base64.b64decode(auth).decode().partition(":")[0]
+            except ValueError:
+                client = ""
+            return self._send(
+                200,
+                {"access_token": f"fake-{client}", "token_type": "bearer",
+                 "expires_in": 86400, "scope": "*"},
+            )
+
+        srv = self.server
+        if srv.latency:
+            time.sleep(srv.latency * (0.5 + random.random()))
+        if srv.inject_error():
+            with srv.stats.lock:
+                srv.stats.throttled += 1
+            return self._send(429, {"message": "Too Many Requests", "error": 429},
+                              {"retry-after": "1"})
+
+        data = srv.data
+        m = re.fullmatch(r"/r/([^/]+)/(new|search)", path)
+        if m:
+            srv.stats.hit(m.group(2), None)
+            return self._send(200, self._listing(query, search=m.group(2) == "search"))
+        m = re.fullmatch(r"/comments/([0-9a-z]+)(?:/_/([0-9a-z]+))?", path)
+        if m:
+            srv.stats.hit("comments" if not m.group(2) else "continue", m.group(1))
+            idx = data.post_idx(m.group(1))
+            if idx is None:
+                return self._send(404, {"message": "Not Found", "error": 404})
+            return self._send(200, self._comments(idx, m.group(2)))
+        if path == "/api/morechildren":
+            pid = query.get("link_id", "t3_")[3:]
+            srv.stats.hit("morechildren", pid)
+            return self._send(200, self._morechildren(pid, query.get("children", "")))
+        if path == "/api/info":
+            srv.stats.hit("info", None)
+            ids = [f[3:] for f in query.get("id", "").split(",") if f.startswith("t3_")]
+            things = [data.post_thing(i) for i in map(data.post_idx, ids) if i is not None]
+            return self._send(200, _listing(things))
+        return self._send(404, {"message": "Not Found", "error": 404})
+
+    # ---- endpoints ----
+    def _listing(self, query: Dict[str, str], *, search: bool) -> Dict:
+        data = self.server.data
+        limit = min(100, int(query.get("limit", 25)))
+        start = 0
+        if query.get("after", "").startswith("t3_"):
+            start = (data.post_idx(query["after"][3:]) or 0) + 1
+        idxs = range(start, data.posts)
+        if search:
+            m = re.search(r"timestamp:(\d+)\.\.(\d+)", query.get("q", ""))
+            if m:
+                lo, hi = int(m.group(1)), int(m.group(2))
+                idxs = [i for i in idxs if lo <= data.created(i) <= hi][:1000]
+        page = list(idxs)[:limit] if search else list(idxs[:limit])
+        after = f"t3_{data.post_id(page[-1])}" if len(page) == limit else None
+        return _listing([data.post_thing(i) for i in page], after)
+
+    def _comments(self, idx: int, comment: Optional[str]) -> List[Dict]:
+        data = self.server.data
+        pid = data.post_id(idx)
+        tree = data.tree(idx)
+        budget = INITIAL_LIMIT[tree.shape]
+        if comment is None:
+            roots = tree.children.get(-1, [])
+            forest = data.render(tree, pid, roots, budget, MAX_DEPTH) if roots else _listing([])
+        else:
+            i = tree.index.get(comment)
+            if i is None:
+                forest = _listing([])
+            else:
+                forest = data.render(tree, pid, [i], budget, tree.depth[i] + MAX_DEPTH)
+        return [_listing([data.post_thing(idx)]), forest]
+
+    def _morechildren(self, pid: str, children: str) -> Dict:
+        data = self.server.data
+        idx = data.post_idx(pid)
+        things: List[Dict] = []
+        if idx is not None:
+            tree = data.tree(idx)
+            wanted = [tree.index[c] for c in children.split(",") if c in tree.index][:100]
+            for i in wanted:
+                things.append(data.comment_thing(tree, i, pid))
+                kids = tree.children.get(i, [])
+                if kids:
+                    things.append(data.more_thing(tree, pid, i, kids, 10**9))
+        return {"json": {"errors": [], "data": {"things": things}}}
+
+    # ---- plumbing ----
+    def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json; charset=UTF-8")
+        self.send_header("content-length", str(len(body)))
+        token = self.headers.get("authorization", "").partition(" ")[2]
+        for k, v in {**self.server.ratelimit_headers(token), **(headers or {})}.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+# --------------------------------------------------------------------------- #
+#   CLI                                                                       #
+# --------------------------------------------------------------------------- #
+def add_data_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--subreddit", default="benchsub")
+    p.add_argument("--posts", type=int, default=200)
+    p.add_argument("--comments", type=int, default=150, help="mean comments per post")
+    p.add_argument("--shape", choices=SHAPES, default="mixed")
+    p.add_argument("--start", default="2025-06-01")
+    p.add_argument("--end", default="2025-06-07")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--latency-ms", type=float, default=0.0)
+    p.add_argument("--error-rate", type=float, default=0.0, help="fraction of 429 responses")
+    p.add_argument("--budget", type=int, default=1_000_000,
+                   help="requests per 10-minute window advertised in x-ratelimit headers")
+
+
+def build_server(args: argparse.Namespace, port: int = 0) -> FakeReddit:
+    from datetime import datetime, timezone
+
+    def ts(day: str) -> int:
+        return int(datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp())
+
+    data = Synthetic(args.subreddit, args.posts, args.comments, args.shape,
+                     ts(args.start), ts(args.end) + 86_399, args.seed)
+    return FakeReddit(("127.0.0.1", port), data, latency_ms=args.latency_ms,
+                      error_rate=args.error_rate, budget=args.budget)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a synthetic Reddit API locally.")
+    add_data_args(parser)
+    parser.add_argument("--port", type=int, default=8765)
+    ns = parser.parse_args()
+    server = build_server(ns, ns.port)
+    print(f"fake Reddit for r/{ns.subreddit} on {server.url}  (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -1,85 +1,363 @@
 # reddit_scraper/cli.py
+"""
+``reddit-scraper`` command line.
+
+    reddit-scraper scrape  <subreddit> <start> <end> [flags]
+    reddit-scraper jobs    <jobs.json> [flags]
+    reddit-scraper export  csv|txt|parquet (<subreddit> <start> <end> | --input FILE)
+    reddit-scraper merge   <directory> --ext .txt
+    reddit-scraper compact <ndjson>... [-o OUTPUT]
+    reddit-scraper stats   (<subreddit> <start> <end> | --input FILE)
+    reddit-scraper search  <query>
+
+The old form ``reddit-scraper <subreddit> <start> <end>`` still means
+``scrape``. Backends (praw, tqdm, pyarrow, …) are imported inside the command
+that uses them and directories are only created once a command runs, so
+``--help`` and small export jobs start fast.
+"""
+
 from __future__ import annotations
 
 import argparse
 import logging
-import subprocess
+import os
 import sys
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
-from reddit_scraper.logging_setup import setup_logging
-from reddit_scraper.services.csv_export import ndjson_to_csv
-from reddit_scraper.services.scraper import Scraper
-from reddit_scraper.services.txt_export import ndjson_to_txt
+if TYPE_CHECKING:  # backends stay unimported until a command needs them
+    from reddit_scraper.infra.expand import ExpansionLimits
+    from reddit_scraper.infra.http_cache import ResponseCache
 
 # ---------- constants ---------------------------------------------------- #
 ROOT = Path(__file__).parent.parent
-OUT_BASE = ROOT / "outputs"
-OUT_BASE.mkdir(parents=True, exist_ok=True)
-(OUT_BASE / "data").mkdir(parents=True, exist_ok=True)
-(OUT_BASE / "progress").mkdir(parents=True, exist_ok=True)
-# csv & txt dirs are created lazily
+COMMANDS = ("scrape", "jobs", "export", "merge", "compact", "stats", "search")
+COMPRESSIONS = ("gzip", "zstd")           # keys of core.framed.COMPRESSIONS
+SEARCH_KINDS = ("all", "posts", "comments")
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+lg = logging.getLogger(__name__)
 
 
 # ---------- helpers ------------------------------------------------------ #
+def out_base() -> Path:
+    return Path(os.getenv("REDDIT_SCRAPER_OUTPUTS") or ROOT / "outputs")
+
+
 def _slug(date: str) -> str:
     return date.replace("-", "_")
 
 
-def build_paths(sub: str, start: str, end: str) -> dict[str, Path]:
-    tag = f"{sub}_{_slug(start)}__{_slug(end)}"
-    txt_root = OUT_BASE / "txt"
+def build_paths(
+    sub: str, start: str, end: str, compress: Optional[str] = None
+) -> Dict[str, Path]:
+    z = ""                                                          # "" | ".gz" | ".zst"
+    if compress:
+        from reddit_scraper.core.framed import COMPRESSIONS as suffixes
+
+        z = suffixes[compress]
+    return _paths(f"{sub}_{_slug(start)}__{_slug(end)}", z)
+
+
+def paths_for_output(ndjson: str | Path) -> Dict[str, Path]:
+    """``build_paths`` for an existing NDJSON file (exports go under the outputs dir)."""
+    ndjson = Path(ndjson)
+    name, z = ndjson.name, ""
+    for suffix in (".gz", ".zst"):
+        if name.endswith(suffix):
+            name, z = name[: -len(suffix)], suffix
+    tag = name[: -len(".ndjson")] if name.endswith(".ndjson") else name
+    tag = tag[len("output_"):] if tag.startswith("output_") else tag
+    return {**_paths(tag, z), "ndjson": ndjson}
+
+
+def _paths(tag: str, z: str) -> Dict[str, Path]:
+    base = out_base()
+    txt_root = base / "txt"
     return {
         "tag": tag,
-        "ndjson":  OUT_BASE / "data"     / f"output_{tag}.ndjson",
-        "progress": OUT_BASE / "progress" / f"progress_{tag}.sqlite",
-        "csv_sub": OUT_BASE / "csv"      / f"output_{tag}_submissions.csv",
-        "csv_com": OUT_BASE / "csv"      / f"output_{tag}_comments.csv",
+        "ndjson":  base / "data"     / f"output_{tag}.ndjson{z}",
+        "delta":   base / "data"     / f"output_{tag}.delta.ndjson{z}",   # --refresh
+        "progress": base / "progress" / f"progress_{tag}.sqlite",
+        "csv_sub": base / "csv"      / f"output_{tag}_submissions.csv",
+        "csv_com": base / "csv"      / f"output_{tag}_comments.csv",
+        "pq_sub":  base / "parquet"  / f"output_{tag}_submissions",   # dataset dirs
+        "pq_com":  base / "parquet"  / f"output_{tag}_comments",
         "txt_dir": txt_root / f"conversations_{tag}",                 # per-post txt
         "merged":  txt_root / f"all_conversations_{tag}.txt",         # merged result
     }
 
 
-def parse_args() -> argparse.Namespace:
+def search_db() -> Path:
+    return out_base() / "search.sqlite"
+
+
+def _target_paths(args: argparse.Namespace) -> Dict[str, Path]:
+    """Paths from ``<subreddit> <start> <end>`` or ``--input``."""
+    if args.input:
+        if args.target:
+            sys.exit("give either <subreddit> <start> <end> or --input, not both")
+        return paths_for_output(args.input)
+    if len(args.target) != 3:
+        sys.exit("expected <subreddit> <start> <end> (or --input FILE)")
+    return build_paths(*args.target, getattr(args, "compress", None))
+
+
+# ---------- parser ------------------------------------------------------- #
+def _common() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(add_help=False)
+    # no default here: parsers built with parents=[common] share this action, so a
+    # per-command set_defaults would change it for every command (see main)
+    p.add_argument("--log-level", choices=LOG_LEVELS, help="default: INFO")
+    p.add_argument("--log-file")
+    p.add_argument("--metrics-json", metavar="PATH",
+                   help="Write stage timers / counters / histograms here as JSON")
+    p.add_argument("--metrics-prom", metavar="PATH",
+                   help="…and/or as a Prometheus textfile (node_exporter textfile collector)")
+    p.add_argument("--metrics-interval", type=float, default=10.0,
+                   help="Seconds between metrics file updates (default: 10)")
+    p.add_argument("--profile", metavar="PATH",
+                   help="Write a cProfile dump of the command (main thread; fetch threads "
+                        "are only included with --workers 1)")
+    return p
+
+
+def _add_target(p: argparse.ArgumentParser) -> None:
+    p.add_argument("target", nargs="*", metavar="SUBREDDIT START END",
+                   help="The scrape whose output to use")
+    p.add_argument("--input", help="…or an NDJSON file (.ndjson / .ndjson.gz / .ndjson.zst)")
+    p.add_argument("--compress", choices=COMPRESSIONS,
+                   help="The scrape was written with --compress")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = _common()
     p = argparse.ArgumentParser(
         prog="reddit-scraper",
-        description="Fetch subreddit submissions (and comments) for a date range.",
+        description="Fetch subreddit submissions (and comments) for a date range, "
+                    "then export, merge, inspect or search them.",
     )
-    p.add_argument("subreddit")
-    p.add_argument("start_date")            # ISO
-    p.add_argument("end_date")
-    p.add_argument("--min-score", type=int)
-    p.add_argument("--flair")
-    p.add_argument("--csv",    action="store_true", help="Also export CSVs")
-    p.add_argument("--txt",    action="store_true", help="Export per-post TXT files")
-    p.add_argument("--merged", action="store_true",
+    cmds = p.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    # scrape ---------------------------------------------------------------
+    s = cmds.add_parser("scrape", parents=[common], help="Scrape a subreddit date range",
+                        description="Fetch subreddit submissions (and comments) for a date range.")
+    s.set_defaults(func=cmd_scrape)
+    s.add_argument("subreddit")
+    s.add_argument("start_date")            # ISO
+    s.add_argument("end_date")
+    s.add_argument("--min-score", type=int)
+    s.add_argument("--flair")
+    s.add_argument("--csv",    action="store_true", help="Also export CSVs")
+    s.add_argument("--export-workers", type=int,
+                   help="Processes used by the exporters (default: all cores)")
+    s.add_argument("--parquet", action="store_true",
+                   help="Also export Parquet datasets (needs pyarrow)")
+    s.add_argument("--partition-by-month", action="store_true",
+                   help="With --parquet, write month=YYYY-MM/ partitions")
+    s.add_argument("--txt",    action="store_true", help="Export per-post TXT files")
+    s.add_argument("--merged", action="store_true",
                    help="With --txt, merge all TXT into one file")
-    p.add_argument("--log-level", default="INFO",
-                   choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
-    p.add_argument("--log-file")
-    return p.parse_args()
+    s.add_argument("--workers", type=int, default=1,
+                   help="Fetch this many submission trees in parallel")
+    s.add_argument("--queue-size", type=int,
+                   help="Max posts in flight between enumeration and writer "
+                        "(default: 4 × workers)")
+    s.add_argument("--max-attempts", type=int, default=5,
+                   help="Give up on a post after this many failed fetches")
+    s.add_argument("--retry-failed", action="store_true",
+                   help="Retry posts previously moved to the dead-letter table")
+    s.add_argument("--group-size", type=int, default=100,
+                   help="fsync + checkpoint after this many posts")
+    s.add_argument("--group-interval", type=float, default=5.0,
+                   help="…or after this many seconds, whichever comes first")
+    s.add_argument("--enumerate", dest="enumerate_via", default="listing",
+                   choices=["listing", "search", "archive"],
+                   help="How to find posts: walk /new (capped at ~1000), or split the "
+                        "range into time windows over search or a local --archive dump")
+    s.add_argument("--archive", help="Submissions dump (.ndjson/.gz/.zst) for --enumerate archive")
+    s.add_argument("--enum-workers", type=int, default=4,
+                   help="Time windows queried in parallel")
+    s.add_argument("--max-expansions", type=int,
+                   help="Max 'load more comments' API calls per thread (default: unlimited)")
+    s.add_argument("--max-depth", type=int,
+                   help="Don't expand 'more comments' stubs deeper than this")
+    s.add_argument("--min-more-size", type=int, default=0,
+                   help="Don't expand stubs hiding fewer than N comments")
+    s.add_argument("--cache-dir",
+                   help="Record Reddit responses here (and serve repeats from disk)")
+    s.add_argument("--cache-mode", default="record",
+                   choices=["record", "replay", "passthrough"],
+                   help="replay = offline, cache only; passthrough = ignore the cache")
+    s.add_argument("--cache-ttl", type=float, help="Seconds before a cached response expires")
+    s.add_argument("--cache-max-mb", type=float, help="Evict least-recently-used beyond this")
+    s.add_argument("--compress", choices=COMPRESSIONS,
+                   help="Write the NDJSON as indexed compressed frames (.ndjson.gz / .ndjson.zst)")
+    s.add_argument("--validate", action="store_true",
+                   help="Validate every tree against the pydantic models before writing "
+                        "(slower; default writes trees as fetched)")
+    s.add_argument("--refresh", action="store_true",
+                   help="Re-fetch already-scraped threads that gained comments "
+                        "(writes a .delta.ndjson next to the output)")
+    s.add_argument("--refresh-threshold", type=int, default=1,
+                   help="With --refresh, minimum growth in comment count")
+    s.add_argument("--index", action="store_true",
+                   help="Ingest the output into the local search DB (outputs/search.sqlite)")
+    s.add_argument("--processes", type=int, default=1,
+                   help="Run this many cooperating worker processes on one shared frontier "
+                        "(one credential set each with --credentials)")
+    s.add_argument("--worker-id",
+                   help="Join a shared frontier as this worker (other hosts / manual launch); "
+                        "leases work from the progress DB and writes a part file")
+    s.add_argument("--credentials", metavar="FILE",
+                   help="JSON pool of Reddit app credentials; worker i uses entry "
+                        "REDDIT_CREDENTIALS_INDEX + i")
+    s.add_argument("--lease-size", type=int,
+                   help="Posts claimed per lease (default: --queue-size)")
+    s.add_argument("--lease-ttl", type=float, default=120.0,
+                   help="Seconds before an un-renewed lease can be taken over")
 
+    # jobs -----------------------------------------------------------------
+    j = cmds.add_parser("jobs", parents=[common],
+                        help="Scrape many subreddits / ranges over one rate budget",
+                        description="Run every job of a JSON job file, sharing one rate "
+                                    "limiter and fetch pool. Each job writes the same files "
+                                    "as the matching 'scrape' command.")
+    j.set_defaults(func=cmd_jobs)
+    j.add_argument("job_file", help='[{"subreddit": …, "start": …, "end": …, '
+                                    '"weight": 1, "priority": 0}, …]')
+    j.add_argument("--workers", type=int, default=4,
+                   help="Fetch threads shared by all jobs")
+    j.add_argument("--enum-workers", type=int, default=2,
+                   help="Jobs enumerated at the same time")
+    j.add_argument("--report-interval", type=float, default=30.0,
+                   help="Seconds between per-job progress / ETA lines")
+    j.add_argument("--max-attempts", type=int, default=5,
+                   help="Give up on a post after this many failed fetches")
+    j.add_argument("--group-size", type=int, default=100,
+                   help="fsync + checkpoint after this many posts (per job)")
+    j.add_argument("--group-interval", type=float, default=5.0,
+                   help="…or after this many seconds, whichever comes first")
+    j.add_argument("--max-expansions", type=int,
+                   help="Max 'load more comments' API calls per thread (default: unlimited)")
+    j.add_argument("--max-depth", type=int,
+                   help="Don't expand 'more comments' stubs deeper than this")
+    j.add_argument("--min-more-size", type=int, default=0,
+                   help="Don't expand stubs hiding fewer than N comments")
+    j.add_argument("--cache-dir",
+                   help="Record Reddit responses here (and serve repeats from disk)")
+    j.add_argument("--cache-mode", default="record",
+                   choices=["record", "replay", "passthrough"])
+    j.add_argument("--cache-ttl", type=float, help="Seconds before a cached response expires")
+    j.add_argument("--cache-max-mb", type=float, help="Evict least-recently-used beyond this")
+    j.add_argument("--compress", choices=COMPRESSIONS,
+                   help="Write each job's NDJSON as indexed compressed frames")
+    j.add_argument("--validate", action="store_true",
+                   help="Validate every tree against the pydantic models before writing")
+    j.add_argument("--index", action="store_true",
+                   help="Ingest every job's output into the local search DB")
 
-# ---------- main --------------------------------------------------------- #
-def main() -> None:
-    args = parse_args()
-    setup_logging(args.log_level, args.log_file)
-    lg = logging.getLogger(__name__)
+    # export ---------------------------------------------------------------
+    e = cmds.add_parser("export", parents=[common], help="Export a scrape to CSV, TXT or Parquet")
+    e.set_defaults(func=cmd_export)
+    e.add_argument("format", choices=["csv", "txt", "parquet"])
+    _add_target(e)
+    e.add_argument("--workers", type=int, help="Processes to use (default: all cores)")
+    e.add_argument("--merged", action="store_true",
+                   help="txt: also write all conversations into one file")
+    e.add_argument("--partition-by-month", action="store_true",
+                   help="parquet: write month=YYYY-MM/ partitions")
+
+    # merge ----------------------------------------------------------------
+    m = cmds.add_parser("merge", parents=[common], help="Concatenate files into one text file")
+    m.set_defaults(func=cmd_merge)
+    m.add_argument("directory", help="Root directory to walk (processed recursively)")
+    m.add_argument("--ext", default=".txt", help="File extension to include (default: .txt)")
+    m.add_argument("--out-dir", help="Destination directory (default: outputs/merged/)")
+    m.add_argument("--shard-mb", type=float,
+                   help="Split the output into shards of at most this many MB")
+    m.add_argument("--manifest", action="store_true",
+                   help="Write <name>.manifest.json even without sharding")
+    m.add_argument("--workers", type=int, default=8, help="Threads used to list directories")
+
+    # compact --------------------------------------------------------------
+    c = cmds.add_parser("compact", parents=[common],
+                        help="De-duplicate, sort and merge NDJSON outputs",
+                        description="Keep the newest fetch of every submission, sort by "
+                                    "created_utc and merge the files into one – in bounded "
+                                    "memory (external merge sort).")
+    c.set_defaults(func=cmd_compact)
+    c.add_argument("inputs", nargs="+", metavar="NDJSON",
+                   help="Outputs to compact (.ndjson / .ndjson.gz / .ndjson.zst)")
+    c.add_argument("-o", "--output",
+                   help="Destination, compressed by suffix (default: rewrite the only input)")
+    c.add_argument("--workers", type=int, help="Processes sorting runs (default: all cores)")
+    c.add_argument("--memory-mb", type=float, default=512,
+                   help="Record bytes buffered by all sorting processes together (default: 512)")
+    c.add_argument("--tmp-dir", help="Where sorted runs spill (default: next to the output)")
+
+    # stats ----------------------------------------------------------------
+    st = cmds.add_parser("stats", parents=[common], help="Summarise a scrape's output and progress")
+    st.set_defaults(func=cmd_stats)
+    _add_target(st)
+    st.add_argument("--json", action="store_true", help="Print one JSON object")
+
+    # search ---------------------------------------------------------------
+    q = cmds.add_parser("search", parents=[common],
+                        help="Full-text search over ingested posts and comments",
+                        description="Full-text search over ingested posts and comments "
+                                    "(SQLite FTS5).")
+    q.set_defaults(func=cmd_search)
+    q.add_argument("query", help='FTS5 query, e.g. \'"side project" AND (billing OR invoice*)\'')
+    q.add_argument("--db", help="Search database (default: outputs/search.sqlite)")
+    q.add_argument("--ingest", nargs="+", metavar="NDJSON",
+                   help="First ingest new records from these files")
+    q.add_argument("--kind", default="all", choices=SEARCH_KINDS)
+    q.add_argument("--limit", type=int, default=20)
+    q.add_argument("--min-score", type=int)
+    q.add_argument("--json", action="store_true", help="One JSON object per hit")
+    q.add_argument("--optimize", action="store_true",
+                   help="First merge all FTS segments (rewrites the whole index; "
+                        "worth it after large ingests)")
+    return p
 
+
+# ---------- commands ----------------------------------------------------- #
+def cmd_scrape(args: argparse.Namespace) -> None:
+    if args.enumerate_via == "archive" and not args.archive:
+        sys.exit("--enumerate archive requires --archive PATH")
+    if args.refresh and (args.processes > 1 or args.worker_id):
+        sys.exit("--refresh runs in a single process")
+    if args.credentials:
+        os.environ["REDDIT_CREDENTIALS_FILE"] = os.path.abspath(args.credentials)
     flair_list: Optional[List[str]] = (
         [f.strip() for f in args.flair.split(",")] if args.flair else None
     )
 
-    paths = build_paths(args.subreddit, args.start_date, args.end_date)
+    paths = build_paths(args.subreddit, args.start_date, args.end_date, args.compress)
+    paths["ndjson"].parent.mkdir(parents=True, exist_ok=True)
+    paths["progress"].parent.mkdir(parents=True, exist_ok=True)
+
+    if args.processes > 1 and not args.worker_id:
+        run_workers(args)
+    else:
+        _scrape_here(args, paths, flair_list)
 
-    # lazily create optional dirs
     if args.csv:
-        (OUT_BASE / "csv").mkdir(parents=True, exist_ok=True)
+        export_csv(paths, args.export_workers)
+    if args.parquet:
+        export_parquet(paths, args.partition_by_month)
     if args.txt or args.merged:
-        paths["txt_dir"].mkdir(parents=True, exist_ok=True)
+        export_txt(paths, args.merged, args.export_workers)
+    if args.index:
+        index_outputs([paths["ndjson"], paths["delta"]])
+
+
+def _scrape_here(
+    args: argparse.Namespace, paths: Dict[str, Path], flair_list: Optional[List[str]]
+) -> None:
+    from reddit_scraper.services.scraper import Scraper
 
-    # run scraper ---------------------------------------------------------
     scraper = Scraper(
         subreddit=args.subreddit,
         start_date=args.start_date,
@@ -88,41 +366,392 @@ def main() -> None:
         min_score=args.min_score,
         flairs=flair_list,
         progress_db=paths["progress"],
+        workers=args.workers,
+        queue_size=args.queue_size,
+        max_attempts=args.max_attempts,
+        retry_failed=args.retry_failed,
+        group_size=args.group_size,
+        group_interval=args.group_interval,
+        enumerate_via=args.enumerate_via,
+        archive=args.archive,
+        enum_workers=args.enum_workers,
+        expansion=_expansion(args),
+        http_cache=_http_cache(args),
+        cache_mode=args.cache_mode,
+        validate=args.validate,
+        worker_id=args.worker_id,
+        lease_size=args.lease_size,
+        lease_ttl=args.lease_ttl,
     )
-    scraper.run()
+    if args.refresh:
+        scraper.refresh(paths["delta"], threshold=args.refresh_threshold)
+    else:
+        scraper.run()
 
-    # CSV -----------------------------------------------------------------
-    if args.csv:
-        lg.info("CSV export …")
-        ndjson_to_csv(paths["ndjson"], paths["csv_sub"], paths["csv_com"])
-        lg.info("CSV ready in %s", paths["csv_sub"].parent)
 
-    # TXT -----------------------------------------------------------------
-    if args.txt or args.merged:
-        lg.info("TXT export …")
-        ndjson_to_txt(paths["ndjson"], paths["txt_dir"])
-        lg.info("TXT files in %s", paths["txt_dir"])
-
-    # merged --------------------------------------------------------------
-    if args.merged:
-        lg.info("Merging TXT files …")
-        merge_script = ROOT / "scripts" / "merge_contents.py"
-        subprocess.run(
-            [
-                sys.executable,
-                str(merge_script),
-                str(paths["txt_dir"]),
-                "--ext", ".txt",
-                "--out-dir", str(paths["txt_dir"].parent),  # outputs/txt
-            ],
-            check=True,
+def _expansion(args: argparse.Namespace) -> ExpansionLimits:
+    from reddit_scraper.infra.expand import ExpansionLimits
+
+    return ExpansionLimits(
+        max_expansions=args.max_expansions,
+        max_depth=args.max_depth,
+        min_stub_size=args.min_more_size,
+    )
+
+
+def _http_cache(args: argparse.Namespace) -> Optional[ResponseCache]:
+    if not args.cache_dir:
+        return None
+    from reddit_scraper.infra.http_cache import ResponseCache
+
+    return ResponseCache(
+        args.cache_dir,
+        ttl=args.cache_ttl,
+        max_bytes=int(args.cache_max_mb * 1_000_000) if args.cache_max_mb else None,
+    )
+
+
+# flags the launcher keeps to itself → number of values they take
+_PARENT_ONLY = {
+    "--processes": 1, "--csv": 0, "--parquet": 0, "--partition-by-month": 0, "--txt": 0,
+    "--merged": 0, "--index": 0, "--export-workers": 1, "--profile": 1,
+}
+_PER_WORKER = ("--metrics-json", "--metrics-prom")  # PATH → PATH.<worker>
+
+
+def run_workers(args: argparse.Namespace) -> None:
+    """``--processes N``: start N ``--worker-id`` children and wait for all of them."""
+    import signal
+    import socket
+    import subprocess
+
+    pool_file = os.getenv("REDDIT_CREDENTIALS_FILE")
+    if pool_file:
+        from reddit_scraper.infra.reddit import load_credential_pool
+
+        pool = len(load_credential_pool(pool_file))
+        if pool < args.processes:
+            lg.warning("%d workers share %d credential set(s) – they share rate budgets too",
+                       args.processes, pool)
+    else:
+        lg.warning("No --credentials pool: all %d workers share one rate budget", args.processes)
+
+    host = socket.gethostname().split(".")[0]
+    first = int(os.getenv("REDDIT_CREDENTIALS_INDEX") or 0)
+    procs = []
+    for i in range(args.processes):
+        worker = f"{host}-{i}"
+        argv = _worker_argv(args.argv, worker)
+        cmd = [sys.executable, "-m", "reddit_scraper.cli", *argv, "--worker-id", worker]
+        env = {**os.environ, "REDDIT_CREDENTIALS_INDEX": str(first + i)}
+        procs.append(subprocess.Popen(cmd, env=env))
+    lg.info("Started %d worker process(es)", len(procs))
+
+    def _forward(sig_num, _frame):
+        if sig_num == signal.SIGINT:
+            return  # the terminal already sent it to every worker
+        for proc in procs:
+            if proc.poll() is None:
+                proc.send_signal(sig_num)
+
+    signal.signal(signal.SIGINT, _forward)
+    signal.signal(signal.SIGTERM, _forward)
+    failed = [i for i, proc in enumerate(procs) if proc.wait() != 0]
+    if failed:
+        sys.exit(f"worker(s) {', '.join(map(str, failed))} failed")
+
+
+def _worker_argv(argv: List[str], worker: str) -> List[str]:
+    """The launcher's own command line, minus ``_PARENT_ONLY`` flags."""
+    out: List[str] = []
+    rest = iter(argv)
+    for arg in rest:
+        name, eq, value = arg.partition("=")
+        if name in _PARENT_ONLY:
+            if not eq:
+                for _ in range(_PARENT_ONLY[name]):
+                    next(rest, None)
+            continue
+        if name in _PER_WORKER:
+            out += [name, f"{value if eq else next(rest, '')}.{worker}"]
+            continue
+        out.append(arg)
+    return out
+
+
+def cmd_jobs(args: argparse.Namespace) -> None:
+    from reddit_scraper.services.scheduler import JobScheduler, load_jobs
+
+    try:
+        jobs = load_jobs(args.job_file)
+    except (OSError, ValueError) as exc:
+        sys.exit(str(exc))
+
+    seen: Dict[Path, int] = {}
+    for i, job in enumerate(jobs):
+        paths = build_paths(job.subreddit, job.start_date, job.end_date, args.compress)
+        if paths["ndjson"] in seen:
+            sys.exit(f"jobs {seen[paths['ndjson']]} and {i} scrape the same range")
+        seen[paths["ndjson"]] = i
+        paths["ndjson"].parent.mkdir(parents=True, exist_ok=True)
+        paths["progress"].parent.mkdir(parents=True, exist_ok=True)
+        jobs[i] = job._replace(name=job.name or paths["tag"], output=paths["ndjson"],
+                               progress_db=paths["progress"])
+
+    scheduler = JobScheduler(
+        jobs,
+        workers=args.workers,
+        enum_workers=args.enum_workers,
+        report_interval=args.report_interval,
+        max_attempts=args.max_attempts,
+        group_size=args.group_size,
+        group_interval=args.group_interval,
+        expansion=_expansion(args),
+        http_cache=_http_cache(args),
+        cache_mode=args.cache_mode,
+        validate=args.validate,
+    )
+    for st in scheduler.run():
+        print(f"{st.name:<40} {st.state:<8} {st.done:>7,} saved {st.failed:>5,} failed")
+    if args.index:
+        index_outputs([job.output for job in jobs])
+
+
+def cmd_export(args: argparse.Namespace) -> None:
+    paths = _target_paths(args)
+    if not paths["ndjson"].exists():
+        sys.exit(f"{paths['ndjson']} does not exist")
+    if args.format == "csv":
+        export_csv(paths, args.workers)
+    elif args.format == "parquet":
+        export_parquet(paths, args.partition_by_month)
+    else:
+        export_txt(paths, args.merged, args.workers)
+
+
+def cmd_merge(args: argparse.Namespace) -> None:
+    from reddit_scraper.services.merge import merge
+
+    result = merge(
+        args.directory,
+        args.ext,
+        args.out_dir or out_base() / "merged",
+        shard_bytes=int(args.shard_mb * 1_000_000) if args.shard_mb else None,
+        manifest=args.manifest,
+        workers=args.workers,
+    )
+    target = result.outputs[0] if len(result.outputs) == 1 else f"{len(result.outputs)} shards"
+    print(f"✓ merged {result.files} file(s) → {target}")
+    if result.manifest:
+        print(f"  manifest: {result.manifest}")
+
+
+def cmd_compact(args: argparse.Namespace) -> None:
+    from reddit_scraper.services.compact import compact
+
+    if args.output is None and len(args.inputs) > 1:
+        sys.exit("compacting several files needs --output")
+    try:
+        result = compact(
+            args.inputs,
+            args.output or args.inputs[0],
+            workers=args.workers,
+            memory_bytes=int(args.memory_mb * 1_000_000),
+            tmp_dir=args.tmp_dir,
         )
-        # Rename the auto-created file to all_conversations_<tag>.txt
-        generated = paths["txt_dir"].parent / f"{paths['txt_dir'].name}.txt"
-        if generated.exists():
-            generated.rename(paths["merged"])
+    except FileNotFoundError as exc:
+        sys.exit(str(exc))
+    print(f"✓ compacted {result.records_in:,} record(s) → {result.records_out:,} "
+          f"in {result.output} ({result.records_in - result.records_out:,} duplicate(s) dropped)")
+
+
+def cmd_stats(args: argparse.Namespace) -> None:
+    import json
+
+    from reddit_scraper.services.offsets import OffsetIndex
+    from reddit_scraper.services.progress import ProgressTracker
+
+    paths = _target_paths(args)
+    report: Dict[str, object] = {"tag": paths["tag"]}
+    for key in ("ndjson", "delta"):
+        f = paths[key]
+        if not f.exists():
+            continue
+        with OffsetIndex(f) as index:
+            index.catch_up()
+            report[key] = {"path": str(f), "bytes": f.stat().st_size, **index.counts()}
+    if paths["progress"].exists():
+        tracker = ProgressTracker(paths["progress"])
+        try:
+            report["progress"] = tracker.counts()
+        finally:
+            tracker.close()
+    if len(report) == 1:
+        sys.exit(f"nothing found for {paths['tag']} under {out_base()}")
+
+    if args.json:
+        print(json.dumps(report))
+        return
+    print(paths["tag"])
+    for section, values in report.items():
+        if isinstance(values, dict):
+            print(f"  {section}:")
+            for k, v in values.items():
+                print(f"    {k:<10} {v:,}" if isinstance(v, int) else f"    {k:<10} {v}")
+
+
+def cmd_search(args: argparse.Namespace) -> None:
+    import json
+    import sqlite3
+    import time
+    from datetime import datetime, timezone
+
+    from reddit_scraper.services.search import SearchStore, ingest_files
+
+    if args.log_level is None:  # hits go to stdout; keep ingest chatter out of the way
+        logging.getLogger().setLevel(logging.WARNING)
+    db = Path(args.db) if args.db else search_db()
+    if args.ingest:
+        ingest_files(db, args.ingest, optimize=args.optimize)
+    if not db.exists():
+        sys.exit(f"{db} does not exist – scrape with --index or pass --ingest")
+
+    with SearchStore(db) as store:
+        if args.optimize and not args.ingest:
+            store.optimize()
+        t0 = time.perf_counter()
+        try:
+            hits = store.search(args.query, kind=args.kind, limit=args.limit,
+                                min_score=args.min_score)
+        except sqlite3.OperationalError as exc:  # FTS5 syntax errors
+            sys.exit(f"bad query: {exc}")
+        took = (time.perf_counter() - t0) * 1000
+
+    for h in hits:
+        if args.json:
+            print(json.dumps({**h._asdict(), "url": h.url}, ensure_ascii=False))
+            continue
+        when = datetime.fromtimestamp(h.created_utc or 0, timezone.utc).strftime("%Y-%m-%d")
+        score = "-" if h.score is None else h.score
+        print(f"{h.kind:<7} {score:>5}  {when}  {h.title}")
+        if h.parent:
+            print(f"        ↳ re: {' '.join(h.parent.split())[:100]}")
+        print(f"        {' '.join(h.snippet.split())}")
+        print(f"        {h.url or h.post_id}\n")
+    print(f"{len(hits)} hit(s) in {took:.1f} ms", file=sys.stderr)
+
+
+# ---------- export steps (shared by scrape and export) -------------------- #
+def export_csv(paths: Dict[str, Path], workers: Optional[int]) -> None:
+    from reddit_scraper.services.csv_export import ndjson_to_csv
+
+    lg.info("CSV export …")
+    ndjson_to_csv(paths["ndjson"], paths["csv_sub"], paths["csv_com"], workers=workers)
+    lg.info("CSV ready in %s", paths["csv_sub"].parent)
+
+
+def export_parquet(paths: Dict[str, Path], partition_by_month: bool) -> None:
+    from reddit_scraper.services.parquet_export import ndjson_to_parquet
+
+    lg.info("Parquet export …")
+    rows = ndjson_to_parquet(
+        paths["ndjson"], paths["pq_sub"], paths["pq_com"],
+        partition_by_month=partition_by_month,
+    )
+    lg.info("Parquet ready in %s (%d posts, %d comments)", paths["pq_sub"].parent,
+            rows["submissions"], rows["comments"])
+
+
+def export_txt(paths: Dict[str, Path], merged: bool, workers: Optional[int]) -> None:
+    from reddit_scraper.services.txt_export import ndjson_to_txt
+
+    lg.info("TXT export …")
+    paths["txt_dir"].mkdir(parents=True, exist_ok=True)
+    n = ndjson_to_txt(
+        paths["ndjson"],
+        paths["txt_dir"],
+        merged=paths["merged"] if merged else None,
+        workers=workers,
+    )
+    lg.info("TXT files for %d posts in %s", n, paths["txt_dir"])
+    if merged:
         lg.info("Merged → %s", paths["merged"])
 
 
+def index_outputs(files: List[Path]) -> None:
+    from reddit_scraper.services.search import ingest_files
+
+    stats = ingest_files(search_db(), files)
+    lg.info("Search DB %s: +%d posts, +%d comments", search_db(), stats.posts, stats.comments)
+
+
+# ---------- main --------------------------------------------------------- #
+def _is_date(arg: str) -> bool:
+    from datetime import datetime
+
+    try:
+        datetime.fromisoformat(arg)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_legacy(argv: List[str]) -> bool:
+    """
+    The pre-subcommand form ``[options] <sub> <start> <end>``, told apart by
+    shape rather than by the first word – r/jobs, r/stats and r/search exist.
+    """
+    for i, arg in enumerate(argv):
+        if arg.startswith("-"):
+            continue
+        dates = argv[i + 1:i + 3]
+        if len(dates) == 2 and all(map(_is_date, dates)):
+            return True
+        if arg in COMMANDS:
+            return False
+    return bool(argv) and argv[0] not in COMMANDS and not argv[0].startswith("-")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if _is_legacy(argv):
+        argv.insert(0, "scrape")
+    args = build_parser().parse_args(argv)
+    args.argv = argv
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+
+    from reddit_scraper.logging_setup import setup_logging
+
+    setup_logging(args.log_level or "INFO", args.log_file)
+
+    reporter = profiler = None
+    if args.metrics_json or args.metrics_prom:
+        from reddit_scraper.core.metrics import MetricsReporter
+
+        reporter = MetricsReporter(json_path=args.metrics_json, prom_path=args.metrics_prom,
+                                   interval=args.metrics_interval).start()
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        args.func(args)
+    finally:
+        if profiler is not None:
+            import pstats
+
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(15)
+            lg.info("Profile written to %s (python -m pstats %s)", args.profile, args.profile)
+        if reporter is not None:
+            reporter.stop()
+
+
 if __name__ == "__main__":
     main()
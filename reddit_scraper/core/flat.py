@@ -0,0 +1,244 @@
+# reddit_scraper/core/flat.py
+"""
+Flat, columnar layout for one thread's comments.
+
+A ``CommentTable`` stores comments in depth-first pre-order as parallel
+arrays – parent row, depth, score, created_utc, interned author – plus one
+UTF-8 body buffer addressed by offsets. A thread costs a handful of arrays
+instead of one dict (or pydantic object) per comment, and nothing here
+recurses, so arbitrarily deep reply chains are fine.
+
+Conversion to and from the nested ``comments`` list of the NDJSON records is
+lossless (field values, sibling order and orphaned replies are preserved).
+On disk a table is a small JSON header followed by the raw arrays
+(``to_bytes`` / ``from_bytes``).
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from reddit_scraper.core import jsonio
+
+NO_PARENT = -1  # parent row of a top-level (or orphaned) comment
+NO_AUTHOR = -1  # deleted account
+
+_MAGIC = b"RSCT1\n"
+_HEADER = struct.Struct("<I")
+
+
+class CommentTable:
+    """Comments of one thread as parallel arrays, rows in DFS pre-order."""
+
+    __slots__ = (
+        "link_id", "ids", "parent", "depth", "score", "created_utc", "author",
+        "authors", "body_offsets", "bodies", "root_parent_ids",
+        "_author_index", "_children",
+    )
+
+    def __init__(self, link_id: Optional[str] = None) -> None:
+        self.link_id = link_id
+        self.ids: List[str] = []
+        self.parent = array("i")        # row of the parent comment, NO_PARENT for roots
+        self.depth = array("i")
+        self.score = array("q")
+        self.created_utc = array("q")
+        self.author = array("i")        # index into ``authors``, NO_AUTHOR if deleted
+        self.authors: List[str] = []
+        self.body_offsets = array("q", [0])  # body i = bodies[off[i]:off[i + 1]]
+        self.bodies = bytearray()
+        # parent_id of rows without a parent row: the post, or a comment outside the table
+        self.root_parent_ids: Dict[int, str] = {}
+        self._author_index: Dict[str, int] = {}
+        self._children: Optional[Tuple[array, array]] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # --------- Builders ------------------------------------------------
+
+    @classmethod
+    def from_nested(cls, comments: List[Dict[str, Any]]) -> "CommentTable":
+        """From the nested ``comments`` list of an NDJSON record."""
+        table = cls()
+        stack: List[Tuple[Dict[str, Any], int]] = [(c, NO_PARENT) for c in reversed(comments)]
+        while stack:
+            c, parent = stack.pop()
+            row = table._append(
+                c["id"], parent, c["parent_id"], c["link_id"], c["depth"], c["score"],
+                c["created_utc"], c.get("author"), c["body"],
+            )
+            stack.extend((r, row) for r in reversed(c.get("replies") or ()))
+        return table
+
+    # --------- Access --------------------------------------------------
+
+    def body(self, row: int) -> str:
+        return self.bodies[self.body_offsets[row]:self.body_offsets[row + 1]].decode("utf-8")
+
+    def author_name(self, row: int) -> Optional[str]:
+        a = self.author[row]
+        return None if a == NO_AUTHOR else self.authors[a]
+
+    def parent_id(self, row: int) -> str:
+        p = self.parent[row]
+        return self.root_parent_ids[row] if p == NO_PARENT else f"t1_{self.ids[p]}"
+
+    def row(self, row: int) -> Dict[str, Any]:
+        """One comment as a dict in the NDJSON shape, with empty ``replies``."""
+        return {
+            "id": self.ids[row],
+            "parent_id": self.parent_id(row),
+            "link_id": self.link_id,
+            "author": self.author_name(row),
+            "body": self.body(row),
+            "created_utc": self.created_utc[row],
+            "score": self.score[row],
+            "depth": self.depth[row],
+            "replies": [],
+        }
+
+    def roots(self) -> List[int]:
+        return [i for i, p in enumerate(self.parent) if p == NO_PARENT]
+
+    def children(self, row: int) -> array:
+        """Child rows of ``row`` (``NO_PARENT`` → top-level rows), in order."""
+        start, child = self._child_index()
+        return child[start[row + 1]:start[row + 2]]
+
+    # --------- Traversal -----------------------------------------------
+
+    def dfs(self) -> Iterator[int]:
+        """Rows in depth-first pre-order (storage order)."""
+        return iter(range(len(self)))
+
+    def bfs(self) -> Iterator[int]:
+        """Rows level by level, siblings in order."""
+        queue = deque(self.children(NO_PARENT))
+        while queue:
+            row = queue.popleft()
+            yield row
+            queue.extend(self.children(row))
+
+    # --------- Conversion ----------------------------------------------
+
+    def to_nested(self) -> List[Dict[str, Any]]:
+        """Back to the nested ``comments`` list of an NDJSON record."""
+        top: List[Dict[str, Any]] = []
+        nodes: List[Dict[str, Any]] = []
+        for i in range(len(self)):
+            node = self.row(i)
+            nodes.append(node)
+            p = self.parent[i]
+            (top if p == NO_PARENT else nodes[p]["replies"]).append(node)
+        return top
+
+    def to_bytes(self) -> bytes:
+        header = jsonio.dumps({
+            "n": len(self),
+            "link_id": self.link_id,
+            "byteorder": sys.byteorder,
+            "root_parent_ids": {str(k): v for k, v in self.root_parent_ids.items()},
+            "n_authors": len(self.authors),
+        })
+        parts = [_MAGIC, _HEADER.pack(len(header)), header]
+        parts += [a.tobytes() for a in self._arrays()]
+        ids = "\n".join(self.ids).encode("ascii")
+        authors = "\n".join(self.authors).encode("utf-8")
+        parts += [_HEADER.pack(len(ids)), ids, _HEADER.pack(len(authors)), authors, self.bodies]
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CommentTable":
+        view = memoryview(data)
+        if bytes(view[:len(_MAGIC)]) != _MAGIC:
+            raise ValueError("not a comment table")
+        pos = len(_MAGIC)
+
+        def chunk(size: int) -> memoryview:
+            nonlocal pos
+            out = view[pos:pos + size]
+            pos += size
+            return out
+
+        head = jsonio.loads(bytes(chunk(_HEADER.unpack(chunk(_HEADER.size))[0])))
+        n = head["n"]
+        table = cls(head["link_id"])
+        for arr in table._arrays():
+            del arr[:]
+            count = n + 1 if arr is table.body_offsets else n
+            arr.frombytes(chunk(count * arr.itemsize))
+            if head["byteorder"] != sys.byteorder:
+                arr.byteswap()
+        ids = bytes(chunk(_HEADER.unpack(chunk(_HEADER.size))[0])).decode("ascii")
+        authors = bytes(chunk(_HEADER.unpack(chunk(_HEADER.size))[0])).decode("utf-8")
+        table.ids = ids.split("\n") if n else []
+        table.authors = authors.split("\n") if head["n_authors"] else []
+        table._author_index = {a: i for i, a in enumerate(table.authors)}
+        table.bodies = bytearray(view[pos:])
+        table.root_parent_ids = {int(k): v for k, v in head["root_parent_ids"].items()}
+        return table
+
+    # --------- Internals -----------------------------------------------
+
+    def _arrays(self) -> Tuple[array, ...]:
+        return (self.parent, self.depth, self.score, self.created_utc, self.author,
+                self.body_offsets)
+
+    def _append(
+        self,
+        cid: str,
+        parent: int,
+        parent_id: str,
+        link_id: str,
+        depth: int,
+        score: int,
+        created_utc: int,
+        author: Optional[str],
+        body: str,
+    ) -> int:
+        if self.link_id is None:
+            self.link_id = link_id
+        elif link_id != self.link_id:
+            raise ValueError(f"comment {cid} belongs to {link_id}, table holds {self.link_id}")
+        row = len(self.ids)
+        self.ids.append(cid)
+        self.parent.append(parent)
+        if parent == NO_PARENT:
+            self.root_parent_ids[row] = parent_id
+        self.depth.append(depth)
+        self.score.append(score)
+        self.created_utc.append(created_utc)
+        if author is None:
+            self.author.append(NO_AUTHOR)
+        else:
+            a = self._author_index.get(author)
+            if a is None:
+                a = self._author_index[author] = len(self.authors)
+                self.authors.append(author)
+            self.author.append(a)
+        self.bodies += body.encode("utf-8")
+        self.body_offsets.append(len(self.bodies))
+        self._children = None
+        return row
+
+    def _child_index(self) -> Tuple[array, array]:
+        """CSR child lists; slot 0 holds the roots, slot r + 1 the children of row r."""
+        if self._children is None:
+            n = len(self)
+            counts = array("q", bytes(8 * (n + 2)))
+            for p in self.parent:
+                counts[p + 2] += 1
+            for i in range(1, n + 2):
+                counts[i] += counts[i - 1]
+            child = array("i", bytes(4 * n))
+            fill = array("q", counts)
+            for row, p in enumerate(self.parent):  # storage order keeps siblings in order
+                child[fill[p + 1]] = row
+                fill[p + 1] += 1
+            self._children = (counts, child)
+        return self._children
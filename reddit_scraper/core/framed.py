@@ -0,0 +1,408 @@
+# reddit_scraper/core/framed.py
+"""
+Compressed, seekable NDJSON.
+
+``*.ndjson.zst`` / ``*.ndjson.gz`` files are a sequence of independent
+compressed frames (zstd frames / gzip members) of whole records, so plain
+``zstdcat`` / ``zcat`` read them as ordinary NDJSON. A sidecar
+``<file>.fidx`` lists every frame as fixed-size ``(offset, length,
+first_record, records)`` entries, giving random access to any frame and
+letting readers decompress frames in parallel.
+
+Appends are crash-safe: a frame's index entry is written after its bytes and
+both are fsynced together, and re-opening a file for append truncates it back
+to the end of its last indexed, readable frame. A missing index is rebuilt by
+scanning the frames.
+
+Every function here also accepts plain ``*.ndjson`` files.
+"""
+
+from __future__ import annotations
+
+import bisect
+import gzip
+import logging
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+FRAME_RECORDS = 1_000
+INDEX_SUFFIX = ".fidx"
+_ENTRY = struct.Struct("<QQQQ")
+_READ_CHUNK = 1 << 20
+
+
+class Frame(NamedTuple):
+    offset: int        # byte offset of the compressed frame
+    length: int        # compressed size
+    first: int         # number of the frame's first record in the file
+    records: int
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.length
+
+
+# --------- codecs ------------------------------------------------------------ #
+class _Codec:
+    name = ""
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decompress(self, frame: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decompressor(self) -> Any:
+        """Incremental one-frame decompressor with ``eof`` / ``unused_data``."""
+        raise NotImplementedError
+
+
+class _Gzip(_Codec):
+    name = "gzip"
+
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=6, mtime=0)
+
+    def decompress(self, frame: bytes) -> bytes:
+        return gzip.decompress(frame)
+
+    def decompressor(self) -> Any:
+        return zlib.decompressobj(wbits=31)
+
+
+class _Zstd(_Codec):
+    name = "zstd"
+
+    def __init__(self) -> None:
+        if zstandard is None:
+            raise RuntimeError("zstd output requires the 'zstandard' package")
+        self._cctx = zstandard.ZstdCompressor(level=3)
+        self._dctx = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._cctx.compress(data)
+
+    def decompress(self, frame: bytes) -> bytes:
+        return self._dctx.decompress(frame)
+
+    def decompressor(self) -> Any:
+        return self._dctx.decompressobj()
+
+
+_SUFFIXES = {".gz": _Gzip, ".zst": _Zstd}
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def codec_for(path: str | Path) -> Optional[_Codec]:
+    """Codec implied by the file suffix, ``None`` for plain NDJSON."""
+    cls = _SUFFIXES.get(Path(path).suffix)
+    return cls() if cls else None
+
+
+def index_path(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+# --------- index ------------------------------------------------------------- #
+def read_index(path: str | Path) -> Optional[List[Frame]]:
+    """Frames listed in the sidecar, or ``None`` if there is no sidecar."""
+    try:
+        raw = index_path(path).read_bytes()
+    except FileNotFoundError:
+        return None
+    usable = len(raw) - len(raw) % _ENTRY.size  # ignore a torn trailing entry
+    return [Frame(*_ENTRY.unpack_from(raw, pos)) for pos in range(0, usable, _ENTRY.size)]
+
+
+def scan_frames(path: str | Path) -> List[Frame]:
+    """Find frame boundaries by decompressing; stops at the first torn frame."""
+    codec = codec_for(path)
+    if codec is None:
+        raise ValueError(f"{path} is not a compressed NDJSON file")
+    frames: List[Frame] = []
+    offset = first = 0
+    with open(path, "rb") as fp:
+        pending = b""
+        while True:
+            d = codec.decompressor()
+            consumed = records = 0
+            data = pending
+            pending = b""
+            try:
+                while True:
+                    if not data:
+                        data = fp.read(_READ_CHUNK)
+                        if not data:
+                            return frames  # EOF (mid-frame → torn tail is ignored)
+                    out = d.decompress(data)
+                    records += out.count(b"\n")
+                    if d.eof:
+                        pending = d.unused_data
+                        consumed += len(data) - len(pending)
+                        break
+                    consumed += len(data)
+                    data = b""
+            except Exception as exc:  # zlib.error / zstandard.ZstdError → torn or corrupt
+                logger.warning("%s: unreadable frame at byte %d (%s)", path, offset, exc)
+                return frames
+            frames.append(Frame(offset, consumed, first, records))
+            offset += consumed
+            first += records
+
+
+def load_frames(path: str | Path) -> List[Frame]:
+    frames = read_index(path)
+    return frames if frames is not None else scan_frames(path)
+
+
+def read_frame(path: str | Path, frame: Frame, codec: Optional[_Codec] = None) -> bytes:
+    codec = codec or codec_for(path)
+    with open(path, "rb") as fp:
+        fp.seek(frame.offset)
+        return codec.decompress(fp.read(frame.length))
+
+
+# --------- reading ----------------------------------------------------------- #
+def iter_lines(path: str | Path) -> Iterator[bytes]:
+    """Every record line of a plain or compressed NDJSON file."""
+    size = os.path.getsize(path)
+    yield from iter_range(path, 0, size)
+
+
+def split_ranges(path: str | Path, n: int) -> List[Tuple[int, int]]:
+    """
+    Cut ``path`` into ≤ ``n`` byte ranges starting on record (plain) or frame
+    (compressed) boundaries, for ``iter_range`` in parallel workers.
+    """
+    size = Path(path).stat().st_size
+    if n <= 1 or size == 0:
+        return [(0, size)]
+    if codec_for(path) is not None:
+        frames = load_frames(path)
+        if not frames:
+            return [(0, size)]
+        offsets = [f.offset for f in frames]
+        cuts = [0]
+        for k in range(1, n):
+            i = bisect.bisect_left(offsets, size * k // n)
+            if i == len(offsets):
+                break
+            if offsets[i] > cuts[-1]:
+                cuts.append(offsets[i])
+        cuts.append(frames[-1].end)
+        return list(zip(cuts, cuts[1:]))
+
+    cuts = [0]
+    with open(path, "rb") as fp:
+        for k in range(1, n):
+            target = max(size * k // n, cuts[-1])
+            fp.seek(target)
+            if target:
+                fp.readline()  # finish the line the cut landed in
+            pos = fp.tell()
+            if pos >= size:
+                break
+            if pos > cuts[-1]:
+                cuts.append(pos)
+    cuts.append(size)
+    return list(zip(cuts, cuts[1:]))
+
+
+def iter_range(path: str | Path, start: int, end: int) -> Iterator[bytes]:
+    """Record lines that begin (plain) / whose frame begins (compressed) in ``[start, end)``."""
+    codec = codec_for(path)
+    with open(path, "rb") as fp:
+        if codec is None:
+            fp.seek(start)
+            pos = start
+            while pos < end:
+                line = fp.readline()
+                if not line:
+                    return
+                pos += len(line)
+                if line.strip():
+                    yield line
+            return
+
+        for frame in load_frames(path):
+            if frame.offset < start:
+                continue
+            if frame.offset >= end:
+                return
+            fp.seek(frame.offset)
+            data = codec.decompress(fp.read(frame.length))
+            for line in data.splitlines(keepends=True):
+                if line.strip():
+                    yield line
+
+
+def iter_blocks(
+    path: str | Path, start: int = 0, *, records: int = FRAME_RECORDS
+) -> Iterator[Tuple[List[bytes], int]]:
+    """
+    ``(lines, resume_at)`` blocks from byte ``start`` on – about ``records``
+    lines each (plain) or one frame each (compressed). ``resume_at`` is a
+    valid ``start`` for a later call; an unfinished trailing line is left out.
+    """
+    codec = codec_for(path)
+    with open(path, "rb") as fp:
+        if codec is None:
+            fp.seek(start)
+            pos = last = start
+            block: List[bytes] = []
+            for line in fp:
+                if not line.endswith(b"\n"):
+                    break
+                pos += len(line)
+                if line.strip():
+                    block.append(line)
+                    if len(block) >= records:
+                        yield block, pos
+                        block, last = [], pos
+            if pos > last:
+                yield block, pos
+            return
+
+        for frame in load_frames(path):
+            if frame.offset < start:
+                continue
+            fp.seek(frame.offset)
+            data = codec.decompress(fp.read(frame.length))
+            yield [ln for ln in data.splitlines(keepends=True) if ln.strip()], frame.end
+
+
+# --------- writing ----------------------------------------------------------- #
+class FramedWriter:
+    """Append records to a compressed NDJSON file, one frame per ``frame_records``."""
+
+    def __init__(self, path: str | Path, *, frame_records: int = FRAME_RECORDS) -> None:
+        self.path = Path(path)
+        codec = codec_for(self.path)
+        if codec is None:
+            raise ValueError(f"{path}: expected a .gz or .zst suffix")
+        self.codec = codec
+        self.frame_records = max(1, frame_records)
+
+        self._frames = self._recover()
+        self._next_record = self._frames[-1].first + self._frames[-1].records if self._frames else 0
+        self._fp = self.path.open("ab")
+        self._idx = index_path(self.path).open("ab")
+        self._buf: List[bytes] = []
+
+    # --------- Public API ----------------------------------------
+
+    def write(self, line: bytes) -> None:
+        """Append one record (``line`` must end with a newline)."""
+        self._buf.append(line)
+        if len(self._buf) >= self.frame_records:
+            self.end_frame()
+
+    def end_frame(self) -> None:
+        """Compress buffered records into a frame and append it (not yet synced)."""
+        if not self._buf:
+            return
+        blob = self.codec.compress(b"".join(self._buf))
+        frame = Frame(self._fp.tell(), len(blob), self._next_record, len(self._buf))
+        self._fp.write(blob)
+        self._idx.write(_ENTRY.pack(*frame))
+        self._frames.append(frame)
+        self._next_record += frame.records
+        self._buf.clear()
+
+    def sync(self) -> None:
+        """Close the open frame and make data, then index, durable."""
+        self.end_frame()
+        self._fp.flush()
+        os.fsync(self._fp.fileno())
+        self._idx.flush()
+        os.fsync(self._idx.fileno())
+
+    def close(self) -> None:
+        if self._fp.closed:
+            return
+        try:
+            self.sync()
+        finally:
+            self._fp.close()
+            self._idx.close()
+
+    @property
+    def frames(self) -> List[Frame]:
+        return list(self._frames)
+
+    # --------- Internals -----------------------------------------
+
+    def _recover(self) -> List[Frame]:
+        """Frames that survived the last run; truncate data + index to match."""
+        if not self.path.exists():
+            index_path(self.path).unlink(missing_ok=True)
+            return []
+        size = self.path.stat().st_size
+        frames = read_index(self.path)
+        if frames is None:
+            frames = scan_frames(self.path) if size else []
+        while frames and frames[-1].end > size:
+            frames.pop()
+        while frames and not self._readable(frames[-1]):
+            frames.pop()
+
+        end = frames[-1].end if frames else 0
+        if size > end:
+            logger.warning("%s: dropping %d byte(s) of unfinished frame", self.path, size - end)
+            with self.path.open("r+b") as fp:
+                fp.truncate(end)
+        index_path(self.path).write_bytes(b"".join(_ENTRY.pack(*f) for f in frames))
+        return frames
+
+    def _readable(self, frame: Frame) -> bool:
+        try:
+            read_frame(self.path, frame, self.codec)
+            return True
+        except Exception:  # any decoder error → torn frame
+            return False
+
+    # --------- Context-manager sugar -----------------------------
+
+    def __enter__(self) -> "FramedWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def repair_plain_tail(path: str | Path) -> None:
+    """Cut a plain NDJSON file back to its last complete line (after a crash)."""
+    path = Path(path)
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return
+    if not size:
+        return
+    with path.open("r+b") as fp:
+        fp.seek(size - 1)
+        if fp.read(1) == b"\n":
+            return
+        pos = size
+        while pos > 0:
+            step = min(_READ_CHUNK, pos)
+            fp.seek(pos - step)
+            chunk = fp.read(step)
+            nl = chunk.rfind(b"\n")
+            if nl >= 0:
+                pos = pos - step + nl + 1
+                break
+            pos -= step
+        logger.warning("%s: dropping %d byte(s) of unfinished record", path, size - pos)
+        fp.truncate(pos)
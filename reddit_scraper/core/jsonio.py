@@ -0,0 +1,33 @@
+# reddit_scraper/core/jsonio.py
+"""
+JSON encode/decode for NDJSON records.
+
+Uses ``orjson`` when installed (``pip install reddit-scraper[fast]``) and the
+stdlib otherwise. Both produce compact UTF-8 with non-ASCII kept as-is, so
+files written either way are interchangeable.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON bytes (no trailing newline)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,282 @@
+# reddit_scraper/core/metrics.py
+"""
+Process-wide counters, gauges and latency histograms.
+
+Instrumented code calls the module-level shortcuts – ``incr``, ``observe``,
+``timer`` – which update the default ``REGISTRY`` under one lock (a dict
+update or a bisect per call). ``MetricsReporter`` periodically writes a
+snapshot as JSON and/or as a Prometheus textfile (for node_exporter's
+textfile collector); both files are replaced atomically.
+
+Histograms have fixed buckets: ``SECONDS`` for latencies (the default) and
+``SIZES`` for counts such as comments per post. Quantiles in the JSON
+snapshot are bucket upper bounds, good enough to spot a slow stage.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+logger = logging.getLogger(__name__)
+
+SECONDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+           30.0, 60.0, 120.0)
+SIZES = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000, 50_000)
+NAMESPACE = "reddit_scraper"
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus layout) with sum, min and max."""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, buckets: Sequence[float] = SECONDS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q`` quantile (``max`` for +Inf)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Registry:
+    """Named counters, gauges and histograms; safe to share between threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._buckets: Dict[str, Sequence[float]] = {}
+        self._collectors: List[Tuple[str, Callable[[], Mapping[str, float]]]] = []
+        self.started = time.time()
+
+    # --------- Public API ----------------------------------------
+
+    def incr(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def set(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def histogram(self, name: str, buckets: Sequence[float]) -> None:
+        """Declare non-default buckets for ``name`` (before its first ``observe``)."""
+        with self._lock:
+            self._buckets[name] = buckets
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            h = self._histograms.get(name)
+            if h is None:
+                h = self._histograms[name] = Histogram(self._buckets.get(name, SECONDS))
+            h.observe(value)
+
+    def timer(self, name: str) -> "_Timer":
+        """``with timer("x_seconds"): …`` records the block's wall time."""
+        return _Timer(self, name)
+
+    def collect(self, prefix: str, source: Callable[[], Mapping[str, float]]) -> None:
+        """Report ``source()``'s values as counters ``<prefix>_<key>`` in every snapshot."""
+        with self._lock:
+            self._collectors = [c for c in self._collectors if c[0] != prefix]
+            self._collectors.append((prefix, source))
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {k: h.to_dict() for k, h in self._histograms.items()}
+            collectors = list(self._collectors)
+        for prefix, source in collectors:
+            counters.update((f"{prefix}_{k}", v) for k, v in source().items())
+        return {
+            "time": int(time.time()),
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "counters": dict(sorted(counters.items())),
+            "gauges": dict(sorted(gauges.items())),
+            "histograms": dict(sorted(histograms.items())),
+        }
+
+    def to_prometheus(self, namespace: str = NAMESPACE) -> str:
+        """Text exposition format (counters get the ``_total`` suffix)."""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {
+                k: (h.buckets, list(h.counts), h.count, h.sum) for k, h in self._histograms.items()
+            }
+            collectors = list(self._collectors)
+        for prefix, source in collectors:
+            counters.update((f"{prefix}_{k}", v) for k, v in source().items())
+
+        out: List[str] = []
+        for name, value in sorted(counters.items()):
+            metric = f"{namespace}_{name}_total"
+            out += [f"# TYPE {metric} counter", f"{metric} {_num(value)}"]
+        for name, value in sorted(gauges.items()):
+            metric = f"{namespace}_{name}"
+            out += [f"# TYPE {metric} gauge", f"{metric} {_num(value)}"]
+        for name, (buckets, counts, count, total) in sorted(histograms.items()):
+            metric = f"{namespace}_{name}"
+            out.append(f"# TYPE {metric} histogram")
+            running = 0
+            for le, n in zip([*map(_num, buckets), "+Inf"], counts):
+                running += n
+                out.append(f'{metric}_bucket{{le="{le}"}} {running}')
+            out += [f"{metric}_sum {_num(total)}", f"{metric}_count {count}"]
+        return "\n".join(out) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self._collectors.clear()
+            self.started = time.time()
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "t0")
+
+    def __init__(self, registry: Registry, name: str) -> None:
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self) -> "_Timer":
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.registry.observe(self.name, time.perf_counter() - self.t0)
+
+
+REGISTRY = Registry()
+REGISTRY.histogram("comments_per_post", SIZES)
+
+incr = REGISTRY.incr
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+collect = REGISTRY.collect
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator form of ``timer``."""
+    def deco(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with REGISTRY.timer(name):
+                return fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return deco
+
+
+class MetricsReporter:
+    """Write ``registry`` snapshots every ``interval`` seconds and once more on ``stop``."""
+
+    def __init__(
+        self,
+        registry: Registry = REGISTRY,
+        *,
+        json_path: Optional[str | Path] = None,
+        prom_path: Optional[str | Path] = None,
+        interval: float = 10.0,
+    ) -> None:
+        self.registry = registry
+        self.json_path = Path(json_path) if json_path else None
+        self.prom_path = Path(prom_path) if prom_path else None
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="metrics", daemon=True)
+
+    # --------- Public API ----------------------------------------
+
+    def start(self) -> "MetricsReporter":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.write()
+
+    def write(self) -> None:
+        try:
+            if self.json_path:
+                _replace(self.json_path, json.dumps(self.registry.snapshot(), indent=2))
+            if self.prom_path:
+                _replace(self.prom_path, self.registry.to_prometheus())
+        except OSError as exc:  # metrics must never take the scrape down
+            logger.warning("Could not write metrics: %s", exc)
+
+    # --------- Internals -----------------------------------------
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    # --------- Context-manager sugar -----------------------------
+
+    def __enter__(self) -> "MetricsReporter":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+# --------- helpers --------------------------------------------------------- #
+def _num(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _replace(path: Path, text: str) -> None:
+    """Write via a temp file + rename so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
@@ -1,12 +1,13 @@
 # reddit_scraper/core/models.py
 from __future__ import annotations
 
-import json
 from pathlib import Path
-from typing import List, Optional, Iterator, Union
+from typing import Any, Dict, List, Optional, Iterator, Union
 
 from pydantic import BaseModel, Field, ConfigDict
 
+from reddit_scraper.core import framed, jsonio
+
 
 class Comment(BaseModel):
     id: str
@@ -33,6 +34,8 @@ class Submission(BaseModel):
     link_flair_text: Optional[str] = None
     url: str
     permalink: str
+    fetched_at: Optional[int] = None  # unix time the tree was downloaded
+    complete: Optional[bool] = None   # False if "more comments" stubs were left unexpanded
     comments: List[Comment]
 
     # ------- Factory --------------------------------------------------- #
@@ -45,8 +48,61 @@ class Submission(BaseModel):
 
     # ------- Serialization -------------------------------------------- #
     def to_json_line(self) -> str:
+        """``to_json_bytes`` as text – the same compact separators as every writer."""
+        return self.to_json_bytes().decode("utf-8")
+
+    def to_json_bytes(self, extra: Optional[Dict[str, Any]] = None) -> bytes:
         obj = self.dict()
-        return json.dumps(obj, ensure_ascii=False)
+        if extra:
+            obj.update(extra)
+        return jsonio.dumps(obj)
+
+
+class RawSubmission:
+    """
+    Unvalidated fetch result – the fast path.
+
+    Wraps the raw tree from ``RedditClient.fetch_submission_tree`` and encodes
+    it straight to NDJSON bytes, without building a ``Comment`` per node. The
+    JSON shape is the same as ``Submission``'s.
+    """
+
+    __slots__ = ("data", "comments")
+
+    def __init__(self, raw_tree: dict) -> None:
+        self.data: Dict[str, Any] = raw_tree["submission"]
+        self.comments: List[Dict[str, Any]] = raw_tree["comments"]
+
+    @property
+    def id(self) -> str:
+        return self.data["id"]
+
+    @property
+    def created_utc(self) -> int:
+        return self.data["created_utc"]
+
+    @property
+    def score(self) -> int:
+        return self.data["score"]
+
+    @property
+    def num_comments(self) -> int:
+        return self.data["num_comments"]
+
+    @property
+    def fetched_at(self) -> Optional[int]:
+        return self.data.get("fetched_at")
+
+    def dict(self) -> Dict[str, Any]:
+        """The record as a plain dict, shaped like ``Submission.dict()``."""
+        return {**self.data, "comments": self.comments}
+
+    def to_json_bytes(self, extra: Optional[Dict[str, Any]] = None) -> bytes:
+        return jsonio.dumps({**self.data, "comments": self.comments, **(extra or {})})
+
+
+# either flavour can be handed to the writer
+Record = Union[Submission, RawSubmission]
 
 
 # -------- I/O helper ---------------------------------------------------- #
@@ -55,8 +111,16 @@ def export_ndjson(
     outfile: Union[str, Path],
     append: bool = False,
 ) -> None:
-    mode = "a" if append else "w"
+    """``.gz`` / ``.zst`` outfiles are written as indexed compressed frames."""
     path = Path(outfile)
-    with path.open(mode, encoding="utf-8") as fp:
+    if framed.codec_for(path) is not None:
+        if not append:
+            path.unlink(missing_ok=True)
+        with framed.FramedWriter(path) as out:
+            for sub in submissions:
+                out.write(sub.to_json_bytes() + b"\n")
+        return
+
+    with path.open("ab" if append else "wb") as fp:
         for sub in submissions:
-            fp.write(sub.to_json_line() + "\n")
+            fp.write(sub.to_json_bytes() + b"\n")
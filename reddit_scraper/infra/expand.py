@@ -0,0 +1,187 @@
+# reddit_scraper/infra/expand.py
+"""
+Batched "load more comments" expansion.
+
+``replace_more(limit=None)`` resolves MoreComments stubs one at a time. Here
+all stubs of a thread are collected first and their child IDs are packed
+into ``/api/morechildren`` calls of up to 100 IDs each, regardless of which
+stub they came from. Stubs found in the answers join the same queue.
+
+Comments are kept flat while loading and nested only once at the end, so
+neither collection nor assembly recurses.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from functools import partial
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+import praw
+from praw.models import MoreComments
+
+from reddit_scraper.core import metrics
+
+logger = logging.getLogger(__name__)
+
+MORECHILDREN_BATCH = 100  # Reddit's per-call limit on child IDs
+
+
+class ExpansionLimits(NamedTuple):
+    """Knobs to trade completeness for latency (``None`` = unlimited)."""
+
+    max_expansions: Optional[int] = None  # API calls spent on stubs per thread
+    max_depth: Optional[int] = None       # ignore stubs deeper than this
+    min_stub_size: int = 0                # ignore stubs hiding fewer comments
+
+
+class _Stub(NamedTuple):
+    children: List[str]      # comment ID36s still to load
+    count: int               # comments hidden behind the stub (Reddit's estimate)
+    depth: int
+    more: MoreComments       # kept for "continue this thread" stubs
+
+
+def comment_fields(c: Any) -> Dict:
+    """PRAW Comment → dict (without replies)."""
+    return {
+        "id": c.id,
+        "parent_id": c.parent_id,
+        "link_id": c.link_id,
+        "author": c.author.name if c.author else None,
+        "body": c.body,
+        "created_utc": int(c.created_utc),
+        "score": c.score,
+        "depth": c.depth,
+        "replies": [],
+    }
+
+
+class CommentExpander:
+    """Load a submission's full comment tree with batched morechildren calls."""
+
+    def __init__(
+        self,
+        reddit: praw.Reddit,
+        call: Callable[[Callable[[], Any]], Any],
+        limits: Optional[ExpansionLimits] = None,
+    ) -> None:
+        self.reddit = reddit
+        self._retry_call = call  # wraps each API call (retry policy)
+        self.limits = limits or ExpansionLimits()
+        self._api_seconds = 0.0
+
+    def expand(self, sub: Any) -> Tuple[List[Dict], bool]:
+        """Return ``(nested comment dicts, complete)`` for a PRAW Submission."""
+        t0 = time.perf_counter()
+        self._api_seconds = 0.0
+        nodes: Dict[str, Dict] = {}  # fullname → comment dict, in load order
+        stubs: Deque[_Stub] = deque()
+        top = list(sub.comments)  # lazy PRAW object: this is the thread's first request
+        self._api_seconds += time.perf_counter() - t0
+        self._collect(top, nodes, stubs)
+
+        complete = True
+        calls = 0
+        while stubs:
+            if self.limits.max_expansions is not None and calls >= self.limits.max_expansions:
+                complete = False
+                break
+
+            stub = stubs.popleft()
+            if not self._wanted(stub):
+                complete = False
+                continue
+
+            if not stub.children:  # "continue this thread" → load the parent's replies
+                stub.more.submission = sub
+                forest = self._call(partial(stub.more.comments, update=True))
+                calls += 1
+                self._collect(list(forest), nodes, stubs)
+                continue
+
+            batch = list(stub.children[:MORECHILDREN_BATCH])
+            if len(stub.children) > MORECHILDREN_BATCH:
+                stubs.appendleft(stub._replace(children=stub.children[MORECHILDREN_BATCH:]))
+            # top the batch up with children of the following stubs
+            while stubs and len(batch) < MORECHILDREN_BATCH:
+                nxt = stubs[0]
+                if not nxt.children or not self._wanted(nxt):
+                    break
+                room = MORECHILDREN_BATCH - len(batch)
+                stubs.popleft()
+                batch.extend(nxt.children[:room])
+                if len(nxt.children) > room:
+                    stubs.appendleft(nxt._replace(children=nxt.children[room:]))
+
+            things = self._call(
+                partial(
+                    self.reddit.post,
+                    "api/morechildren/",
+                    data={
+                        "children": ",".join(batch),
+                        "link_id": sub.fullname,
+                        "sort": sub.comment_sort,
+                    },
+                )
+            )
+            calls += 1
+            for thing in things:
+                thing.submission = sub
+            self._collect(things, nodes, stubs)
+
+        if stubs:
+            complete = False
+        tree = self._assemble(nodes)
+        # everything that was not an API call is PRAW object traversal + assembly
+        metrics.observe("expand_api_seconds", self._api_seconds)
+        metrics.observe("traverse_seconds", time.perf_counter() - t0 - self._api_seconds)
+        metrics.observe("comments_per_post", len(nodes))
+        metrics.incr("expansion_calls", calls)
+        logger.debug(
+            "t3_%s: %d comments, %d expansion call(s), complete=%s",
+            sub.id, len(nodes), calls, complete,
+        )
+        return tree, complete
+
+    # --------- Internals -----------------------------------------
+
+    def _call(self, fn: Callable[[], Any]) -> Any:
+        t0 = time.perf_counter()
+        try:
+            return self._retry_call(fn)
+        finally:
+            self._api_seconds += time.perf_counter() - t0
+
+    def _wanted(self, stub: _Stub) -> bool:
+        lim = self.limits
+        if lim.max_depth is not None and stub.depth > lim.max_depth:
+            return False
+        return not (stub.children and stub.count < lim.min_stub_size)
+
+    @staticmethod
+    def _collect(things: List[Any], nodes: Dict[str, Dict], stubs: Deque[_Stub]) -> None:
+        """Flatten Comments (and their loaded replies) into ``nodes``; queue stubs."""
+        stack = list(reversed(things))
+        while stack:
+            thing = stack.pop()
+            if isinstance(thing, MoreComments):
+                stubs.append(
+                    _Stub(list(thing.children), thing.count, getattr(thing, "depth", 0), thing)
+                )
+                continue
+            nodes[thing.fullname] = comment_fields(thing)
+            stack.extend(reversed(list(thing.replies)))
+
+    @staticmethod
+    def _assemble(nodes: Dict[str, Dict]) -> List[Dict]:
+        top: List[Dict] = []
+        for node in nodes.values():
+            parent = nodes.get(node["parent_id"])
+            if parent is not None:
+                parent["replies"].append(node)
+            else:  # direct reply to the post (or an orphan whose parent was dropped)
+                top.append(node)
+        return top
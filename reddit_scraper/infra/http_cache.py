@@ -0,0 +1,223 @@
+# reddit_scraper/infra/http_cache.py
+"""
+On-disk HTTP response cache wired under PRAW's requestor.
+
+Modes
+-----
+* ``record``      – serve fresh hits, fetch + store misses
+* ``replay``      – offline: serve hits only, misses become HTTP 404
+* ``passthrough`` – ignore the cache entirely
+
+Entries live in ``<root>/<key[:2]>/<key>.json.gz``, keyed by method, URL,
+query and form data (never by auth headers). ``ttl`` expires entries on
+read; ``max_bytes`` evicts least-recently-used entries after writes.
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from reddit_scraper.infra.ratelimit import LimitedSession, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+MODES = ("record", "replay", "passthrough")
+
+# a recorded token is stale by the time it is replayed against the live API
+_LIVE_ONLY_PATHS = ("/api/v1/access_token",)
+
+# rate-limit headers are dropped so replayed traffic doesn't throttle itself
+_KEPT_HEADERS = ("content-type", "location")
+
+
+class ResponseCache:
+    """Thread-safe directory of gzip'd response records."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # computed lazily on first eviction check
+
+    # --------- Public API ----------------------------------------
+
+    @staticmethod
+    def key(method: str, url: str, params: Any = None, data: Any = None) -> str:
+        parts = [method.upper(), url, _canonical(params), _canonical(data)]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        if self.ttl is not None and time.time() - stat.st_mtime > self.ttl:
+            self._remove(path)
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as fp:
+                record = json.load(fp)
+        except (OSError, ValueError):  # torn / corrupt entry
+            self._remove(path)
+            return None
+        os.utime(path, (time.time(), stat.st_mtime))  # atime = LRU clock
+        return record
+
+    def put(self, key: str, record: Dict) -> None:
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as fp:
+            fp.write(json.dumps(record).encode("utf-8"))
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp, path)
+        if self.max_bytes is not None:
+            with self._lock:
+                if self._size is None:
+                    self._size = sum(p.stat().st_size for p in self._entries())
+                else:
+                    self._size += path.stat().st_size - replaced
+                if self._size > self.max_bytes:
+                    self._evict()
+
+    # --------- Internals -----------------------------------------
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json.gz"
+
+    def _entries(self) -> Iterable[Path]:
+        return self.root.glob("*/*.json.gz")
+
+    def _remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries down to 90 % of ``max_bytes``. Lock held."""
+        assert self.max_bytes is not None and self._size is not None
+        target = int(self.max_bytes * 0.9)
+        entries = []
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((max(st.st_atime, st.st_mtime), st.st_size, p))
+        entries.sort()
+        removed = 0
+        for _, size, p in entries:
+            if self._size <= target:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                continue
+            self._size -= size
+            removed += 1
+        logger.debug("HTTP cache: evicted %d entr%s", removed, "y" if removed == 1 else "ies")
+
+
+class CachingSession(LimitedSession):
+    """``LimitedSession`` that consults a ``ResponseCache`` first; hits cost no budget."""
+
+    def __init__(self, limiter: RateLimiter, cache: ResponseCache, mode: str = "record") -> None:
+        if mode not in MODES:
+            raise ValueError(f"cache mode must be one of {MODES}, got {mode!r}")
+        super().__init__(limiter)
+        self.cache = cache
+        self.mode = mode
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> requests.Response:
+        if self.mode == "passthrough" or args:
+            return super().request(method, url, *args, **kwargs)
+
+        key = self.cache.key(method, url, kwargs.get("params"), kwargs.get("data"))
+        live_only = self.mode == "record" and url.endswith(_LIVE_ONLY_PATHS)
+        record = None if live_only else self.cache.get(key)
+        if record is not None:
+            return _to_response(record, method)
+        if self.mode == "replay":
+            logger.warning("Offline cache miss: %s %s", method, url)
+            return _miss(method, url)
+
+        response = super().request(method, url, **kwargs)
+        if 200 <= response.status_code < 300:
+            self.cache.put(key, _to_record(response))
+        return response
+
+
+# --------- helpers --------------------------------------------------------- #
+def _canonical(obj: Union[None, Mapping, Iterable[Tuple[Any, Any]], str, bytes]) -> str:
+    if obj is None:
+        return ""
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", "replace")
+    if isinstance(obj, str):
+        return obj
+    items = obj.items() if isinstance(obj, Mapping) else obj
+    return "&".join(f"{k}={v}" for k, v in sorted((str(k), str(v)) for k, v in items))
+
+
+def _to_record(response: requests.Response) -> Dict:
+    return {
+        "status": response.status_code,
+        "url": response.url,
+        "headers": {k: v for k, v in response.headers.items() if k.lower() in _KEPT_HEADERS},
+        "encoding": response.encoding,
+        "body": base64.b64encode(response.content).decode("ascii"),
+        "stored_at": time.time(),
+    }
+
+
+def _to_response(record: Dict, method: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = record["status"]
+    response.url = record["url"]
+    response.headers = CaseInsensitiveDict(record["headers"])
+    response.encoding = record.get("encoding")
+    response._content = base64.b64decode(record["body"])
+    response.reason = "OK (cached)"
+    response.request = requests.Request(method, record["url"]).prepare()
+    return response
+
+
+def _miss(method: str, url: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 404
+    response.url = url
+    response.headers = CaseInsensitiveDict({"content-type": "application/json", "x-cache": "miss"})
+    response._content = b'{"message": "Not in offline cache", "error": 404}'
+    response.reason = "Not Found (offline cache miss)"
+    response.request = requests.Request(method, url).prepare()
+    return response
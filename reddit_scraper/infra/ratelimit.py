@@ -0,0 +1,197 @@
+# reddit_scraper/infra/ratelimit.py
+"""
+Shared request budget for every RedditClient in the process.
+
+* ``RateLimiter``  – token bucket whose refill rate follows Reddit's
+  ``X-Ratelimit-Remaining`` / ``X-Ratelimit-Reset`` response headers
+* ``RetryPolicy``  – bounded retries with exponential backoff + full jitter
+* ``RateStats``    – thread-safe counters (requests, throttled waits, 429s,
+  retries, failed)
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Type, TypeVar
+
+import requests
+
+from reddit_scraper.core import metrics
+
+R = TypeVar("R")
+
+logger = logging.getLogger(__name__)
+
+
+class RateStats:
+    """Counters shared by the limiter and the retry policy."""
+
+    FIELDS = (
+        "requests", "throttled", "throttle_seconds", "rate_limited", "retries", "failed",
+    )
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: Dict[str, float] = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[name] += amount
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class RateLimiter:
+    """
+    Token bucket shared across threads (and PRAW instances).
+
+    The bucket starts at ``rate`` requests/second; every response re-tunes it so
+    the remaining budget is spread evenly over the rest of Reddit's window.
+    When the budget is exhausted, callers block until the window resets.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 5,
+        stats: Optional[RateStats] = None,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.stats = stats or RateStats()
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    # --------- Public API ----------------------------------------
+
+    def acquire(self) -> None:
+        """Take one token, sleeping as long as needed."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                delay = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+        self.stats.incr("requests")
+        if waited:
+            self.stats.incr("throttled")
+            self.stats.incr("throttle_seconds", waited)
+            metrics.observe("throttle_wait_seconds", waited)
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Re-tune the bucket from Reddit's rate-limit headers (if present)."""
+        try:
+            remaining = float(headers["x-ratelimit-remaining"])
+            reset = float(headers["x-ratelimit-reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if remaining < 1:
+                self._tokens = 0.0
+                self._blocked_until = now + reset
+                logger.debug("Rate budget exhausted – pausing %.0fs", reset)
+                return
+            self.rate = remaining / max(reset, 1.0)
+            self._tokens = min(self._tokens, remaining)
+
+    def penalize(self, seconds: float) -> None:
+        """Block everyone for ``seconds`` (e.g. after an HTTP 429)."""
+        with self._lock:
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self.stats.incr("rate_limited")  # the wait itself is counted by acquire()
+
+    # --------- Internals -----------------------------------------
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+
+class LimitedSession(requests.Session):
+    """``requests.Session`` that routes every call through a ``RateLimiter``."""
+
+    def __init__(self, limiter: RateLimiter) -> None:
+        super().__init__()
+        self.limiter = limiter
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> requests.Response:
+        self.limiter.acquire()
+        with metrics.timer("http_request_seconds"):
+            response = super().request(method, url, *args, **kwargs)
+        metrics.incr(f"http_responses_{response.status_code // 100}xx")
+        metrics.incr("http_bytes_received", len(response.content))
+        self.limiter.observe(response.headers)
+        if response.status_code == 429:
+            retry_after = response.headers.get("retry-after")
+            self.limiter.penalize(float(retry_after) if retry_after else 1.0)
+        return response
+
+
+class RetryError(Exception):
+    """Raised once a call has failed ``attempts`` times."""
+
+    def __init__(self, attempts: int, last: BaseException) -> None:
+        super().__init__(f"gave up after {attempts} attempt(s): {last!r}")
+        self.attempts = attempts
+        self.last = last
+
+
+class RetryPolicy:
+    """Retry ``retry_on`` errors with capped exponential backoff and full jitter."""
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 2.0,
+        max_delay: float = 120.0,
+        stats: Optional[RateStats] = None,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = stats or RateStats()
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(
+        self,
+        fn: Callable[..., R],
+        *args: Any,
+        retry_on: Tuple[Type[BaseException], ...],
+        give_up_on: Tuple[Type[BaseException], ...] = (),
+    ) -> R:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return fn(*args)
+            except give_up_on as exc:
+                self.stats.incr("failed")
+                raise RetryError(attempt, exc) from exc
+            except retry_on as exc:
+                if attempt >= self.max_attempts:
+                    self.stats.incr("failed")
+                    raise RetryError(attempt, exc) from exc
+                pause = self.delay(attempt)
+                logger.debug("Attempt %d failed (%r) – retrying in %.1fs", attempt, exc, pause)
+                self.stats.incr("retries")
+                metrics.incr("retry_sleep_seconds", pause)
+                time.sleep(pause)
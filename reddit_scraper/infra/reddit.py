@@ -1,28 +1,159 @@
 # reddit_scraper/infra/reddit.py
 from __future__ import annotations
 
+import json
 import os
 import time
 from datetime import datetime, timezone
-from typing import Dict, Iterator, List, Optional
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
 
 import praw
 from dotenv import load_dotenv
 from praw.exceptions import APIException, RedditAPIException
-from prawcore.exceptions import RequestException, ResponseException, ServerError
+from prawcore.exceptions import (
+    Forbidden,
+    NotFound,
+    Redirect,
+    RequestException,
+    ResponseException,
+    ServerError,
+    UnavailableForLegalReasons,
+)
+
+from reddit_scraper.core import metrics
+from reddit_scraper.infra.expand import CommentExpander, ExpansionLimits
+from reddit_scraper.infra.http_cache import CachingSession, ResponseCache
+from reddit_scraper.infra.ratelimit import LimitedSession, RateLimiter, RetryError, RetryPolicy
+
+# transient → retried with backoff; permanent → dead-lettered straight away
+TRANSIENT_ERRORS = (
+    APIException,
+    RedditAPIException,
+    RequestException,
+    ResponseException,
+    ServerError,
+)
+PERMANENT_ERRORS = (Forbidden, NotFound, Redirect, UnavailableForLegalReasons)
+
+INFO_BATCH = 100  # fullnames per /api/info call
+
+
+class ListingPage(NamedTuple):
+    items: List[Dict]        # in-range posts of this page, newest first
+    cursor: Optional[str]    # ``after`` fullname to resume from
+    last: bool               # nothing older left to walk
+
+
+def matches_filters(
+    item: Dict, *, min_score: Optional[int] = None, flairs: Optional[List[str]] = None
+) -> bool:
+    """Apply the CLI's ``--min-score`` / ``--flair`` filters to a listing item."""
+    if min_score and item["score"] < min_score:
+        return False
+    if flairs and (item["link_flair_text"] or "").lower() not in {f.lower() for f in flairs}:
+        return False
+    return True
+
+
+class Credentials(NamedTuple):
+    client_id: Optional[str]
+    client_secret: Optional[str]
+    user_agent: str = "idea_scraper/0.1"
+    username: Optional[str] = None   # only for "script" apps
+    password: Optional[str] = None
+
+
+def load_credential_pool(path: str | Path) -> List[Credentials]:
+    """
+    Read a JSON list of ``{"client_id", "client_secret"[, "user_agent",
+    "username", "password"]}`` objects – one Reddit app per worker.
+    """
+    entries = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path}: expected a non-empty JSON list of credentials")
+    pool = []
+    for i, entry in enumerate(entries):
+        try:
+            pool.append(Credentials(**entry))
+        except TypeError as exc:
+            raise ValueError(f"{path}: entry {i}: {exc}") from None
+    return pool
+
+
+def env_credentials(*, offline: bool = False) -> Credentials:
+    """
+    Credentials from the environment / ``.env``.
+
+    With ``REDDIT_CREDENTIALS_FILE`` set, entry ``REDDIT_CREDENTIALS_INDEX``
+    (modulo the pool size) of that pool file is used instead, so worker
+    processes started with different indexes get separate rate budgets.
+    """
+    pool_file = os.getenv("REDDIT_CREDENTIALS_FILE")
+    if pool_file:
+        pool = load_credential_pool(pool_file)
+        return pool[int(os.getenv("REDDIT_CREDENTIALS_INDEX") or 0) % len(pool)]
+    return Credentials(
+        # replay never talks to Reddit, so it works without credentials
+        client_id=os.getenv("REDDIT_CLIENT_ID") or ("offline" if offline else None),
+        client_secret=os.getenv("REDDIT_CLIENT_SECRET") or ("offline" if offline else None),
+        user_agent=os.getenv("REDDIT_USER_AGENT", "idea_scraper/0.1"),
+    )
+
+
+class FetchError(Exception):
+    """A submission could not be fetched within the retry budget."""
+
+    def __init__(self, submission_id: str, attempts: int, error: BaseException) -> None:
+        super().__init__(f"{submission_id}: {error!r} (after {attempts} attempt(s))")
+        self.submission_id = submission_id
+        self.attempts = attempts
+        self.error = error
 
-load_dotenv()  # read .env
 
 class RedditClient:
-    """All Reddit traffic: enumerate IDs and fetch full submission trees."""
+    """
+    All Reddit traffic: enumerate IDs and fetch full submission trees.
+
+    Every HTTP call goes through ``limiter``; pass the same limiter (and retry
+    policy) to several clients so they share one rate budget. With ``cache``
+    responses are recorded to / replayed from disk (``cache_mode``), and cache
+    hits cost no budget. ``credentials`` default to ``env_credentials()``.
+    """
+
+    def __init__(
+        self,
+        *,
+        limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        expansion: Optional[ExpansionLimits] = None,
+        cache: Optional[ResponseCache] = None,
+        cache_mode: str = "record",
+        credentials: Optional[Credentials] = None,
+    ) -> None:
+        load_dotenv()  # credentials from .env (only once a client is actually needed)
+        self.limiter = limiter or RateLimiter()
+        self.retry = retry or RetryPolicy(stats=self.limiter.stats)
+        self.expansion = expansion or ExpansionLimits()
 
-    def __init__(self, ratelimit_sleep: int = 2) -> None:
+        offline = cache is not None and cache_mode == "replay"
+        session = (
+            CachingSession(self.limiter, cache, cache_mode)
+            if cache is not None
+            else LimitedSession(self.limiter)
+        )
+        creds = credentials or env_credentials(offline=offline)
+        login = {"username": creds.username, "password": creds.password} if creds.username else {}
         self.reddit = praw.Reddit(
-            client_id=os.getenv("REDDIT_CLIENT_ID"),
-            client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
-            user_agent=os.getenv("REDDIT_USER_AGENT", "idea_scraper/0.1"),
+            client_id=creds.client_id,
+            client_secret=creds.client_secret,
+            user_agent=creds.user_agent,
+            requestor_kwargs={"session": session},
+            **login,
+            **self._endpoint_overrides(),
         )
-        self.ratelimit_sleep = ratelimit_sleep
+        self.expander = CommentExpander(self.reddit, self._call, self.expansion)
 
     # ---------- 1) list IDs inside [start_date, end_date] --------------- #
     def list_submission_ids(
@@ -34,50 +165,146 @@ class RedditClient:
         min_score: Optional[int] = None,
         flairs: Optional[List[str]] = None,
     ) -> Iterator[Dict]:
-        flair_set = {f.lower() for f in flairs} if flairs else None
-        after = self._to_ts(start_date)
-        before = self._to_ts(end_date) + 86_399  # include end-day
+        for page in self.list_submission_pages(subreddit, start_date, end_date):
+            for item in page.items:
+                if matches_filters(item, min_score=min_score, flairs=flairs):
+                    yield item
+
+    def list_submission_pages(
+        self,
+        subreddit: str,
+        start_date: str,
+        end_date: str,
+        *,
+        cursor: Optional[str] = None,
+        stop_ts: Optional[int] = None,
+    ) -> Iterator[ListingPage]:
+        """
+        Walk ``/r/<sub>/new`` one page at a time (newest → oldest).
 
-        sub_ref = self.reddit.subreddit(subreddit)
+        Starts after ``cursor`` (a ``t3_`` fullname from a previous page) and stops
+        once posts get older than ``stop_ts`` (default: start of the range).
+        Every page carries its in-range items (unfiltered) and the cursor to
+        resume from.
+        """
+        start = self._to_ts(start_date)
+        end = self._to_ts(end_date) + 86_399  # include end-day
+        stop = max(start, stop_ts or start)
 
-        for sub in sub_ref.new(limit=None):  # newest → oldest
-            ts = int(sub.created_utc)
-            if ts < after:
+        for listing in self._walk(f"r/{subreddit}/new", {}, cursor):
+            items: List[Dict] = []
+            reached_stop = False
+            for sub in listing.children:
+                ts = int(sub.created_utc)
+                if ts < stop:
+                    reached_stop = True
+                    break
+                if ts > end:
+                    continue
+                items.append(self._listing_item(sub))
+
+            last = reached_stop or not listing.after
+            yield ListingPage(items, listing.after, last)
+            if last:
+                return
+
+    def search_window(self, subreddit: str, start_ts: int, end_ts: int) -> List[Dict]:
+        """
+        Posts created in ``[start_ts, end_ts)`` via timestamp search (at most
+        ~1000 – Reddit caps search listings like every other listing).
+
+        Relies on the ``cloudsearch`` ``timestamp:`` operator; if Reddit ignores
+        it the window simply comes back saturated and gets split further.
+        """
+        params = {
+            "q": f"timestamp:{start_ts}..{end_ts - 1}",
+            "syntax": "cloudsearch",
+            "restrict_sr": "on",
+            "sort": "new",
+        }
+        items: List[Dict] = []
+        for listing in self._walk(f"r/{subreddit}/search", params, None):
+            items.extend(
+                self._listing_item(sub)
+                for sub in listing.children
+                if start_ts <= int(sub.created_utc) < end_ts
+            )
+            if not listing.after:
                 break
-            if ts > before:
-                continue
-            if min_score and sub.score < min_score:
-                continue
-            if flair_set and (sub.link_flair_text or "").lower() not in flair_set:
-                continue
-            yield {
-                "id": sub.id,
-                "created_utc": ts,
-                "score": sub.score,
-                "link_flair_text": sub.link_flair_text,
-            }
+        return items
+
+    def _walk(self, path: str, params: Dict[str, Any], cursor: Optional[str]) -> Iterator[Any]:
+        """Yield raw listing pages of ``path`` following ``after`` cursors."""
+        while True:
+            page_params: Dict[str, Any] = {**params, "limit": 100}
+            if cursor:
+                page_params["after"] = cursor
+            try:
+                with metrics.timer("listing_page_seconds"):
+                    listing = self.retry.call(
+                        partial(self.reddit.get, path, params=page_params),
+                        retry_on=TRANSIENT_ERRORS,
+                        give_up_on=PERMANENT_ERRORS,
+                    )
+            except RetryError as exc:
+                raise exc.last from exc
+            yield listing
+            cursor = listing.after
+            if not cursor:
+                return
+
+    def fetch_info(self, submission_ids: List[str]) -> Iterator[Dict]:
+        """Current listing metadata (incl. ``num_comments``), 100 posts per call."""
+        for i in range(0, len(submission_ids), INFO_BATCH):
+            fullnames = ",".join(f"t3_{sid}" for sid in submission_ids[i : i + INFO_BATCH])
+            try:
+                listing = self.retry.call(
+                    partial(self.reddit.get, "api/info", params={"id": fullnames}),
+                    retry_on=TRANSIENT_ERRORS,
+                    give_up_on=PERMANENT_ERRORS,
+                )
+            except RetryError as exc:
+                raise exc.last from exc
+            for sub in listing.children:
+                yield self._listing_item(sub)
 
     # ---------- 2) fetch one submission plus ALL nested comments -------- #
     def fetch_submission_tree(self, submission_id: str) -> Dict:
-        while True:  # retry on rate-limit / transient errors
-            try:
-                sub = self.reddit.submission(id=submission_id)
-                sub.comments.replace_more(limit=None)
-                return {
-                    "submission": self._extract_submission(sub),
-                    "comments": [self._extract_comment(c) for c in sub.comments],
-                }
-            except (
-                APIException,
-                RedditAPIException,
-                RequestException,
-                ResponseException,
-                ServerError,
-            ):
-                time.sleep(self.ratelimit_sleep)
-                continue
+        """Raises ``FetchError`` once the retry policy gives up."""
+        try:
+            with metrics.timer("fetch_tree_seconds"):  # incl. retries and expansion
+                return self.retry.call(
+                    self._fetch_tree_once,
+                    submission_id,
+                    retry_on=TRANSIENT_ERRORS,
+                    give_up_on=PERMANENT_ERRORS,
+                )
+        except RetryError as exc:
+            raise FetchError(submission_id, exc.attempts, exc.last) from exc
+
+    def _fetch_tree_once(self, submission_id: str) -> Dict:
+        sub = self.reddit.submission(id=submission_id)
+        comments, complete = self.expander.expand(sub)
+        return {
+            "submission": {**self._extract_submission(sub), "complete": complete},
+            "comments": comments,
+        }
+
+    def _call(self, fn: Callable[[], Any]) -> Any:
+        """One API call under the retry policy (used by the comment expander)."""
+        return self.retry.call(fn, retry_on=TRANSIENT_ERRORS, give_up_on=PERMANENT_ERRORS)
 
     # ---------- helpers -------------------------------------------------- #
+    @staticmethod
+    def _endpoint_overrides() -> Dict[str, str]:
+        """REDDIT_OAUTH_URL / REDDIT_URL point PRAW at another server (e.g. benchmarks)."""
+        overrides = {}
+        if os.getenv("REDDIT_OAUTH_URL"):
+            overrides["oauth_url"] = os.environ["REDDIT_OAUTH_URL"]
+        if os.getenv("REDDIT_URL"):
+            overrides["reddit_url"] = os.environ["REDDIT_URL"]
+        return overrides
+
     @staticmethod
     def _to_ts(iso: str) -> int:
         dt = datetime.fromisoformat(iso)
@@ -85,6 +312,16 @@ class RedditClient:
             dt = dt.replace(tzinfo=timezone.utc)
         return int(dt.timestamp())
 
+    @staticmethod
+    def _listing_item(sub) -> Dict:
+        return {
+            "id": sub.id,
+            "created_utc": int(sub.created_utc),
+            "score": sub.score,
+            "num_comments": sub.num_comments,
+            "link_flair_text": sub.link_flair_text,
+        }
+
     @staticmethod
     def _extract_submission(sub) -> Dict:
         return {
@@ -98,19 +335,5 @@ class RedditClient:
             "link_flair_text": sub.link_flair_text,
             "url": sub.url,
             "permalink": sub.permalink,
-        }
-
-    @classmethod
-    def _extract_comment(cls, c) -> Dict:
-        """Recursively convert a PRAW Comment → dict, preserving thread structure."""
-        return {
-            "id": c.id,
-            "parent_id": c.parent_id,
-            "link_id": c.link_id,
-            "author": c.author.name if c.author else None,
-            "body": c.body,
-            "created_utc": int(c.created_utc),
-            "score": c.score,
-            "depth": c.depth,
-            "replies": [cls._extract_comment(r) for r in c.replies],
+            "fetched_at": int(time.time()),
         }
@@ -0,0 +1,103 @@
+# reddit_scraper/infra/sources.py
+"""
+Time-window sources for sharded enumeration.
+
+A source answers one question: *which posts were created in [start, end)?*
+``max_results`` is the most it can return for one window (``None`` = no cap);
+a window that comes back with that many posts is treated as saturated and
+split by the enumerator.
+"""
+
+from __future__ import annotations
+
+import bisect
+import gzip
+import io
+import json
+import logging
+from pathlib import Path
+from typing import IO, Callable, Dict, List, Optional
+
+from reddit_scraper.infra.reddit import RedditClient
+
+try:  # Pushshift-style dumps are usually .zst
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+
+class SearchSource:
+    """Reddit search restricted to a timestamp range."""
+
+    max_results: Optional[int] = 1000
+
+    def __init__(self, subreddit: str, client: Callable[[], RedditClient]) -> None:
+        # ``client`` is a factory: windows are fetched from several threads and
+        # PRAW instances must not be shared between them
+        self.subreddit = subreddit
+        self._client = client
+
+    def fetch_window(self, start_ts: int, end_ts: int) -> List[Dict]:
+        return self._client().search_window(self.subreddit, start_ts, end_ts)
+
+
+class ArchiveSource:
+    """
+    Local dump of submissions: one JSON object per line (plain, .gz or .zst),
+    as produced by the Pushshift/Arctic-Shift archives.
+
+    The dump is scanned once; windows are then answered from a sorted in-memory
+    index holding only the listing fields of the wanted subreddit.
+    """
+
+    max_results: Optional[int] = None
+
+    def __init__(self, path: str | Path, subreddit: str) -> None:
+        self.path = Path(path)
+        self.subreddit = subreddit.lower()
+        self._times: List[int] = []
+        self._items: List[Dict] = []
+        self._load()
+
+    def fetch_window(self, start_ts: int, end_ts: int) -> List[Dict]:
+        lo = bisect.bisect_left(self._times, start_ts)
+        hi = bisect.bisect_left(self._times, end_ts)
+        return self._items[lo:hi]
+
+    # --------- Internals -----------------------------------------
+
+    def _load(self) -> None:
+        rows = []
+        with self._open() as fp:
+            for line in fp:
+                try:
+                    obj = json.loads(line)
+                except ValueError:
+                    continue
+                if (obj.get("subreddit") or "").lower() != self.subreddit:
+                    continue
+                rows.append(
+                    {
+                        "id": obj["id"],
+                        "created_utc": int(float(obj["created_utc"])),
+                        "score": obj.get("score", 0),
+                        "link_flair_text": obj.get("link_flair_text"),
+                    }
+                )
+        rows.sort(key=lambda r: r["created_utc"])
+        self._items = rows
+        self._times = [r["created_utc"] for r in rows]
+        logger.info("Archive %s: %d post(s) for r/%s", self.path, len(rows), self.subreddit)
+
+    def _open(self) -> IO[str]:
+        if self.path.suffix == ".gz":
+            return gzip.open(self.path, "rt", encoding="utf-8")
+        if self.path.suffix == ".zst":
+            if zstandard is None:
+                raise RuntimeError("Reading .zst archives requires the 'zstandard' package")
+            raw = self.path.open("rb")
+            dctx = zstandard.ZstdDecompressor(max_window_size=2**31)
+            return io.TextIOWrapper(dctx.stream_reader(raw, closefd=True), encoding="utf-8")
+        return self.path.open(encoding="utf-8")
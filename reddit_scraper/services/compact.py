@@ -0,0 +1,220 @@
+# reddit_scraper/services/compact.py
+"""
+Compact NDJSON outputs: one copy per submission, oldest post first.
+
+Refreshes, crashes between write and checkpoint and overlapping date ranges
+leave several versions of a submission in (and across) output files.
+``compact`` keeps the version with the newest ``fetched_at`` of every ID
+(the later line on a tie), sorts by ``created_utc`` and writes one file plus
+its offset index – with memory bounded by ``memory_bytes``, whatever the
+input size:
+
+1. run generation – the inputs are cut into record/frame-aligned ranges
+   (``split_ranges``) that worker processes read into buffers of
+   ``memory_bytes / workers``, sort by ``(created_utc, id, fetched_at)``,
+   de-duplicate and spill as sorted run files
+2. merge – ``heapq.merge`` over at most ``FAN_IN`` runs at a time (extra
+   passes run in parallel when there are more); versions of an ID end up
+   adjacent, so keeping the last of each group removes the duplicates
+
+Each run line is ``<JSON sort key>\\t<record line>``, so records are parsed
+once, in phase 1. The output is written next to its destination and renamed
+into place, so it may also be one of the inputs.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from reddit_scraper.core import jsonio, metrics
+from reddit_scraper.core.framed import FRAME_RECORDS, index_path, iter_range, split_ranges
+from reddit_scraper.services.offsets import offsets_path
+from reddit_scraper.services.sinks import NDJSONSink
+
+logger = logging.getLogger(__name__)
+
+FAN_IN = 64                   # runs open at once in one merge
+MEMORY_BYTES = 512 << 20      # record bytes buffered by all run generators together
+MIN_PART_BYTES = 8 << 20      # smaller inputs aren't worth another process
+RUN_BUFFER = 1 << 16          # read buffer per open run
+INDEX_EVERY = 50_000          # records between offset-index commits
+
+# (created_utc, id, fetched_at, input no, range start, line no) – unique per line
+Key = Tuple[int, str, int, int, int, int]
+
+
+class CompactResult(NamedTuple):
+    output: Path
+    records_in: int
+    records_out: int              # records_in - records_out versions were dropped
+    runs: int
+
+
+# --------- Public API -------------------------------------------------------- #
+@metrics.timed("compact_seconds")
+def compact(
+    inputs: Sequence[str | Path],
+    output: str | Path,
+    *,
+    workers: Optional[int] = None,
+    memory_bytes: int = MEMORY_BYTES,
+    tmp_dir: Optional[str | Path] = None,
+    frame_records: int = FRAME_RECORDS,
+) -> CompactResult:
+    """Merge ``inputs`` into ``output`` (plain or ``.gz`` / ``.zst`` by suffix)."""
+    inputs = [Path(p) for p in inputs]
+    output = Path(output)
+    for path in inputs:
+        if not path.exists():
+            raise FileNotFoundError(f"{path} does not exist")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    run_bytes = max(1 << 20, memory_bytes // workers)
+
+    tasks = []
+    for n, path in enumerate(inputs):
+        parts = min(workers, max(1, path.stat().st_size // MIN_PART_BYTES))
+        tasks += [(str(path), n, start, end, run_bytes) for start, end in split_ranges(path, parts)]
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir or output.parent, prefix=".compact-") as tmp:
+        tasks = [(*task, str(Path(tmp, f"r{k:05d}"))) for k, task in enumerate(tasks)]
+        with ProcessPoolExecutor(min(workers, len(tasks))) if workers > 1 else _Inline() as pool:
+            with metrics.timer("compact_runs_seconds"):
+                runs: List[str] = []
+                records_in = 0
+                for task_runs, read in pool.map(_generate_runs, tasks):
+                    runs += task_runs
+                    records_in += read
+            logger.info("Sorted %d record(s) from %d file(s) into %d run(s)",
+                        records_in, len(inputs), len(runs))
+            total_runs = len(runs)
+
+            with metrics.timer("compact_merge_seconds"):
+                passes = 0
+                while len(runs) > FAN_IN:
+                    groups = [runs[i:i + FAN_IN] for i in range(0, len(runs), FAN_IN)]
+                    jobs = [(g, str(Path(tmp, f"m{passes}-{k:05d}"))) for k, g in enumerate(groups)]
+                    runs = [out for out, _ in pool.map(_merge_runs, jobs)]
+                    passes += 1
+                records_out = _write_output(runs, output, frame_records)
+
+    metrics.incr("compact_records_in", records_in)
+    metrics.incr("compact_duplicates", records_in - records_out)
+    logger.info("Compacted %d record(s) into %d in %s", records_in, records_out, output)
+    return CompactResult(output, records_in, records_out, total_runs)
+
+
+# --------- internals --------------------------------------------------------- #
+class _Inline:
+    """``ProcessPoolExecutor`` stand-in for ``workers=1``."""
+
+    def map(self, fn, items):
+        return map(fn, items)
+
+    def __enter__(self) -> "_Inline":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+def _generate_runs(task: Tuple[str, int, int, int, int, str]) -> Tuple[List[str], int]:
+    """Phase 1 for one input range → (sorted run files, records read)."""
+    src, n, start, end, run_bytes, prefix = task
+    runs: List[str] = []
+    buf: List[Tuple[Key, bytes]] = []
+    size = read = 0
+    for k, line in enumerate(iter_range(src, start, end)):
+        rec = jsonio.loads(line)
+        key = (rec.get("created_utc") or 0, rec["id"], rec.get("fetched_at") or 0, n, start, k)
+        buf.append((key, line if line.endswith(b"\n") else line + b"\n"))
+        size += len(line)
+        read += 1
+        if size >= run_bytes:
+            runs.append(_spill(buf, f"{prefix}-{len(runs):04d}"))
+            buf, size = [], 0
+    if buf:
+        runs.append(_spill(buf, f"{prefix}-{len(runs):04d}"))
+    return runs, read
+
+
+def _spill(buf: List[Tuple[Key, bytes]], path: str) -> str:
+    buf.sort(key=itemgetter(0))
+    _write_run(_latest(buf), path)
+    return path
+
+
+def _merge_runs(job: Tuple[List[str], str]) -> Tuple[str, int]:
+    """One intermediate merge pass over ≤ ``FAN_IN`` runs → (run file, records)."""
+    runs, path = job
+    return path, _write_run(_latest(heapq.merge(*map(_read_run, runs))), path, cleanup=runs)
+
+
+def _write_run(items: Iterable[Tuple[Key, bytes]], path: str, cleanup: Sequence[str] = ()) -> int:
+    written = 0
+    with open(path, "wb", buffering=1 << 20) as fp:
+        for key, line in items:
+            fp.write(jsonio.dumps(key) + b"\t" + line)
+            written += 1
+    for run in cleanup:
+        os.unlink(run)
+    return written
+
+
+def _read_run(path: str) -> Iterator[Tuple[Key, bytes]]:
+    with open(path, "rb", buffering=RUN_BUFFER) as fp:
+        for raw in fp:
+            head, _, line = raw.partition(b"\t")  # the key's JSON never holds a raw tab
+            yield tuple(jsonio.loads(head)), line
+
+
+def _latest(items: Iterable[Tuple[Key, bytes]]) -> Iterator[Tuple[Key, bytes]]:
+    """The last of every run of equal ``(created_utc, id)`` – the newest fetch."""
+    prev: Optional[Tuple[Key, bytes]] = None
+    for item in items:
+        if prev is not None and item[0][:2] != prev[0][:2]:
+            yield prev
+        prev = item
+    if prev is not None:
+        yield prev
+
+
+def _write_output(runs: List[str], output: Path, frame_records: int) -> int:
+    """Final merge into a temporary sibling of ``output``, then rename it and its indexes."""
+    tmp = output.with_name(f".compacting-{os.getpid()}.{output.name}")
+    for leftover in _sidecars(tmp):
+        leftover.unlink(missing_ok=True)
+    sink = NDJSONSink(tmp, frame_records=frame_records)
+    written = 0
+    try:
+        for (created, sid, fetched, *_), line in _latest(heapq.merge(*map(_read_run, runs))):
+            sink.write_line(line, sid, created or None, fetched or None)
+            written += 1
+            if written % INDEX_EVERY == 0:
+                sink.flush()
+    finally:
+        sink.close()
+
+    # the old indexes go first: a crash in between leaves an output without an
+    # index (rebuilt on next open) rather than an index describing another file
+    for old in _sidecars(output)[1:]:
+        old.unlink(missing_ok=True)
+    os.replace(tmp, output)
+    for new, old in zip(_sidecars(tmp)[1:], _sidecars(output)[1:]):
+        if new.exists():
+            os.replace(new, old)
+    return written
+
+
+def _sidecars(path: Path) -> List[Path]:
+    """``path`` and the files that describe it: frame index, offset index + WAL."""
+    db = offsets_path(path)
+    return [path, index_path(path), db, db.with_name(db.name + "-wal"),
+            db.with_name(db.name + "-shm")]
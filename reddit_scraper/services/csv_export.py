@@ -1,63 +1,171 @@
 # reddit_scraper/services/csv_export.py
+"""
+Convert an ND-JSON file (one submission-tree per line) into two flat CSVs.
+
+* submissions_csv – one row per post
+* comments_csv    – one row per comment of the whole tree (DFS pre-order), with
+  ``submission_id``, ``parent_id`` and ``depth`` columns
+
+Both outputs are written through buffers flushed every ``chunk_size`` rows or
+``flush_bytes`` characters. With ``workers > 1`` the input is split into
+newline-aligned byte ranges, each converted by a worker process into its own
+part files, and the parts are concatenated in order – the result is
+identical to a single-process run. Compressed (``.ndjson.gz`` / ``.zst``)
+inputs are split on frame boundaries.
+"""
+
 from __future__ import annotations
 
-import json
+import csv
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, Iterable, List, Optional, Sequence, TextIO, Tuple
 
-import pandas as pd
 from tqdm import tqdm
 
+from reddit_scraper.core import jsonio, metrics
+from reddit_scraper.core.framed import codec_for, iter_range, split_ranges
+from reddit_scraper.core.flat import CommentTable
+
+SUBMISSION_FIELDS = [
+    "id", "title", "selftext", "created_utc", "author", "score", "num_comments",
+    "link_flair_text", "url", "permalink", "fetched_at", "complete",
+]
+COMMENT_FIELDS = [
+    "submission_id", "id", "parent_id", "link_id", "author", "body", "created_utc",
+    "score", "depth",
+]
 
+FLUSH_BYTES = 4 << 20
+MIN_PART_BYTES = 8 << 20  # smaller inputs aren't worth a process pool
+
+
+@metrics.timed("export_csv_seconds")
 def ndjson_to_csv(
     ndjson_path: str | Path,
     submissions_csv: str | Path,
     comments_csv: str | Path,
     chunk_size: int = 2_000,
+    *,
+    flush_bytes: int = FLUSH_BYTES,
+    workers: Optional[int] = None,
 ) -> None:
-    """
-    Convert an ND-JSON file (one submission-tree per line) into two flat CSVs.
-
-    * submissions_csv  – one row per post
-    * comments_csv     – one row per comment (with submission_id column)
-    """
-    ndjson_path   = Path(ndjson_path)
+    """Convert ``ndjson_path``; ``workers`` defaults to the CPU count."""
+    ndjson_path = Path(ndjson_path)
     submissions_csv = Path(submissions_csv)
-    comments_csv    = Path(comments_csv)
-
+    comments_csv = Path(comments_csv)
     submissions_csv.parent.mkdir(parents=True, exist_ok=True)
+    comments_csv.parent.mkdir(parents=True, exist_ok=True)
 
-    # truncate / create
-    submissions_csv.write_text("")
-    comments_csv.write_text("")
+    size = ndjson_path.stat().st_size
+    metrics.incr("export_bytes_read", size)
+    workers = workers or os.cpu_count() or 1
+    ranges = split_ranges(ndjson_path, min(workers, max(1, size // MIN_PART_BYTES)))
 
-    sub_rows: List[dict] = []
-    com_rows: List[dict] = []
+    bar = tqdm(total=size, unit="B", unit_scale=True, desc="Converting → CSV")
+    try:
+        if len(ranges) == 1:
+            with submissions_csv.open("w", encoding="utf-8", newline="") as sub_fp, \
+                    comments_csv.open("w", encoding="utf-8", newline="") as com_fp:
+                _header(sub_fp, SUBMISSION_FIELDS)
+                _header(com_fp, COMMENT_FIELDS)
+                plain = codec_for(ndjson_path) is None
+                _convert_range(ndjson_path, 0, size, sub_fp, com_fp, chunk_size, flush_bytes,
+                               bar.update if plain else None)
+            bar.update(bar.total - bar.n)
+            return
 
-    with ndjson_path.open(encoding="utf-8") as fp:
-        for line in tqdm(fp, desc="Converting → CSV"):
-            tree = json.loads(line)
+        with tempfile.TemporaryDirectory(dir=comments_csv.parent, prefix=".csv-parts-") as tmp:
+            jobs = [
+                (str(ndjson_path), start, end, str(Path(tmp, f"{k:05d}")), chunk_size, flush_bytes)
+                for k, (start, end) in enumerate(ranges)
+            ]
+            with ProcessPoolExecutor(len(jobs)) as pool:
+                parts = []
+                for (_, start, end, *_), part in zip(jobs, pool.map(_convert_part, jobs)):
+                    parts.append(part)
+                    bar.update(end - start)
+            _concat(submissions_csv, SUBMISSION_FIELDS, [p[0] for p in parts])
+            _concat(comments_csv, COMMENT_FIELDS, [p[1] for p in parts])
+    finally:
+        bar.close()
 
-            # submission row (drop comments)
-            sub_rows.append({k: v for k, v in tree.items() if k != "comments"})
 
-            # comment rows
-            for c in tree["comments"]:
-                com_rows.append({"submission_id": tree["id"], **c})
+# --------- internals ------------------------------------------------------- #
+class _Sink:
+    """csv.writer into a string buffer, flushed on row count or size."""
+
+    def __init__(self, fp: TextIO, rows: int, size: int) -> None:
+        self.fp = fp
+        self.max_rows = max(1, rows)
+        self.max_size = size
+        self.buf = io.StringIO()
+        self.writer = csv.writer(self.buf)
+        self.rows = 0
+
+    def writerows(self, rows: Iterable[List[Any]]) -> None:
+        for row in rows:
+            self.writer.writerow(row)
+            self.rows += 1
+            if self.rows >= self.max_rows or self.buf.tell() >= self.max_size:
+                self.flush()
+
+    def flush(self) -> None:
+        self.fp.write(self.buf.getvalue())
+        self.buf.seek(0)
+        self.buf.truncate()
+        self.rows = 0
+
+
+def _header(fp: TextIO, fields: Sequence[str]) -> None:
+    csv.writer(fp).writerow(fields)
+
+
+def _convert_range(
+    src: str | Path,
+    start: int,
+    end: int,
+    sub_fp: TextIO,
+    com_fp: TextIO,
+    chunk_size: int,
+    flush_bytes: int,
+    progress: Optional[Callable[[int], Any]] = None,
+) -> None:
+    subs = _Sink(sub_fp, chunk_size, flush_bytes)
+    coms = _Sink(com_fp, chunk_size, flush_bytes)
+    for line in iter_range(src, start, end):
+        tree = jsonio.loads(line)
+        subs.writerows([[tree.get(f) for f in SUBMISSION_FIELDS]])
+        table = CommentTable.from_nested(tree["comments"])
+        coms.writerows(
+            [tree["id"], table.ids[i], table.parent_id(i), table.link_id, table.author_name(i),
+             table.body(i), table.created_utc[i], table.score[i], table.depth[i]]
+            for i in table.dfs()
+        )
+        if progress is not None:
+            progress(len(line))
+    subs.flush()
+    coms.flush()
 
-            if len(sub_rows) >= chunk_size:
-                _flush(sub_rows, submissions_csv)
-                _flush(com_rows, comments_csv)
 
-    # remainder
-    _flush(sub_rows, submissions_csv)
-    _flush(com_rows, comments_csv)
+def _convert_part(job: Tuple[str, int, int, str, int, int]) -> Tuple[str, str]:
+    src, start, end, prefix, chunk_size, flush_bytes = job
+    sub_part, com_part = f"{prefix}.submissions.csv", f"{prefix}.comments.csv"
+    with open(sub_part, "w", encoding="utf-8", newline="") as sub_fp, \
+            open(com_part, "w", encoding="utf-8", newline="") as com_fp:
+        _convert_range(src, start, end, sub_fp, com_fp, chunk_size, flush_bytes)
+    return sub_part, com_part
 
 
-def _flush(rows: List[dict], outfile: Path) -> None:
-    if not rows:
-        return
-    header = not outfile.exists() or outfile.stat().st_size == 0
-    pd.DataFrame.from_records(rows).to_csv(outfile, mode="a",
-                                           header=header, index=False)
-    rows.clear()
+def _concat(out: Path, fields: Sequence[str], parts: Sequence[str]) -> None:
+    with out.open("w", encoding="utf-8", newline="") as fp:
+        _header(fp, fields)
+        fp.flush()
+        raw = fp.buffer
+        for part in parts:
+            with open(part, "rb") as src:
+                shutil.copyfileobj(src, raw, 1 << 20)
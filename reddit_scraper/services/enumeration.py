@@ -0,0 +1,113 @@
+# reddit_scraper/services/enumeration.py
+"""
+Sharded enumeration: cover ``[start, end)`` with time windows, query them in
+parallel through a window source and merge the answers into one
+newest → oldest, de-duplicated stream.
+
+Listings are capped (~1000 posts), so a window that comes back saturated is
+split in half and both halves are queried again, down to ``min_window``
+seconds. Windows are emitted strictly in time order, so the start of the last
+emitted window is a valid resume cursor.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Iterator, List, NamedTuple, Optional, Protocol, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Window = Tuple[int, int]  # [start, end) in unix seconds
+
+
+class WindowSource(Protocol):
+    max_results: Optional[int]
+
+    def fetch_window(self, start_ts: int, end_ts: int) -> List[Dict]: ...
+
+
+class WindowResult(NamedTuple):
+    start: int           # window start – everything newer has been emitted
+    end: int
+    items: List[Dict]    # new (not yet emitted) posts, newest first
+
+
+class ShardedEnumerator:
+    """Adaptive time-window splitter over a ``WindowSource``."""
+
+    def __init__(
+        self,
+        source: WindowSource,
+        *,
+        workers: int = 4,
+        initial_windows: int = 16,
+        min_window: int = 60,
+        stop: Optional[threading.Event] = None,
+    ) -> None:
+        self.source = source
+        self.workers = max(1, workers)
+        self.initial_windows = max(1, initial_windows)
+        self.min_window = max(1, min_window)
+        self.stop = stop
+
+    # --------- Public API ----------------------------------------
+
+    def iter_windows(self, start_ts: int, end_ts: int) -> Iterator[WindowResult]:
+        """Yield every leaf window of ``[start_ts, end_ts)``, newest first."""
+        queue: Deque[Window] = deque(self._initial(start_ts, end_ts))
+        inflight: Dict[Window, Future] = {}
+        seen: Set[str] = set()
+        lookahead = self.workers * 2
+
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="enum") as pool:
+            try:
+                while queue:
+                    if self.stop is not None and self.stop.is_set():
+                        return
+                    for w in list(queue)[:lookahead]:
+                        if w not in inflight:
+                            inflight[w] = pool.submit(self.source.fetch_window, *w)
+
+                    head = queue.popleft()
+                    items = inflight.pop(head).result()
+                    lo, hi = head
+                    if self._saturated(items):
+                        if hi - lo > self.min_window:
+                            mid = (lo + hi) // 2
+                            queue.appendleft((lo, mid))
+                            queue.appendleft((mid, hi))  # newer half first
+                            logger.debug("Window %d–%d saturated – splitting", lo, hi)
+                            continue
+                        logger.warning(
+                            "Window %d–%d still saturated at %ds – some posts may be missing",
+                            lo, hi, hi - lo,
+                        )
+
+                    fresh = []
+                    for item in sorted(items, key=lambda i: i["created_utc"], reverse=True):
+                        if item["id"] not in seen:
+                            seen.add(item["id"])
+                            fresh.append(item)
+                    yield WindowResult(lo, hi, fresh)
+            finally:
+                for fut in inflight.values():
+                    fut.cancel()
+
+    def iter_items(self, start_ts: int, end_ts: int) -> Iterator[Dict]:
+        for window in self.iter_windows(start_ts, end_ts):
+            yield from window.items
+
+    # --------- Internals -----------------------------------------
+
+    def _initial(self, start_ts: int, end_ts: int) -> List[Window]:
+        span = max(0, end_ts - start_ts)
+        n = min(self.initial_windows, max(1, span // self.min_window))
+        edges = [start_ts + span * k // n for k in range(n + 1)]
+        return [(edges[k], edges[k + 1]) for k in reversed(range(n)) if edges[k] < edges[k + 1]]
+
+    def _saturated(self, items: List[Dict]) -> bool:
+        cap = self.source.max_results
+        return cap is not None and len(items) >= cap
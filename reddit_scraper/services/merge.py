@@ -0,0 +1,212 @@
+# reddit_scraper/services/merge.py
+"""
+Concatenate many files into one (or several size-capped) text files.
+
+* directories are listed in parallel with ``os.scandir``
+* file bodies are copied kernel-side (``os.copy_file_range``, then
+  ``os.sendfile``) and fall back to a buffered copy – nothing is decoded or
+  held in memory
+* ``shard_bytes`` starts a new output file once the current one is full; a
+  JSON manifest records, per source file, the shard and the byte offset and
+  length of its content
+
+Each entry is framed as ``// Content from: <relative path>\\n\\n<content>\\n\\n``.
+Used by ``scripts/merge_contents.py``.
+"""
+
+from __future__ import annotations
+
+import errno
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK = 1 << 20
+EXCLUDED_SUFFIXES = (".g.py",)  # generated sources are never merged
+
+# errors meaning "this fd pair can't do kernel copies" rather than a real I/O failure
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+
+class MergeResult(NamedTuple):
+    outputs: List[Path]          # shard files, in order
+    files: int                   # source files merged
+    manifest: Optional[Path]
+
+
+# --------- Public API -------------------------------------------------------- #
+def find_files(
+    root: str | Path,
+    ext: str,
+    *,
+    workers: int = 8,
+    exclude: Sequence[str] = EXCLUDED_SUFFIXES,
+) -> List[str]:
+    """Every file under ``root`` ending in ``ext``, sorted by relative path."""
+    root = os.fspath(root)
+    found: List[str] = []
+    with ThreadPoolExecutor(max(1, workers), thread_name_prefix="scan") as pool:
+        pending: Set[Future] = {pool.submit(_scan_dir, root, ext, tuple(exclude))}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                files, dirs = fut.result()
+                found.extend(files)
+                pending.update(pool.submit(_scan_dir, d, ext, tuple(exclude)) for d in dirs)
+    found.sort(key=lambda p: os.path.relpath(p, root).split(os.sep))
+    return found
+
+
+def merge_files(
+    files: Sequence[str | Path],
+    out_file: str | Path,
+    *,
+    root: str | Path,
+    shard_bytes: Optional[int] = None,
+    manifest: bool = False,
+) -> MergeResult:
+    """
+    Stream ``files`` into ``out_file``. With ``shard_bytes`` the output is split
+    into ``<stem>.part0001<suffix>``, … (a manifest is always written then).
+    """
+    out_file = Path(out_file)
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    manifest = manifest or shard_bytes is not None
+    entries: List[Dict] = []
+    outputs: List[Path] = []
+
+    dst = -1
+    written = 0
+    try:
+        for path in files:
+            rel = os.path.relpath(path, root)
+            header = f"// Content from: {rel}\n\n".encode("utf-8")
+            with open(path, "rb", buffering=0) as src:
+                size = os.fstat(src.fileno()).st_size
+                entry = len(header) + size + 2
+                full = shard_bytes is not None and written and written + entry > shard_bytes
+                if dst < 0 or full:
+                    if dst >= 0:
+                        os.close(dst)
+                    target = _shard_name(out_file, len(outputs) + 1) if shard_bytes else out_file
+                    dst = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                    outputs.append(target)
+                    written = 0
+                _write_all(dst, header)
+                copied = copy_fd(src.fileno(), dst, size)
+                _write_all(dst, b"\n\n")
+            if manifest:
+                entries.append({
+                    "source": rel,
+                    "shard": outputs[-1].name,
+                    "offset": written + len(header),
+                    "length": copied,
+                })
+            written += len(header) + copied + 2
+        if dst < 0:  # nothing matched – still leave an (empty) output behind
+            out_file.write_bytes(b"")
+            outputs.append(out_file)
+    finally:
+        if dst >= 0:
+            os.close(dst)
+
+    manifest_path = None
+    if manifest:
+        manifest_path = out_file.with_suffix(".manifest.json")
+        manifest_path.write_text(
+            json.dumps({"shards": [p.name for p in outputs], "files": entries}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+    return MergeResult(outputs, len(files), manifest_path)
+
+
+def merge(
+    directory: str | Path,
+    ext: str,
+    out_dir: str | Path,
+    *,
+    shard_bytes: Optional[int] = None,
+    manifest: bool = False,
+    workers: int = 8,
+) -> MergeResult:
+    """Merge every ``*<ext>`` under ``directory`` into ``<out_dir>/<directory name>.txt``."""
+    root = Path(directory).expanduser().resolve()
+    if not root.exists():
+        raise FileNotFoundError(f"{root} does not exist")
+
+    ext = ext if ext.startswith(".") else f".{ext}"  # normalise ".py" vs "py"
+    out_dir = Path(out_dir).expanduser().resolve()
+
+    top_name = root.name
+    if top_name.endswith(ext):
+        top_name = top_name[: -len(ext)]  # prevent double suffix
+    files = find_files(root, ext, workers=workers)
+    return merge_files(files, out_dir / f"{top_name}.txt", root=root,
+                       shard_bytes=shard_bytes, manifest=manifest)
+
+
+def copy_fd(src: int, dst: int, count: int) -> int:
+    """Append up to ``count`` bytes from ``src`` (current position) to ``dst``."""
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while copied < count:
+                n = os.copy_file_range(src, dst, count - copied)
+                if n == 0:
+                    return copied
+                copied += n
+            return copied
+        except OSError as exc:
+            if exc.errno not in _UNSUPPORTED:
+                raise
+    if hasattr(os, "sendfile"):
+        try:
+            while copied < count:
+                n = os.sendfile(dst, src, copied, count - copied)
+                if n == 0:
+                    return copied
+                copied += n
+            return copied
+        except OSError as exc:
+            if exc.errno not in _UNSUPPORTED:
+                raise
+    os.lseek(src, copied, os.SEEK_SET)
+    while copied < count:
+        chunk = os.read(src, min(COPY_CHUNK, count - copied))
+        if not chunk:
+            break
+        _write_all(dst, chunk)
+        copied += len(chunk)
+    return copied
+
+
+# --------- internals --------------------------------------------------------- #
+def _scan_dir(path: str, ext: str, exclude: Tuple[str, ...]) -> Tuple[List[str], List[str]]:
+    files: List[str] = []
+    dirs: List[str] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                elif entry.name.endswith(ext) and not entry.name.endswith(exclude) \
+                        and entry.is_file():
+                    files.append(entry.path)
+    except PermissionError as exc:
+        logger.warning("Skipping %s: %s", path, exc)
+    return files, dirs
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _shard_name(out_file: Path, n: int) -> Path:
+    return out_file.with_name(f"{out_file.stem}.part{n:04d}{out_file.suffix}")
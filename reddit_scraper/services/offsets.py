@@ -0,0 +1,308 @@
+# reddit_scraper/services/offsets.py
+"""
+Sidecar offset index + random-access reader for scraped NDJSON.
+
+``<output>.offsets.sqlite`` maps every record to its place in the output
+file – byte offset and length for plain NDJSON, frame plus offset inside the
+decompressed frame for ``.gz`` / ``.zst`` outputs – along with its
+``created_utc`` and ``fetched_at``. The ``GroupCommitWriter`` adds a group's
+rows after the group is fsynced; anything the index has not seen yet (e.g.
+records written before the index existed) is picked up by ``catch_up``,
+which scans only the file beyond the ``covered`` watermark.
+
+The same ID can appear more than once (resumed / refreshed runs); the last
+copy in the file wins and earlier ones count as superseded.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from reddit_scraper.core import jsonio
+from reddit_scraper.core.framed import Frame, codec_for, load_frames, read_frame
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".offsets.sqlite"
+
+
+class Entry(NamedTuple):
+    id: str
+    frame_offset: Optional[int]   # None for plain NDJSON
+    frame_length: Optional[int]
+    offset: int                   # in the file (plain) or in the decompressed frame
+    length: int                   # including the trailing newline
+    created_utc: Optional[int]
+    fetched_at: Optional[int]
+
+
+def offsets_path(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+class OffsetIndex:
+    """SQLite table of ``Entry`` rows in file order, plus the ``covered`` watermark."""
+
+    def __init__(self, data_path: str | Path) -> None:
+        self.data_path = Path(data_path)
+        self.path = offsets_path(self.data_path)
+        # writers serialise access themselves; commits may run on any of their threads
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                seq          INTEGER PRIMARY KEY,
+                id           TEXT NOT NULL,
+                frame_offset INTEGER,
+                frame_length INTEGER,
+                offset       INTEGER NOT NULL,
+                length       INTEGER NOT NULL,
+                created_utc  INTEGER,
+                fetched_at   INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS records_id ON records(id, seq);
+            CREATE INDEX IF NOT EXISTS records_created ON records(created_utc);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """
+        )
+
+    # --------- Public API ----------------------------------------
+
+    @property
+    def covered(self) -> int:
+        """File bytes already indexed."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'covered'").fetchone()
+        return int(row[0]) if row else 0
+
+    def add(self, entries: Iterable[Entry], covered: int) -> None:
+        """Append rows (in file order) and advance the watermark, in one transaction."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO records (id, frame_offset, frame_length, offset, length, "
+                "created_utc, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                entries,
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('covered', ?)", (str(covered),)
+            )
+
+    def catch_up(self) -> int:
+        """Index whatever the data file holds beyond ``covered``; returns rows added."""
+        try:
+            size = self.data_path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        covered = self.covered
+        if covered > size:  # file was truncated or replaced underneath us
+            logger.warning("%s: index is ahead of the data file – rebuilding", self.path)
+            self.clear()
+            covered = 0
+        if covered == size:
+            return 0
+
+        added = 0
+        batch: List[Entry] = []
+        for entries, end in _scan(self.data_path, covered):
+            batch.extend(entries)
+            covered = end
+            if len(batch) >= 1_000:
+                self.add(batch, covered)
+                added += len(batch)
+                batch = []
+        self.add(batch, covered)
+        added += len(batch)
+        if added:
+            logger.info("%s: indexed %d record(s)", self.path, added)
+        return added
+
+    def rebuild(self) -> int:
+        self.clear()
+        return self.catch_up()
+
+    def clear(self) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM records")
+            self.conn.execute("DELETE FROM meta WHERE key = 'covered'")
+
+    def latest(self, submission_id: str) -> Optional[Entry]:
+        row = self.conn.execute(
+            f"SELECT {_COLS} FROM records WHERE id = ? ORDER BY seq DESC LIMIT 1",
+            (submission_id,),
+        ).fetchone()
+        return Entry(*row) if row else None
+
+    def iter_latest(self) -> Iterator[Entry]:
+        """Newest copy of every ID, in file order."""
+        for row in self.conn.execute(
+            f"SELECT {_COLS} FROM records r WHERE seq = "
+            "(SELECT MAX(seq) FROM records WHERE id = r.id) ORDER BY seq"
+        ):
+            yield Entry(*row)
+
+    def range(
+        self, start_ts: Optional[int] = None, end_ts: Optional[int] = None
+    ) -> Iterator[Entry]:
+        """Newest copies with ``start_ts <= created_utc < end_ts``, oldest first."""
+        lo = start_ts if start_ts is not None else -(2**63)
+        hi = end_ts if end_ts is not None else 2**63 - 1
+        for row in self.conn.execute(
+            f"SELECT {_COLS} FROM records r WHERE created_utc >= ? AND created_utc < ? "
+            "AND seq = (SELECT MAX(seq) FROM records WHERE id = r.id) "
+            "ORDER BY created_utc, seq",
+            (lo, hi),
+        ):
+            yield Entry(*row)
+
+    def counts(self) -> Dict[str, int]:
+        total, distinct = self.conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT id) FROM records"
+        ).fetchone()
+        return {"records": total, "ids": distinct, "superseded": total - distinct}
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # --------- Context-manager sugar -----------------------------
+
+    def __enter__(self) -> "OffsetIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+_COLS = "id, frame_offset, frame_length, offset, length, created_utc, fetched_at"
+
+
+class RecordReader:
+    """
+    Random access to one scraped NDJSON file through its offset index.
+
+    Plain files are memory-mapped; compressed ones are read frame by frame
+    with a small cache of decompressed frames.
+    """
+
+    def __init__(self, data_path: str | Path, *, frame_cache: int = 8) -> None:
+        self.path = Path(data_path)
+        self.index = OffsetIndex(self.path)
+        self.index.catch_up()
+        self._codec = codec_for(self.path)
+        self._fp = self.path.open("rb")
+        self._map: Optional[mmap.mmap] = None
+        self._frames: "OrderedDict[int, bytes]" = OrderedDict()
+        self._frame_cache = max(1, frame_cache)
+
+    # --------- Public API ----------------------------------------
+
+    def get(self, submission_id: str) -> Optional[Dict[str, Any]]:
+        """Newest stored version of one submission, or ``None``."""
+        raw = self.get_raw(submission_id)
+        return jsonio.loads(raw) if raw is not None else None
+
+    def get_raw(self, submission_id: str) -> Optional[bytes]:
+        entry = self.index.latest(submission_id)
+        return self._read(entry) if entry else None
+
+    def scan(
+        self, start_ts: Optional[int] = None, end_ts: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Submissions created in ``[start_ts, end_ts)``, oldest first, one per ID."""
+        for entry in self.index.range(start_ts, end_ts):
+            yield jsonio.loads(self._read(entry))
+
+    def iter_raw(self) -> Iterator[bytes]:
+        """Record lines in file order, skipping superseded duplicates."""
+        for entry in self.index.iter_latest():
+            yield self._read(entry)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for raw in self.iter_raw():
+            yield jsonio.loads(raw)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._fp.close()
+        self.index.close()
+
+    # --------- Internals -----------------------------------------
+
+    def _read(self, entry: Entry) -> bytes:
+        if entry.frame_offset is None:
+            end = entry.offset + entry.length
+            if self._map is None or end > len(self._map):
+                self._remap()
+            return self._map[entry.offset:end]
+        data = self._frames.get(entry.frame_offset)
+        if data is None:
+            frame = Frame(entry.frame_offset, entry.frame_length, 0, 0)
+            data = read_frame(self.path, frame, self._codec)
+            self._frames[entry.frame_offset] = data
+            if len(self._frames) > self._frame_cache:
+                self._frames.popitem(last=False)
+        else:
+            self._frames.move_to_end(entry.frame_offset)
+        return data[entry.offset:entry.offset + entry.length]
+
+    def _remap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # --------- Context-manager sugar -----------------------------
+
+    def __enter__(self) -> "RecordReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+# --------- helpers --------------------------------------------------------- #
+def entry_for(line: bytes, frame: Optional[Frame], offset: int) -> Entry:
+    """Index row for one record line (parses it)."""
+    rec = jsonio.loads(line)
+    return Entry(
+        rec["id"],
+        frame.offset if frame else None,
+        frame.length if frame else None,
+        offset,
+        len(line),
+        rec.get("created_utc"),
+        rec.get("fetched_at"),
+    )
+
+
+def _scan(path: Path, start: int) -> Iterator[Tuple[List[Entry], int]]:
+    """``(entries, end)`` per record (plain) or frame (compressed) from byte ``start``."""
+    codec = codec_for(path)
+    if codec is None:
+        with path.open("rb") as fp:
+            fp.seek(start)
+            pos = start
+            for line in fp:
+                if not line.endswith(b"\n"):
+                    return  # unfinished record – leave it for later
+                entries = [entry_for(line, None, pos)] if line.strip() else []
+                pos += len(line)
+                yield entries, pos
+        return
+
+    for frame in load_frames(path):
+        if frame.offset < start:
+            continue
+        entries = []
+        pos = 0
+        for line in read_frame(path, frame, codec).splitlines(keepends=True):
+            if line.strip():
+                entries.append(entry_for(line, frame, pos))
+            pos += len(line)
+        yield entries, frame.end
@@ -0,0 +1,197 @@
+# reddit_scraper/services/parquet_export.py
+"""
+Stream an ND-JSON file into two Parquet datasets:
+
+* ``<submissions_dir>`` – one row per post
+* ``<comments_dir>``    – one row per comment, fully flattened (``submission_id``,
+  ``parent_id`` and ``depth`` columns; DFS pre-order within each post)
+
+Rows are buffered per column and written in row groups bounded by row count
+and buffered text size, so memory stays flat however large the input.
+Authors, flairs and other repetitive columns are dictionary-encoded; pages
+are compressed (zstd by default).
+``partition_by_month=True`` writes Hive-style ``month=YYYY-MM/`` directories
+keyed on the post's ``created_utc``.
+
+Each dataset is written into a ``<dir>.tmp`` sibling and swapped in once
+complete, so a re-run never leaves partitions of an earlier one behind.
+
+Needs the optional ``pyarrow`` package (``pip install reddit-scraper[parquet]``).
+"""
+
+from __future__ import annotations
+
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from tqdm import tqdm
+
+from reddit_scraper.core import jsonio, metrics
+from reddit_scraper.core.framed import iter_lines
+from reddit_scraper.core.flat import CommentTable
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+ROW_GROUP_SIZE = 50_000
+BUFFER_BYTES = 32 << 20  # flush early when buffered text exceeds this
+
+SUBMISSION_COLUMNS = [
+    ("id", "string"), ("title", "string"), ("selftext", "string"),
+    ("created_utc", "int64"), ("author", "string"), ("score", "int64"),
+    ("num_comments", "int64"), ("link_flair_text", "string"), ("url", "string"),
+    ("permalink", "string"), ("fetched_at", "int64"), ("complete", "bool_"),
+]
+COMMENT_COLUMNS = [
+    ("submission_id", "string"), ("id", "string"), ("parent_id", "string"),
+    ("author", "string"), ("body", "string"), ("created_utc", "int64"),
+    ("score", "int64"), ("depth", "int32"),
+]
+DICTIONARY_COLUMNS = ["submission_id", "author", "link_flair_text"]
+
+
+class _Dataset:
+    """Column buffers + one ParquetWriter per partition of one dataset."""
+
+    def __init__(
+        self,
+        root: Path,
+        columns: Sequence[Tuple[str, str]],
+        *,
+        row_group_size: int,
+        compression: str,
+    ) -> None:
+        self.root = root
+        self.tmp = root.with_name(root.name + ".tmp")
+        shutil.rmtree(self.tmp, ignore_errors=True)  # left by an interrupted run
+        self.names = [name for name, _ in columns]
+        self.schema = pa.schema([(name, getattr(pa, typ)()) for name, typ in columns])
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self._buffers: Dict[str, Dict[str, List]] = {}
+        self._writers: Dict[str, "pq.ParquetWriter"] = {}
+        self._text_bytes = 0
+        self.rows = 0
+
+    def buffer(self, partition: str) -> Dict[str, List]:
+        buf = self._buffers.get(partition)
+        if buf is None:
+            buf = self._buffers[partition] = {name: [] for name in self.names}
+        return buf
+
+    def maybe_flush(self, partition: str, text_bytes: int) -> None:
+        self._text_bytes += text_bytes
+        if len(self._buffers[partition][self.names[0]]) >= self.row_group_size:
+            self._flush(partition)
+        # long bodies or many partitions open at once → cap what is held in memory
+        if self._text_bytes >= BUFFER_BYTES or (
+            sum(len(b[self.names[0]]) for b in self._buffers.values()) >= 4 * self.row_group_size
+        ):
+            for key in list(self._buffers):
+                self._flush(key)
+            self._text_bytes = 0
+
+    def close(self) -> None:
+        for key in list(self._buffers):
+            self._flush(key)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+    def publish(self) -> None:
+        """Replace ``root`` with what was written (``close()`` first)."""
+        self.tmp.mkdir(parents=True, exist_ok=True)  # empty dataset: still replace
+        old = self.root.with_name(self.root.name + ".old")
+        shutil.rmtree(old, ignore_errors=True)
+        if self.root.exists():
+            self.root.rename(old)
+        self.tmp.rename(self.root)
+        shutil.rmtree(old, ignore_errors=True)
+
+    def discard(self) -> None:
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _flush(self, partition: str) -> None:
+        buf = self._buffers.pop(partition)
+        n = len(buf[self.names[0]])
+        if not n:
+            return
+        writer = self._writers.get(partition)
+        if writer is None:
+            path = self.tmp / partition / "part-0.parquet"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writer = self._writers[partition] = pq.ParquetWriter(
+                path,
+                self.schema,
+                compression=self.compression,
+                use_dictionary=[c for c in DICTIONARY_COLUMNS if c in self.names],
+            )
+        writer.write_table(pa.Table.from_pydict(buf, schema=self.schema), row_group_size=n)
+        self.rows += n
+
+
+@metrics.timed("export_parquet_seconds")
+def ndjson_to_parquet(
+    ndjson_path: str | Path,
+    submissions_dir: str | Path,
+    comments_dir: str | Path,
+    *,
+    row_group_size: int = ROW_GROUP_SIZE,
+    compression: str = "zstd",
+    partition_by_month: bool = False,
+) -> Dict[str, int]:
+    """Convert; returns ``{"submissions": rows, "comments": rows}``."""
+    if pa is None:
+        raise RuntimeError("Parquet export requires the 'pyarrow' package")
+    ndjson_path = Path(ndjson_path)
+    subs = _Dataset(Path(submissions_dir), SUBMISSION_COLUMNS,
+                    row_group_size=row_group_size, compression=compression)
+    coms = _Dataset(Path(comments_dir), COMMENT_COLUMNS,
+                    row_group_size=row_group_size, compression=compression)
+
+    ok = False
+    try:
+        for line in tqdm(iter_lines(ndjson_path), desc="Converting → Parquet"):
+            tree = jsonio.loads(line)
+            part = _month(tree["created_utc"]) if partition_by_month else ""
+
+            buf = subs.buffer(part)
+            for name in subs.names:
+                buf[name].append(tree.get(name))
+            subs.maybe_flush(part, len(tree.get("selftext") or ""))
+
+            table = CommentTable.from_nested(tree["comments"])
+            if not len(table):
+                continue
+            buf = coms.buffer(part)
+            buf["submission_id"].extend([tree["id"]] * len(table))
+            buf["id"].extend(table.ids)
+            buf["parent_id"].extend(table.parent_id(i) for i in table.dfs())
+            buf["author"].extend(table.author_name(i) for i in table.dfs())
+            buf["body"].extend(table.body(i) for i in table.dfs())
+            buf["created_utc"].extend(table.created_utc)
+            buf["score"].extend(table.score)
+            buf["depth"].extend(table.depth)
+            coms.maybe_flush(part, len(table.bodies))
+        ok = True
+    finally:
+        subs.close()
+        coms.close()
+        for ds in (subs, coms):
+            if ok:
+                ds.publish()
+            else:
+                ds.discard()
+    metrics.incr("export_parquet_rows", subs.rows + coms.rows)
+    return {"submissions": subs.rows, "comments": coms.rows}
+
+
+def _month(created_utc: Optional[int]) -> str:
+    if created_utc is None:
+        return "month=unknown"
+    return datetime.fromtimestamp(created_utc, tz=timezone.utc).strftime("month=%Y-%m")
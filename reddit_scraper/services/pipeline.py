@@ -0,0 +1,96 @@
+# reddit_scraper/services/pipeline.py
+"""
+Bounded, order-preserving hand-off between a producer, a worker pool and a
+single consumer.
+
+A feeder thread pulls items from the producer iterable and submits them to
+the executor; the resulting futures travel through a bounded queue so the
+consumer receives results in submission order while at most ``depth`` items
+are in flight.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import Executor, Future
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_POLL = 0.2  # seconds between stop-flag checks while blocked
+_DONE = object()
+
+
+class _Failure:
+    """Wraps an exception raised by the producer so the consumer can re-raise it."""
+
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+def ordered_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    executor: Executor,
+    *,
+    depth: int,
+    stop: Optional[threading.Event] = None,
+) -> Iterator[R]:
+    """
+    Like ``executor.map`` but lazy, bounded and stoppable.
+
+    * at most ``depth`` submitted-but-unconsumed futures exist at any time
+    * results are yielded in the order of ``items``
+    * once ``stop`` is set no new items are submitted; queued futures that have
+      not started are cancelled (and skipped), running ones are still yielded
+    """
+    fq: "queue.Queue[object]" = queue.Queue(maxsize=max(1, depth))
+    abort = threading.Event()  # consumer went away → feeder must not block
+
+    def _put(obj: object) -> bool:
+        while not abort.is_set():
+            try:
+                fq.put(obj, timeout=_POLL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed() -> None:
+        try:
+            for item in items:
+                if abort.is_set() or (stop is not None and stop.is_set()):
+                    break
+                if not _put(executor.submit(fn, item)):
+                    break
+        except BaseException as exc:  # surfaced in the consumer thread
+            _put(_Failure(exc))
+        finally:
+            _put(_DONE)
+
+    feeder = threading.Thread(target=_feed, name="pipeline-feeder", daemon=True)
+    feeder.start()
+    try:
+        while True:
+            obj = fq.get()
+            if obj is _DONE:
+                break
+            if isinstance(obj, _Failure):
+                raise obj.exc
+            fut: Future = obj  # type: ignore[assignment]
+            if stop is not None and stop.is_set() and fut.cancel():
+                continue
+            yield fut.result()
+    finally:
+        abort.set()
+        feeder.join()
+        # cancel whatever the feeder already queued so nothing keeps running
+        while True:
+            try:
+                obj = fq.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(obj, Future):
+                obj.cancel()
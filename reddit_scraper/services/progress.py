@@ -2,59 +2,434 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+_Key = Union[int, str]
+
+
+def _key(submission_id: str) -> _Key:
+    """Reddit IDs are base-36; as ints they take about half the memory of str."""
+    try:
+        return int(submission_id, 36)
+    except ValueError:
+        return submission_id
 
 
 class ProgressTracker:
     """
     Tracks which submission IDs have already been scraped.
-    Uses a single-table SQLite DB (`progress.sqlite` by default).
+    Uses a small SQLite DB (`progress.sqlite` by default):
+
+    * ``completed`` – IDs saved to the output (+ num_comments/score/fetched_at)
+    * ``failed``    – dead-letter table for IDs the retry policy gave up on
+    * ``frontier``  – every in-range post found by enumeration (+ listing metadata)
+    * ``meta``      – key/value state such as the saved listing cursor
+    * ``leases``    – frontier IDs claimed by a worker process, until ``expires``
+
+    Completed and failed IDs are preloaded into in-memory sets, so lookups never
+    touch SQLite. The connection runs in WAL mode and is guarded by a lock,
+    which makes one tracker safe to share between threads.
+
+    Several processes (or hosts sharing the file) can work through one
+    frontier: ``claim`` hands each worker a batch of unleased IDs in one
+    write transaction, ``heartbeat`` extends the worker's leases, and an
+    expired lease – its worker crashed or hung – makes the ID claimable again.
     """
 
     def __init__(self, db_path: str | Path = "progress.sqlite") -> None:
         self.path = Path(db_path)
-        self.conn = sqlite3.connect(self.path)
+        # other worker processes hold the write lock for a few ms at a time
+        self.conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
         self._ensure_schema()
+        self._done: Set[_Key] = {
+            _key(row[0]) for row in self.conn.execute("SELECT id FROM completed")
+        }
+        self._failed: Set[_Key] = {
+            _key(row[0]) for row in self.conn.execute("SELECT id FROM failed")
+        }
 
     # --------- Public API ----------------------------------------
 
     def is_done(self, submission_id: str) -> bool:
         """True if that ID is already marked as processed."""
-        cur = self.conn.execute(
-            "SELECT 1 FROM completed WHERE id = ? LIMIT 1", (submission_id,)
-        )
-        return cur.fetchone() is not None
+        return _key(submission_id) in self._done
+
+    def is_failed(self, submission_id: str) -> bool:
+        """True if that ID sits in the dead-letter table."""
+        return _key(submission_id) in self._failed
+
+    def filter_new(self, ids: Iterable[str], *, skip_failed: bool = True) -> List[str]:
+        """Return the IDs that still need scraping, preserving input order."""
+        done, failed = self._done, self._failed
+        out = []
+        for i in ids:
+            k = _key(i)
+            if k in done or (skip_failed and k in failed):
+                continue
+            out.append(i)
+        return out
 
     def mark_done(self, submission_id: str) -> None:
         """Insert the ID (ignores duplicates)."""
-        self.conn.execute(
-            "INSERT OR IGNORE INTO completed (id) VALUES (?)", (submission_id,)
-        )
-        self.conn.commit()
+        self.mark_batch_done([submission_id])
 
     def mark_batch_done(self, ids: Iterable[str]) -> None:
-        """Bulk-insert many IDs efficiently."""
-        self.conn.executemany(
-            "INSERT OR IGNORE INTO completed (id) VALUES (?)", ((i,) for i in ids)
-        )
-        self.conn.commit()
+        """Bulk-insert many IDs in one transaction."""
+        ids = list(ids)
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO completed (id) VALUES (?)", ((i,) for i in ids)
+            )
+            self.conn.executemany("DELETE FROM failed WHERE id = ?", ((i,) for i in ids))
+            self.conn.commit()
+            keys = [_key(i) for i in ids]
+            self._done.update(keys)
+            self._failed.difference_update(keys)
+
+    def mark_batch_fetched(
+        self, rows: Iterable[Tuple[str, int, int, Optional[int]]]
+    ) -> None:
+        """Like ``mark_batch_done`` for ``(id, num_comments, score, fetched_at)`` rows."""
+        rows = list(rows)
+        with self._lock:
+            self.conn.executemany(
+                """
+                INSERT INTO completed (id, num_comments, score, fetched_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    num_comments = excluded.num_comments,
+                    score        = excluded.score,
+                    fetched_at   = excluded.fetched_at
+                """,
+                rows,
+            )
+            self.conn.executemany("DELETE FROM failed WHERE id = ?", ((r[0],) for r in rows))
+            self.conn.executemany("DELETE FROM leases WHERE id = ?", ((r[0],) for r in rows))
+            self.conn.commit()
+            keys = [_key(r[0]) for r in rows]
+            self._done.update(keys)
+            self._failed.difference_update(keys)
+
+    def list_fetched(self) -> List[Dict]:
+        """Completed IDs with the metadata recorded when they were fetched."""
+        with self._lock:
+            cur = self.conn.execute(
+                "SELECT id, num_comments, score, fetched_at FROM completed ORDER BY id"
+            )
+            return [
+                {"id": r[0], "num_comments": r[1], "score": r[2], "fetched_at": r[3]}
+                for r in cur.fetchall()
+            ]
+
+    def mark_failed(self, submission_id: str, error: str, attempts: int) -> None:
+        """Move an ID to the dead-letter table (bumping its attempt count)."""
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT INTO failed (id, attempts, last_error, failed_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    attempts   = attempts + excluded.attempts,
+                    last_error = excluded.last_error,
+                    failed_at  = excluded.failed_at
+                """,
+                (submission_id, attempts, error, int(time.time())),
+            )
+            self.conn.execute("DELETE FROM leases WHERE id = ?", (submission_id,))
+            self.conn.commit()
+            self._failed.add(_key(submission_id))
+
+    # --------- Enumeration frontier ------------------------------
+
+    def add_to_frontier(self, items: Iterable[Dict], cursor: Optional[str]) -> None:
+        """Store one listing page and the cursor after it, atomically."""
+        now = int(time.time())
+        with self._lock:
+            self.conn.executemany(
+                """
+                INSERT OR IGNORE INTO frontier
+                    (id, created_utc, score, link_flair_text, discovered_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    (i["id"], i["created_utc"], i["score"], i["link_flair_text"], now)
+                    for i in items
+                ),
+            )
+            self._set_meta("listing_cursor", cursor)
+            self.conn.commit()
+
+    def listing_cursor(self) -> Optional[str]:
+        """Fullname to continue the listing after, or None to start at the top."""
+        return self._get_meta("listing_cursor")
+
+    def enumeration_finished_at(self) -> Optional[int]:
+        """Unix time the last full listing walk completed (None if never)."""
+        value = self._get_meta("enumeration_finished_at")
+        return int(value) if value is not None else None
+
+    def finish_enumeration(self) -> None:
+        with self._lock:
+            self._set_meta("listing_cursor", None)
+            self._set_meta("enumeration_finished_at", str(int(time.time())))
+            self.conn.commit()
+
+    def pending(self, *, skip_failed: bool = True) -> List[Dict]:
+        """Frontier rows not yet scraped, newest first."""
+        with self._lock:
+            cur = self.conn.execute(
+                """
+                SELECT id, created_utc, score, link_flair_text FROM frontier
+                ORDER BY created_utc DESC
+                """
+            )
+            rows = cur.fetchall()
+        keep = set(self.filter_new((r[0] for r in rows), skip_failed=skip_failed))
+        return [
+            {"id": r[0], "created_utc": r[1], "score": r[2], "link_flair_text": r[3]}
+            for r in rows
+            if r[0] in keep
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        """Row counts for ``stats``: completed, failed, frontier, pending and leased."""
+        with self._lock:
+            frontier = [r[0] for r in self.conn.execute("SELECT id FROM frontier")]
+            leased = self.conn.execute(
+                "SELECT COUNT(*) FROM leases WHERE expires >= ?", (time.time(),)
+            ).fetchone()[0]
+        return {
+            "completed": len(self._done),
+            "failed": len(self._failed),
+            "frontier": len(frontier),
+            "pending": len(self.filter_new(frontier)),
+            "leased": leased,
+        }
+
+    # --------- Leases (shared work queue) ------------------------
+
+    def claim(
+        self,
+        worker: str,
+        n: int,
+        ttl: float,
+        *,
+        skip_failed: bool = True,
+        min_score: Optional[int] = None,
+        flairs: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict], int]:
+        """
+        Lease up to ``n`` unfetched frontier rows to ``worker`` for ``ttl`` seconds.
+
+        Reads ``completed`` / ``failed`` from the DB rather than the in-memory
+        sets, which only know this process's own work. Returns the rows (newest
+        first, same shape as ``pending``) and how many of them were taken over
+        from an expired lease.
+        """
+        now = time.time()
+        where, params = self._claimable(skip_failed, min_score, flairs)
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")  # one claimer at a time, across processes
+            try:
+                rows = self.conn.execute(
+                    f"""
+                    SELECT f.id, f.created_utc, f.score, f.link_flair_text, l.worker
+                    FROM frontier f LEFT JOIN leases l ON l.id = f.id
+                    WHERE {where} AND (l.id IS NULL OR l.expires < ?)
+                    ORDER BY f.created_utc DESC LIMIT ?
+                    """,
+                    (*params, now, n),
+                ).fetchall()
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO leases (id, worker, expires) VALUES (?, ?, ?)",
+                    ((r[0], worker, now + ttl) for r in rows),
+                )
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+        reclaimed = sum(1 for r in rows if r[4] is not None)
+        items = [
+            {"id": r[0], "created_utc": r[1], "score": r[2], "link_flair_text": r[3]}
+            for r in rows
+        ]
+        return items, reclaimed
+
+    def outstanding(
+        self,
+        worker: str,
+        *,
+        skip_failed: bool = True,
+        min_score: Optional[int] = None,
+        flairs: Optional[List[str]] = None,
+    ) -> int:
+        """Unfetched frontier rows that are not leased to ``worker`` itself."""
+        where, params = self._claimable(skip_failed, min_score, flairs)
+        with self._lock:
+            return self.conn.execute(
+                f"""
+                SELECT COUNT(*) FROM frontier f LEFT JOIN leases l ON l.id = f.id
+                WHERE {where} AND (l.worker IS NULL OR l.worker != ?)
+                """,
+                (*params, worker),
+            ).fetchone()[0]
+
+    def try_lease(self, key: str, worker: str, ttl: float) -> bool:
+        """Take (or keep) the named lease ``key`` unless another worker holds it."""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT worker, expires FROM leases WHERE id = ?", (key,)
+                ).fetchone()
+                ok = row is None or row[0] == worker or row[1] < now
+                if ok:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO leases (id, worker, expires) VALUES (?, ?, ?)",
+                        (key, worker, now + ttl),
+                    )
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+        return ok
+
+    def lease_held(self, key: str) -> bool:
+        """True while some worker holds an unexpired lease on ``key``."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM leases WHERE id = ? AND expires >= ?", (key, time.time())
+            ).fetchone()
+        return row is not None
+
+    def heartbeat(self, worker: str, ttl: float) -> int:
+        """Extend every lease of ``worker`` to ``ttl`` seconds from now."""
+        with self._lock:
+            cur = self.conn.execute(
+                "UPDATE leases SET expires = ? WHERE worker = ?", (time.time() + ttl, worker)
+            )
+            self.conn.commit()
+        return cur.rowcount
+
+    def release(self, worker: str, ids: Optional[Iterable[str]] = None) -> None:
+        """Drop ``worker``'s leases (all of them, or just ``ids``)."""
+        with self._lock:
+            if ids is None:
+                self.conn.execute("DELETE FROM leases WHERE worker = ?", (worker,))
+            else:
+                self.conn.executemany(
+                    "DELETE FROM leases WHERE id = ? AND worker = ?",
+                    ((i, worker) for i in ids),
+                )
+            self.conn.commit()
+
+    def list_failed(self) -> List[Tuple[str, int, str]]:
+        """Return ``(id, attempts, last_error)`` for every dead-lettered ID."""
+        with self._lock:
+            cur = self.conn.execute("SELECT id, attempts, last_error FROM failed ORDER BY id")
+            return cur.fetchall()
 
     def list_done(self) -> List[str]:
         """Return all completed IDs (rarely needed, but handy for debugging)."""
-        cur = self.conn.execute("SELECT id FROM completed")
-        return [row[0] for row in cur.fetchall()]
+        with self._lock:
+            cur = self.conn.execute("SELECT id FROM completed")
+            return [row[0] for row in cur.fetchall()]
 
     def close(self) -> None:
-        self.conn.close()
+        with self._lock:
+            self.conn.close()
 
     # --------- Internals -----------------------------------------
 
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _claimable(
+        skip_failed: bool, min_score: Optional[int], flairs: Optional[List[str]]
+    ) -> Tuple[str, List[object]]:
+        """WHERE clause over ``frontier f``: unfetched rows that pass the filters."""
+        where = ["NOT EXISTS (SELECT 1 FROM completed c WHERE c.id = f.id)"]
+        params: List[object] = []
+        if skip_failed:
+            where.append("NOT EXISTS (SELECT 1 FROM failed x WHERE x.id = f.id)")
+        if min_score:
+            where.append("f.score >= ?")
+            params.append(min_score)
+        if flairs:
+            marks = ','.join('?' * len(flairs))
+            where.append(f"lower(coalesce(f.link_flair_text, '')) IN ({marks})")
+            params.extend(fl.lower() for fl in flairs)
+        return " AND ".join(where), params
+
+    def _set_meta(self, key: str, value: Optional[str]) -> None:
+        """Caller commits."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
     def _ensure_schema(self) -> None:
         self.conn.execute(
             """
             CREATE TABLE IF NOT EXISTS completed (
-                id TEXT PRIMARY KEY
+                id           TEXT PRIMARY KEY,
+                num_comments INTEGER,
+                score        INTEGER,
+                fetched_at   INTEGER
+            )
+            """
+        )
+        # DBs from before refresh support only have the id column
+        have = {row[1] for row in self.conn.execute("PRAGMA table_info(completed)")}
+        for column in ("num_comments", "score", "fetched_at"):
+            if column not in have:
+                self.conn.execute(f"ALTER TABLE completed ADD COLUMN {column} INTEGER")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS failed (
+                id         TEXT PRIMARY KEY,
+                attempts   INTEGER NOT NULL,
+                last_error TEXT,
+                failed_at  INTEGER NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS frontier (
+                id              TEXT PRIMARY KEY,
+                created_utc     INTEGER NOT NULL,
+                score           INTEGER,
+                link_flair_text TEXT,
+                discovered_at   INTEGER NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS frontier_created ON frontier (created_utc)"
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS leases (
+                id      TEXT PRIMARY KEY,
+                worker  TEXT NOT NULL,
+                expires REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS leases_worker ON leases (worker)")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT
             )
             """
         )
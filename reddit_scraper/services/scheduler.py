@@ -0,0 +1,379 @@
+# reddit_scraper/services/scheduler.py
+"""
+Many scrape jobs, one rate budget.
+
+``JobScheduler`` runs a list of ``Job``s – (subreddit, date range, filters)
+each with its own output file and progress DB – over one ``RateLimiter`` and
+one pool of fetch threads whose ``RedditClient``s (and HTTP connections) are
+shared by all jobs:
+
+* enumeration runs ``enum_workers`` jobs at a time, highest priority first;
+  a job starts fetching as soon as its own listing is done
+* fetch slots go to the highest ``priority`` with posts waiting and, within
+  a priority, are split by ``weight`` using stride scheduling – a job with
+  weight 3 gets three posts fetched for every one of a weight-1 job
+* the calling thread is the single writer for every job's output
+
+Every ``report_interval`` seconds each job's progress, rate and ETA are
+logged and published as ``job_<name>_*`` metrics gauges.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from reddit_scraper.core import metrics
+from reddit_scraper.infra.expand import ExpansionLimits
+from reddit_scraper.infra.http_cache import ResponseCache
+from reddit_scraper.infra.ratelimit import RateLimiter, RetryPolicy
+from reddit_scraper.infra.reddit import FetchError, RedditClient
+from reddit_scraper.services.scraper import Scraper
+from reddit_scraper.services.workqueue import fold_orphans
+from reddit_scraper.services.writer import GroupCommitWriter
+
+logger = logging.getLogger(__name__)
+
+STRIDE = float(1 << 20)
+ENUMERATE_MODES = ("listing", "search")
+
+
+class Job(NamedTuple):
+    subreddit: str
+    start_date: str
+    end_date: str
+    min_score: Optional[int] = None
+    flairs: Optional[List[str]] = None
+    weight: float = 1.0
+    priority: int = 0                  # higher runs first
+    enumerate_via: str = "listing"
+    name: Optional[str] = None
+    output: Optional[Path] = None      # filled in by the caller (cli.build_paths)
+    progress_db: Optional[Path] = None
+
+
+class JobStatus(NamedTuple):
+    name: str
+    state: str                         # enumerating | fetching | done | failed | stopped
+    done: int
+    failed: int
+    total: Optional[int]               # known once the job's enumeration finished
+    rate: Optional[float]              # posts/s since the job started fetching
+    eta: Optional[float]               # seconds
+
+
+def load_jobs(path: str | Path) -> List[Job]:
+    """
+    Read a job file: a JSON list (or ``{"jobs": [...]}``) of objects with
+    ``subreddit``, ``start``, ``end`` and optionally ``min_score``, ``flair``
+    (``"A,B"`` or a list), ``weight``, ``priority``, ``enumerate`` and ``name``.
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    entries = data.get("jobs") if isinstance(data, dict) else data
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path}: expected a non-empty list of jobs")
+
+    jobs = []
+    for i, e in enumerate(entries):
+        try:
+            flairs = e.get("flair")
+            if isinstance(flairs, str):
+                flairs = [f.strip() for f in flairs.split(",")]
+            job = Job(
+                subreddit=e["subreddit"],
+                start_date=e["start"],
+                end_date=e["end"],
+                min_score=e.get("min_score"),
+                flairs=flairs or None,
+                weight=float(e.get("weight", 1.0)),
+                priority=int(e.get("priority", 0)),
+                enumerate_via=e.get("enumerate", "listing"),
+                name=e.get("name"),
+            )
+        except (AttributeError, KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"{path}: job {i}: bad or missing {exc}") from None
+        if job.weight <= 0:
+            raise ValueError(f"{path}: job {i}: weight must be > 0")
+        if job.enumerate_via not in ENUMERATE_MODES:
+            raise ValueError(f"{path}: job {i}: enumerate must be one of {ENUMERATE_MODES}")
+        jobs.append(job)
+    return jobs
+
+
+class _Run:
+    """Scheduler-side state of one job."""
+
+    def __init__(self, job: Job, name: str, scraper: Scraper) -> None:
+        self.job = job
+        self.name = name
+        self.scraper = scraper
+        self.stride = STRIDE / job.weight
+        self.pass_ = 0.0
+        self.state = "enumerating"
+        self.items: Optional[Any] = None   # iterator of pending rows while fetching
+        self.writer: Optional[GroupCommitWriter] = None
+        self.inflight = 0
+        self.done = 0
+        self.failed = 0
+        self.total: Optional[int] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def status(self, now: float) -> JobStatus:
+        rate = eta = None
+        if self.started is not None:
+            elapsed = (self.finished or now) - self.started
+            rate = (self.done + self.failed) / elapsed if elapsed > 0 else None
+            if self.total is not None and rate:
+                eta = max(0, self.total - self.done - self.failed) / rate
+        if self.state == "done":
+            eta = 0.0
+        return JobStatus(self.name, self.state, self.done, self.failed, self.total, rate, eta)
+
+
+class JobScheduler:
+    """Run ``jobs`` fairly over one shared rate limiter and fetch pool."""
+
+    def __init__(
+        self,
+        jobs: Sequence[Job],
+        *,
+        workers: int = 4,
+        enum_workers: int = 2,
+        report_interval: float = 30.0,
+        max_attempts: int = 5,
+        group_size: int = 100,
+        group_interval: float = 5.0,
+        expansion: Optional[ExpansionLimits] = None,
+        http_cache: Optional[ResponseCache] = None,
+        cache_mode: str = "record",
+        validate: bool = False,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.enum_workers = max(1, enum_workers)
+        self.report_interval = report_interval
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.expansion = expansion
+        self.http_cache = http_cache
+        self.cache_mode = cache_mode
+
+        self.limiter = RateLimiter()
+        self.retry = RetryPolicy(max_attempts=max_attempts, stats=self.limiter.stats)
+        self._local = threading.local()  # one RedditClient per thread, for every job
+        self._stop = threading.Event()
+        self._vtime = 0.0                # stride pass of the last pick
+
+        self.runs: List[_Run] = []
+        for job in jobs:
+            if job.output is None or job.progress_db is None:
+                raise ValueError(f"job r/{job.subreddit}: output and progress_db must be set")
+            name = job.name or f"{job.subreddit}_{job.start_date}__{job.end_date}"
+            scraper = Scraper(
+                job.subreddit, job.start_date, job.end_date,
+                output=job.output,
+                progress_db=job.progress_db,
+                min_score=job.min_score,
+                flairs=job.flairs,
+                max_attempts=max_attempts,
+                group_size=group_size,
+                group_interval=group_interval,
+                enumerate_via=job.enumerate_via,
+                validate=validate,
+                limiter=self.limiter,
+                clients=self._client,
+                stop=self._stop,
+            )
+            self.runs.append(_Run(job, name, scraper))
+        self._setup_signals()
+
+    # --------- Public API ----------------------------------------
+
+    def run(self) -> List[JobStatus]:
+        """Enumerate and fetch every job; returns the final status of each."""
+        logger.info("Scheduling %d job(s) on %d fetch thread(s)", len(self.runs), self.workers)
+        enum_pool = ThreadPoolExecutor(self.enum_workers, thread_name_prefix="enumerate")
+        pool = ThreadPoolExecutor(self.workers, thread_name_prefix="fetch")
+        enumerating: Dict[Future, _Run] = {
+            enum_pool.submit(r.scraper.enumerate_frontier): r
+            for r in sorted(self.runs, key=lambda r: -r.job.priority)
+        }
+        inflight: Dict[Future, _Run] = {}
+        depth = self.workers * 2
+        next_report = time.monotonic() + self.report_interval
+        try:
+            while True:
+                for fut in [f for f in enumerating if f.done()]:
+                    self._start_fetching(enumerating.pop(fut), fut)
+                if not self._stop.is_set():
+                    self._fill(pool, inflight, depth)
+                if not inflight and (not enumerating or self._stop.is_set()):
+                    break
+                done, _ = wait(
+                    [*inflight, *enumerating],
+                    timeout=max(0.0, next_report - time.monotonic()),
+                    return_when=FIRST_COMPLETED,
+                )
+                for fut in done:
+                    if fut in inflight:
+                        self._finish(inflight.pop(fut), fut.result())
+                if time.monotonic() >= next_report:
+                    self.report()
+                    next_report = time.monotonic() + self.report_interval
+        finally:
+            self._stop.set()  # unfinished enumerations return after their current page
+            pool.shutdown(wait=True)
+            enum_pool.shutdown(wait=True)
+            for r in self.runs:
+                self._close(r)
+        self.report()
+        return self.status()
+
+    def status(self) -> List[JobStatus]:
+        now = time.monotonic()
+        return [r.status(now) for r in self.runs]
+
+    def report(self) -> None:
+        """Log one line per job and publish its progress as metrics gauges."""
+        for st in self.status():
+            total = "?" if st.total is None else f"{st.total:,}"
+            logger.info(
+                "%-40s %-11s %7s/%-7s failed %-4d %6s posts/s  ETA %s",
+                st.name, st.state, f"{st.done:,}", total, st.failed,
+                "-" if st.rate is None else f"{st.rate:.2f}", _duration(st.eta),
+            )
+            key = re.sub(r"\W+", "_", st.name).strip("_").lower()
+            metrics.REGISTRY.set(f"job_{key}_done", st.done)
+            metrics.REGISTRY.set(f"job_{key}_failed", st.failed)
+            if st.total is not None:
+                metrics.REGISTRY.set(f"job_{key}_remaining",
+                                     max(0, st.total - st.done - st.failed))
+            if st.eta is not None:
+                metrics.REGISTRY.set(f"job_{key}_eta_seconds", round(st.eta, 1))
+
+    # --------- Internals -----------------------------------------
+
+    def _start_fetching(self, run: _Run, fut: Future) -> None:
+        exc = fut.exception()
+        if exc is not None:
+            logger.error("Job %s: enumeration failed: %r", run.name, exc)
+            run.state = "failed"
+            return
+        if self._stop.is_set():
+            run.state = "stopped"
+            return
+        # parts left by crashed --processes workers
+        fold_orphans(run.job.output, run.scraper.progress)
+        items = list(run.scraper.pending_items())
+        run.total, run.items = len(items), iter(items)
+        run.writer = GroupCommitWriter(
+            run.job.output, run.scraper.progress,
+            group_size=self.group_size, group_interval=self.group_interval,
+        )
+        run.pass_ = max(run.pass_, self._vtime)  # no catch-up burst for a late starter
+        run.started = time.monotonic()
+        run.state = "fetching"
+        logger.info("Job %s: %d post(s) to fetch", run.name, run.total)
+        if not items:
+            self._finish_job(run)
+
+    def _fill(self, pool: ThreadPoolExecutor, inflight: Dict[Future, _Run], depth: int) -> None:
+        while len(inflight) < depth:
+            run = self._pick()
+            if run is None:
+                return
+            item = next(run.items, None)
+            if item is None:
+                run.items = None
+                if not run.inflight:
+                    self._finish_job(run)
+                continue
+            self._vtime = run.pass_
+            run.pass_ += run.stride
+            run.inflight += 1
+            inflight[pool.submit(run.scraper.fetch_one, item)] = run
+
+    def _pick(self) -> Optional[_Run]:
+        """Stride scheduling within the highest priority that has posts waiting."""
+        ready = [r for r in self.runs if r.items is not None]
+        if not ready:
+            return None
+        top = max(r.job.priority for r in ready)
+        return min((r for r in ready if r.job.priority == top), key=lambda r: r.pass_)
+
+    def _finish(self, run: _Run, result: Any) -> None:
+        run.inflight -= 1
+        if isinstance(result, FetchError):
+            run.scraper.dead_letter(result)
+            run.failed += 1
+        else:
+            run.writer.write(result)
+            run.done += 1
+        if run.items is None and not run.inflight and run.state == "fetching":
+            self._finish_job(run)
+
+    def _finish_job(self, run: _Run) -> None:
+        run.items = None
+        run.finished = time.monotonic()
+        run.state = "done"
+        if run.writer is not None:
+            run.writer.close()
+        logger.info("Job %s finished – %d saved, %d failed in %s", run.name, run.done,
+                    run.failed, _duration(run.finished - (run.started or run.finished)))
+
+    def _close(self, run: _Run) -> None:
+        if run.state in ("enumerating", "fetching"):
+            run.state = "stopped"
+            run.finished = time.monotonic()
+        try:
+            if run.writer is not None:
+                run.writer.close()  # idempotent; last group must be durable first
+        finally:
+            run.scraper.progress.close()
+
+    def _client(self) -> RedditClient:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = RedditClient(
+                limiter=self.limiter,
+                retry=self.retry,
+                expansion=self.expansion,
+                cache=self.http_cache,
+                cache_mode=self.cache_mode,
+            )
+        return client
+
+    def _setup_signals(self) -> None:
+        def _handler(sig_num, _frame):
+            sig_name = signal.Signals(sig_num).name
+            if self._stop.is_set():
+                logger.warning("Received %s again – exiting now", sig_name)
+                sys.exit(1)
+            logger.warning("Received %s – finishing in-flight posts, send again to force exit…",
+                           sig_name)
+            self._stop.set()
+
+        if threading.current_thread() is not threading.main_thread():
+            return
+        signal.signal(signal.SIGINT, _handler)
+        signal.signal(signal.SIGTERM, _handler)
+
+
+# --------- helpers --------------------------------------------------------- #
+def _duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "?"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
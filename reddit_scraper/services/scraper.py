@@ -1,22 +1,119 @@
 # reddit_scraper/services/scraper.py
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 import signal
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Union
 
 from tqdm import tqdm
 
-from reddit_scraper.core.models import Submission, export_ndjson
-from reddit_scraper.infra.reddit import RedditClient
+from reddit_scraper.core import metrics
+from reddit_scraper.core.models import RawSubmission, Record, Submission
+from reddit_scraper.infra.expand import ExpansionLimits
+from reddit_scraper.infra.http_cache import ResponseCache
+from reddit_scraper.infra.ratelimit import RateLimiter, RetryPolicy
+from reddit_scraper.infra.reddit import FetchError, RedditClient, matches_filters
+from reddit_scraper.infra.sources import ArchiveSource, SearchSource
+from reddit_scraper.services.enumeration import ShardedEnumerator, WindowSource
+from reddit_scraper.services.pipeline import ordered_map
 from reddit_scraper.services.progress import ProgressTracker
+from reddit_scraper.services.sinks import Sink
+from reddit_scraper.services.workqueue import (
+    ENUM_LEASE,
+    LeaseKeeper,
+    fold_orphans,
+    fold_part,
+    hold_part,
+    iter_claimed,
+    part_path,
+)
+from reddit_scraper.services.writer import GroupCommitter, GroupCommitWriter
+
+
+# a later top-up walk re-checks this much history before the previous walk's end,
+# for posts that show up in /new late
+LISTING_SLACK = 3_600
+
+
+class Fetched:
+    """
+    One streamed submission: ``record`` is a ``Submission`` or ``RawSubmission``
+    (``record.dict()`` gives the plain dict). Call ``ack()`` once it has been
+    processed – only acknowledged IDs are checkpointed, the rest are fetched
+    again by the next run.
+    """
+
+    __slots__ = ("record", "_committer", "_acked")
+
+    def __init__(self, record: Record, committer: GroupCommitter, *, acked: bool = False) -> None:
+        self.record = record
+        self._committer = committer
+        self._acked = acked
+
+    @property
+    def id(self) -> str:
+        return self.record.id
+
+    @property
+    def acked(self) -> bool:
+        return self._acked
+
+    def ack(self) -> None:
+        if not self._acked:
+            self._acked = True
+            self._committer.ack(self.record)
+
+    def __repr__(self) -> str:
+        return f"Fetched({self.id!r}, acked={self._acked})"
+
+
+class _Failure:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+_DONE = object()
 
 
 class Scraper:
     """
     Coordinator: Reddit feed → full post → JSON → checkpoint DB
+
+    Runs in two phases: enumeration walks the listing into the frontier table
+    of the progress DB (saving the cursor after every page), then the fetch
+    phase works through the frontier's unfetched IDs. A resume continues the
+    listing from its cursor and goes straight to pending posts.
+
+    ``enumerate_via="search"`` / ``"archive"`` replaces the capped ``/new`` walk
+    with sharded time-window enumeration over Reddit search or a local dump.
+
+    With ``workers > 1`` enumeration feeds a bounded queue, a thread pool fetches
+    trees in parallel and the calling thread stays the single writer that owns
+    the NDJSON file and the progress DB. Records are checkpointed in groups of
+    ``group_size`` (or every ``group_interval`` seconds) once fsynced.
+
+    Trees are written as fetched (``RawSubmission``); ``validate=True`` runs
+    every one through the pydantic models first.
+
+    With ``worker_id`` the scraper is one of several cooperating processes
+    (see ``services.workqueue``): it claims leased batches from the shared
+    progress DB instead of taking every pending post, writes a part file and
+    folds it into ``output`` at the end.
+
+    Library use: ``iter_submissions()`` / ``aiter_submissions()`` stream the
+    same pipeline in-process instead of ``run()``. Fetching never runs more
+    than ``queue_size`` posts ahead of the consumer, files are optional sinks
+    and a post is checkpointed only after its ``Fetched.ack()``. A scraper
+    runs once – ``run``, ``refresh`` and the iterators all close its progress
+    DB when they finish.
     """
 
     def __init__(
@@ -29,6 +126,25 @@ class Scraper:
         min_score: Optional[int] = None,
         flairs: Optional[List[str]] = None,
         progress_db: str | Path = "progress.sqlite",
+        workers: int = 1,
+        queue_size: Optional[int] = None,
+        max_attempts: int = 5,
+        retry_failed: bool = False,
+        group_size: int = 100,
+        group_interval: float = 5.0,
+        enumerate_via: str = "listing",
+        archive: Optional[str | Path] = None,
+        enum_workers: int = 4,
+        expansion: Optional[ExpansionLimits] = None,
+        http_cache: Optional[ResponseCache] = None,
+        cache_mode: str = "record",
+        validate: bool = False,
+        worker_id: Optional[str] = None,
+        lease_size: Optional[int] = None,
+        lease_ttl: float = 120.0,
+        limiter: Optional[RateLimiter] = None,
+        clients: Optional[Callable[[], RedditClient]] = None,
+        stop: Optional[threading.Event] = None,
     ) -> None:
         self.subreddit = subreddit
         self.start_date = start_date
@@ -36,53 +152,425 @@ class Scraper:
         self.min_score = min_score
         self.flairs = flairs
         self.output = Path(output)
+        self.workers = max(1, workers)
+        self.queue_size = queue_size or self.workers * 4
+        self.retry_failed = retry_failed
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.enumerate_via = enumerate_via  # "listing" | "search" | "archive"
+        self.archive = archive
+        self.enum_workers = enum_workers
+        self.expansion = expansion
+        self.http_cache = http_cache
+        self.cache_mode = cache_mode
+        self.validate = validate
+        self.worker_id = worker_id
+        self.lease_size = lease_size or self.queue_size  # about what is in flight
+        self.lease_ttl = lease_ttl
 
-        self.reddit = RedditClient()
+        # one budget for the whole process, shared by every worker's client
+        self.limiter = limiter or RateLimiter()
+        self.retry = RetryPolicy(max_attempts=max_attempts, stats=self.limiter.stats)
+        metrics.collect("api", self.limiter.stats.snapshot)
+        self._clients = clients  # a scheduler's per-thread clients, shared across scrapers
+        self._local = threading.local()  # one RedditClient per worker thread
+        self.reddit = clients() if clients is not None else self._new_client()
         self.progress = ProgressTracker(progress_db)
         self.logger = logging.getLogger(f"{__name__}.{subreddit}")
-        self._setup_signals()
+        self._stop = stop or threading.Event()
+        if stop is None:  # otherwise whoever owns ``stop`` handles signals
+            self._setup_signals()
 
     # ----------------------------- main loop --------------------------- #
     def run(self) -> None:
         self.logger.info(
-            "Starting scrape of r/%s from %s to %s", self.subreddit, self.start_date, self.end_date
+            "Starting scrape of r/%s from %s to %s (%d worker%s)",
+            self.subreddit, self.start_date, self.end_date,
+            self.workers, "" if self.workers == 1 else "s",
         )
+        output = self.output if self.worker_id is None else part_path(self.output, self.worker_id)
+        try:
+            # records a crashed worker checkpointed are only in its part file
+            fold_orphans(self.output, self.progress)
+            with contextlib.ExitStack() as part:
+                if self.worker_id is not None:
+                    part.enter_context(hold_part(output))
+                with self._leases():
+                    with metrics.timer("enumerate_seconds"):
+                        self._enumerate()
+                    with metrics.timer("fetch_phase_seconds"):
+                        saved = self._fetch_into(output, self._work_items,
+                                                 desc=f"Downloaded {self.worker_id or ''}".rstrip())
+                if self.worker_id is not None:
+                    fold_part(output, self.output)
+                    fold_orphans(self.output, self.progress)
+            if self._stop.is_set():
+                self.logger.warning("Stopped early – %d new posts saved", saved)
+            else:
+                self.logger.info("Scraping finished – %d new posts saved", saved)
+            self.logger.info("API calls: %s", self._format_stats())
+        finally:
+            self.progress.close()
+
+    def iter_submissions(self, *, sinks: Sequence[Sink] = ()) -> Iterator[Fetched]:
+        """
+        Enumerate, then yield every pending post as soon as it is fetched.
 
-        bar = tqdm(unit="posts", desc="Downloaded")
+        Each record is handed to ``sinks`` (e.g. ``NDJSONSink(path)``) before
+        it is yielded; ``Fetched.ack()`` checkpoints it with the next group.
+        Breaking out of the loop stops fetching; closing the generator commits
+        whatever was acknowledged.
+        """
+        committer = self._committer(sinks)
         try:
-            for item in self.reddit.list_submission_ids(
-                self.subreddit,
-                self.start_date,
-                self.end_date,
-                min_score=self.min_score,
-                flairs=self.flairs,
-            ):
-                sid = item["id"]
-                if self.progress.is_done(sid):
-                    self.logger.debug("Skip already-scraped id=%s", sid)
-                    continue
+            yield from self._stream(committer)
+        finally:
+            try:
+                committer.close()
+            finally:
+                self.progress.close()
 
-                raw_tree = self.reddit.fetch_submission_tree(sid)
-                submission = Submission.from_pushshift_reddit(raw_tree)
+    async def aiter_submissions(
+        self, *, sinks: Sequence[Sink] = (), depth: Optional[int] = None
+    ) -> AsyncIterator[Fetched]:
+        """
+        ``iter_submissions`` for asyncio code.
 
-                export_ndjson([submission], self.output, append=True)
-                self.progress.mark_done(sid)
+        The blocking pipeline runs in a worker thread and hands posts over
+        through a queue of ``depth`` (default ``queue_size``) items, so a slow
+        consumer pauses fetching instead of buffering the subreddit.
+        """
+        loop = asyncio.get_running_loop()
+        handoff: asyncio.Queue = asyncio.Queue(maxsize=depth or self.queue_size)
+        committer = self._committer(sinks)
 
-                bar.update()
-                self.logger.debug("Saved id=%s  (%d comments)", submission.id, len(submission.comments))
+        def _pump() -> None:
+            def put(obj: object) -> None:
+                asyncio.run_coroutine_threadsafe(handoff.put(obj), loop).result()
+
+            stream = self._stream(committer)
+            try:
+                for fetched in stream:
+                    put(fetched)
+            except BaseException as exc:  # re-raised in the consumer
+                put(_Failure(exc))
+            else:
+                put(_DONE)
+            finally:
+                stream.close()
 
-            self.logger.info("Scraping finished – %d new posts saved", bar.n)
+        pump = loop.run_in_executor(None, _pump)
+        try:
+            while True:
+                item = await handoff.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.exc
+                yield item
+        finally:
+            self._stop.set()
+            while not pump.done():  # unblock a pump waiting on the full queue
+                while not handoff.empty():
+                    handoff.get_nowait()
+                await asyncio.wait([pump], timeout=0.05)
+            try:
+                # acks can arrive until here, so the last group is committed now
+                await loop.run_in_executor(None, committer.close)
+            finally:
+                self.progress.close()
+
+    def refresh(self, delta_output: str | Path, *, threshold: int = 1) -> None:
+        """
+        Re-fetch already-scraped threads whose comment count grew by ``threshold``.
+
+        Current counts come from ``/api/info`` (100 posts per call). Updated
+        trees go to ``delta_output``; each line carries a ``replaces`` object
+        naming the version (``fetched_at``) it supersedes.
+        """
+        self.logger.info("Refreshing r/%s from %s to %s", self.subreddit, self.start_date,
+                         self.end_date)
+        try:
+            fold_orphans(self.output, self.progress)
+            known = {row["id"]: row for row in self.progress.list_fetched()}
+            stale = []
+            for info in self.reddit.fetch_info(list(known)):
+                old = known[info["id"]]
+                if old["num_comments"] is None or (
+                    info["num_comments"] - old["num_comments"] >= threshold
+                ):
+                    stale.append(info)
+                if self._stop.is_set():
+                    return
+            self.logger.info("%d of %d thread(s) changed", len(stale), len(known))
+
+            def _replaces(sub: Record) -> Dict:
+                old = known[sub.id]
+                replaced = {"fetched_at": old["fetched_at"], "num_comments": old["num_comments"]}
+                return {"replaces": replaced}
+
+            saved = self._fetch_into(delta_output, lambda _: iter(stale), desc="Refreshed",
+                                     extra=_replaces)
+            self.logger.info("Refresh finished – %d updated thread(s) in %s", saved, delta_output)
+            self.logger.info("API calls: %s", self._format_stats())
         finally:
-            bar.close()
             self.progress.close()
 
+    def _fetch_into(
+        self,
+        output: str | Path,
+        items: Callable[[GroupCommitter], Iterator[Dict]],
+        *,
+        desc: str,
+        extra: Optional[Callable[[Record], Dict]] = None,
+    ) -> int:
+        """Fetch ``items(writer)`` and group-commit them to ``output``; returns posts saved."""
+        bar = tqdm(unit="posts", desc=desc)
+        writer = GroupCommitWriter(
+            output,
+            self.progress,
+            group_size=self.group_size,
+            group_interval=self.group_interval,
+        )
+        try:
+            results = self._fetch_all(items(writer))
+            for fetched in self._deliver(results, writer, extra=extra, ack=True):
+                bar.update()
+                self.logger.debug("Saved id=%s  (%d comments)", fetched.id,
+                                  len(fetched.record.comments))
+        finally:
+            bar.close()
+            writer.close()  # last group must be durable before the DB closes
+        return bar.n
+
+    def _stream(self, committer: GroupCommitter) -> Iterator[Fetched]:
+        with self._leases():
+            try:
+                with metrics.timer("enumerate_seconds"):
+                    self._enumerate()
+                if self._stop.is_set():
+                    return
+                yield from self._deliver(self._fetch_all(self._work_items(committer)), committer)
+            finally:
+                committer.commit()  # checkpoint acked posts before their leases go
+
+    def _deliver(
+        self,
+        results: Iterator[Union[Record, FetchError]],
+        committer: GroupCommitter,
+        *,
+        extra: Optional[Callable[[Record], Dict]] = None,
+        ack: bool = False,
+    ) -> Iterator[Fetched]:
+        """Dead-letter failures, write the rest to ``committer`` and yield them."""
+        failed = 0
+        try:
+            for result in results:
+                if isinstance(result, FetchError):
+                    self.dead_letter(result)
+                    failed += 1
+                    continue
+                committer.write(result, extra(result) if extra else None, ack=ack)
+                yield Fetched(result, committer, acked=ack)
+        finally:
+            if failed:
+                self.logger.warning("%d post(s) dead-lettered in %s", failed, self.progress.path)
+
+    # ------------------- building blocks (services.scheduler) ------------ #
+    def enumerate_frontier(self) -> None:
+        """Phase 1 on its own: list the range into the frontier."""
+        with metrics.timer("enumerate_seconds"):
+            self._enumerate()
+
+    def pending_items(self) -> Iterator[Dict]:
+        """Phase 2 input: unfetched frontier rows that pass the filters."""
+        return self._iter_pending()
+
+    def fetch_one(self, item: Dict) -> Union[Record, FetchError]:
+        """Fetch one frontier row (thread-safe); a ``FetchError`` is returned, not raised."""
+        return self._fetch(item)
+
+    def dead_letter(self, error: FetchError) -> None:
+        self.logger.warning("Giving up on id=%s: %s", error.submission_id, error.error)
+        self.progress.mark_failed(error.submission_id, repr(error.error), error.attempts)
+        metrics.incr("posts_failed")
+
+    def _committer(self, sinks: Sequence[Sink]) -> GroupCommitter:
+        return GroupCommitter(
+            self.progress, sinks, group_size=self.group_size, group_interval=self.group_interval
+        )
+
+    # ----------------------------- stages ------------------------------ #
+    def _enumerate(self) -> None:
+        """Phase 1: fill the frontier, resuming from the saved cursor."""
+        if self.worker_id is None:
+            self._enumerate_frontier()
+            return
+        if not self.progress.try_lease(ENUM_LEASE, self.worker_id, self.lease_ttl):
+            self.logger.info("Another worker is enumerating – fetching its finds")
+            return
+        try:
+            self._enumerate_frontier()
+        finally:
+            self.progress.release(self.worker_id, [ENUM_LEASE])
+
+    def _enumerate_frontier(self) -> None:
+        cursor = self.progress.listing_cursor()
+        finished_at = self.progress.enumeration_finished_at()
+        range_end = RedditClient._to_ts(self.end_date) + 86_399
+        if cursor is None and finished_at is not None and finished_at > range_end:
+            self.logger.info("Frontier already complete – skipping the listing walk")
+            return
+
+        # an earlier complete walk covered everything older than its end time
+        stop_ts = finished_at - LISTING_SLACK if finished_at else None
+        if cursor:
+            self.logger.info("Resuming enumeration at %s", cursor)
+
+        if self.enumerate_via == "listing":
+            found = self._walk_listing(cursor, stop_ts)
+        else:
+            found = self._walk_windows(cursor, stop_ts)
+        if self._stop.is_set():
+            return
+        self.progress.finish_enumeration()
+        self.logger.info("Enumeration finished – %d post(s) listed", found)
+
+    def _walk_listing(self, cursor: Optional[str], stop_ts: Optional[int]) -> int:
+        if cursor and not cursor.startswith("t3_"):
+            cursor = None  # left over from a different enumeration mode
+        found = 0
+        for page in self._client().list_submission_pages(
+            self.subreddit, self.start_date, self.end_date, cursor=cursor, stop_ts=stop_ts
+        ):
+            self.progress.add_to_frontier(page.items, page.cursor)
+            found += len(page.items)
+            if self._stop.is_set():
+                break
+        return found
+
+    def _walk_windows(self, cursor: Optional[str], stop_ts: Optional[int]) -> int:
+        # cursor "ts:<n>" = every window at or after n has been saved
+        start = RedditClient._to_ts(self.start_date)
+        end = RedditClient._to_ts(self.end_date) + 86_400
+        if stop_ts is not None:
+            start = max(start, stop_ts)
+        if cursor and cursor.startswith("ts:"):
+            end = int(cursor[3:])
+
+        engine = ShardedEnumerator(
+            self._window_source(), workers=self.enum_workers, stop=self._stop
+        )
+        found = 0
+        for window in engine.iter_windows(start, end):
+            self.progress.add_to_frontier(window.items, f"ts:{window.start}")
+            found += len(window.items)
+        return found
+
+    def _window_source(self) -> WindowSource:
+        if self.enumerate_via == "search":
+            return SearchSource(self.subreddit, self._client)
+        if self.enumerate_via == "archive":
+            if self.archive is None:
+                raise ValueError("enumerate_via='archive' needs an archive path")
+            return ArchiveSource(self.archive, self.subreddit)
+        raise ValueError(f"unknown enumeration mode {self.enumerate_via!r}")
+
+    def _work_items(self, committer: GroupCommitter) -> Iterator[Dict]:
+        if self.worker_id is None:
+            return self._iter_pending()
+        return iter_claimed(
+            self.progress, self.worker_id,
+            batch=self.lease_size, ttl=self.lease_ttl, stop=self._stop,
+            skip_failed=not self.retry_failed, min_score=self.min_score, flairs=self.flairs,
+            idle=committer.commit,
+        )
+
+    @contextlib.contextmanager
+    def _leases(self) -> Iterator[None]:
+        """Worker mode: heartbeat our leases meanwhile, hand back the unfinished ones after."""
+        if self.worker_id is None:
+            yield
+            return
+        with LeaseKeeper(self.progress, self.worker_id, self.lease_ttl):
+            try:
+                yield
+            finally:
+                self.progress.release(self.worker_id)
+
+    def _iter_pending(self) -> Iterator[Dict]:
+        """Phase 2 input: unfetched frontier rows that pass the filters."""
+        for item in self.progress.pending(skip_failed=not self.retry_failed):
+            if self._stop.is_set():
+                return
+            if matches_filters(item, min_score=self.min_score, flairs=self.flairs):
+                yield item
+
+    def _fetch_all(self, items: Iterator[Dict]) -> Iterator[Union[Record, FetchError]]:
+        if self.workers == 1:
+            for item in items:
+                if self._stop.is_set():
+                    return
+                yield self._fetch(item)
+            return
+
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="fetch") as pool:
+            yield from ordered_map(
+                self._fetch, items, pool, depth=self.queue_size, stop=self._stop
+            )
+
+    def _fetch(self, item: Dict) -> Union[Record, FetchError]:
+        try:
+            raw_tree = self._client().fetch_submission_tree(item["id"])
+        except FetchError as exc:  # handed to the writer for dead-lettering
+            return exc
+        if self.validate:
+            with metrics.timer("validate_seconds"):
+                return Submission.from_pushshift_reddit(raw_tree)
+        return RawSubmission(raw_tree)
+
+    def _client(self) -> RedditClient:
+        """PRAW is not thread-safe, so every worker thread gets its own client."""
+        if self._clients is not None:
+            return self._clients()
+        if threading.current_thread() is threading.main_thread():
+            return self.reddit
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self._new_client()
+        return client
+
+    def _new_client(self) -> RedditClient:
+        return RedditClient(
+            limiter=self.limiter,
+            retry=self.retry,
+            expansion=self.expansion,
+            cache=self.http_cache,
+            cache_mode=self.cache_mode,
+        )
+
+    def _format_stats(self) -> str:
+        st = self.limiter.stats.snapshot()
+        return (
+            f"{st['requests']:.0f} requests, {st['throttled']:.0f} throttled "
+            f"({st['throttle_seconds']:.1f}s), {st['rate_limited']:.0f} rate-limited, "
+            f"{st['retries']:.0f} retries, "
+            f"{st['failed']:.0f} failed"
+        )
+
     # ------------------------- graceful exit --------------------------- #
     def _setup_signals(self) -> None:
         def _handler(sig_num, _frame):
             sig_name = signal.Signals(sig_num).name
-            self.logger.warning("Received %s – shutting down gracefully…", sig_name)
-            self.progress.close()
-            sys.exit(0)
+            if self._stop.is_set():
+                self.logger.warning("Received %s again – exiting now", sig_name)
+                sys.exit(1)
+            self.logger.warning(
+                "Received %s – finishing in-flight posts, send again to force exit…", sig_name
+            )
+            self._stop.set()
 
+        if threading.current_thread() is not threading.main_thread():
+            return  # signal handlers can only be installed from the main thread
         signal.signal(signal.SIGINT, _handler)
         signal.signal(signal.SIGTERM, _handler)
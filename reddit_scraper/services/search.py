@@ -0,0 +1,351 @@
+# reddit_scraper/services/search.py
+"""
+Local full-text search over scraped threads.
+
+``SearchStore`` keeps posts and comments in one SQLite file with FTS5
+indexes over titles, selftext and comment bodies (porter-stemmed, diacritics
+folded). ``ingest`` is incremental: every source file has a byte-offset
+watermark, so re-running it only reads what was appended since – plain or
+compressed NDJSON alike. Records are loaded in large transactions, and a
+post that shows up again (``--refresh`` deltas, re-scrapes) replaces its
+earlier copy together with its comments.
+
+``search`` returns bm25-ranked hits with a highlighted snippet plus the
+thread context: post title and permalink, and for comments the parent
+comment.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from reddit_scraper.core import jsonio, metrics
+from reddit_scraper.core.flat import NO_PARENT, CommentTable
+from reddit_scraper.core.framed import iter_blocks
+
+logger = logging.getLogger(__name__)
+
+BATCH_RECORDS = 2_000        # posts per ingest transaction
+SNIPPET_TOKENS = 24
+KINDS = ("all", "posts", "comments")
+SCHEMA_VERSION = 1           # PRAGMA user_version once _SCHEMA is in place
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path      TEXT PRIMARY KEY,
+    watermark INTEGER NOT NULL          -- bytes of the file already ingested
+);
+CREATE TABLE IF NOT EXISTS posts (
+    rowid        INTEGER PRIMARY KEY AUTOINCREMENT,
+    id           TEXT NOT NULL UNIQUE,
+    title        TEXT,
+    selftext     TEXT,
+    author       TEXT,
+    score        INTEGER,
+    num_comments INTEGER,
+    created_utc  INTEGER,
+    flair        TEXT,
+    permalink    TEXT,
+    url          TEXT
+);
+CREATE TABLE IF NOT EXISTS comments (
+    rowid       INTEGER PRIMARY KEY AUTOINCREMENT,
+    id          TEXT NOT NULL,
+    post        INTEGER NOT NULL,       -- posts.rowid
+    parent      INTEGER,                -- comments.rowid of the parent, NULL for top level
+    author      TEXT,
+    body        TEXT,
+    score       INTEGER,
+    created_utc INTEGER,
+    depth       INTEGER
+);
+CREATE INDEX IF NOT EXISTS comments_post ON comments(post);
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    title, selftext, content='posts', content_rowid='rowid',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5(
+    body, content='comments', content_rowid='rowid',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+"""
+
+
+class Hit(NamedTuple):
+    kind: str                    # "post" | "comment"
+    rank: float                  # bm25, lower is better
+    post_id: str
+    title: str
+    permalink: Optional[str]
+    comment_id: Optional[str]
+    author: Optional[str]
+    score: Optional[int]
+    created_utc: Optional[int]
+    snippet: str
+    parent: Optional[str]        # parent comment body (comments only)
+
+    @property
+    def url(self) -> Optional[str]:
+        if not self.permalink:
+            return None
+        link = f"https://www.reddit.com{self.permalink}"
+        return f"{link.rstrip('/')}/{self.comment_id}/" if self.comment_id else link
+
+
+class IngestStats(NamedTuple):
+    posts: int
+    comments: int
+    bytes: int
+
+
+class SearchStore:
+    """One SQLite + FTS5 database of posts and comments."""
+
+    def __init__(self, db_path: str | Path) -> None:
+        self.path = Path(db_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA cache_size=-65536")     # 64 MiB page cache
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        # only a new database is written to here, so plain searches never wait on an ingest
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self.conn.executescript(
+                f"BEGIN IMMEDIATE; {_SCHEMA}"
+                # title matches weigh 4× selftext matches
+                "INSERT INTO posts_fts (posts_fts, rank) VALUES ('rank', 'bm25(4.0, 1.0)');"
+                f"PRAGMA user_version = {SCHEMA_VERSION}; COMMIT;"
+            )
+
+    # --------- Public API ----------------------------------------
+
+    @metrics.timed("ingest_seconds")
+    def ingest(self, ndjson: str | Path, *, batch_records: int = BATCH_RECORDS) -> IngestStats:
+        """Load whatever ``ndjson`` gained since the last call."""
+        path = Path(ndjson).resolve()
+        key = str(path)
+        row = self.conn.execute("SELECT watermark FROM sources WHERE path = ?", (key,)).fetchone()
+        start = row[0] if row else 0
+        size = path.stat().st_size
+        if start > size:  # file was rewritten – start over, copies get replaced by ID
+            logger.warning("%s shrank below its watermark – re-ingesting", path)
+            start = 0
+        if start == size:
+            return IngestStats(0, 0, 0)
+
+        posts = comments = 0
+        batch: List[bytes] = []
+        watermark = start
+        for lines, resume_at in iter_blocks(path, start, records=batch_records):
+            batch.extend(lines)
+            watermark = resume_at
+            if len(batch) >= batch_records:
+                c = self._load(batch, key, watermark)
+                posts, comments, batch = posts + len(batch), comments + c, []
+        c = self._load(batch, key, watermark)
+        posts, comments = posts + len(batch), comments + c
+        metrics.incr("ingest_posts", posts)
+        metrics.incr("ingest_comments", comments)
+        logger.info("Indexed %d post(s), %d comment(s) from %s", posts, comments, path.name)
+        return IngestStats(posts, comments, watermark - start)
+
+    def search(
+        self,
+        query: str,
+        *,
+        kind: str = "all",
+        limit: int = 20,
+        min_score: Optional[int] = None,
+    ) -> List[Hit]:
+        """Best ``limit`` matches for an FTS5 ``query`` (bm25; title hits weigh more)."""
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {KINDS}")
+        floor = min_score if min_score is not None else -(2**63)
+        hits: List[Hit] = []
+        if kind in ("all", "posts"):
+            hits.extend(
+                Hit("post", *r[:4], None, *r[4:], None)
+                for r in self.conn.execute(
+                    "SELECT posts_fts.rank, p.id, p.title, p.permalink, p.author, "
+                    "p.score, p.created_utc, "
+                    f"snippet(posts_fts, -1, '[', ']', ' … ', {SNIPPET_TOKENS}) "
+                    "FROM posts_fts JOIN posts p ON p.rowid = posts_fts.rowid "
+                    "WHERE posts_fts MATCH ? AND p.score >= ? "
+                    "ORDER BY posts_fts.rank LIMIT ?",
+                    (query, floor, limit),
+                )
+            )
+        if kind in ("all", "comments"):
+            hits.extend(
+                Hit("comment", *r)
+                for r in self.conn.execute(
+                    "SELECT comments_fts.rank, p.id, p.title, p.permalink, c.id, c.author, "
+                    "c.score, c.created_utc, "
+                    f"snippet(comments_fts, 0, '[', ']', ' … ', {SNIPPET_TOKENS}), "
+                    "substr(pc.body, 1, 200) "
+                    "FROM comments_fts JOIN comments c ON c.rowid = comments_fts.rowid "
+                    "JOIN posts p ON p.rowid = c.post "
+                    "LEFT JOIN comments pc ON pc.rowid = c.parent "
+                    "WHERE comments_fts MATCH ? AND c.score >= ? "
+                    "ORDER BY comments_fts.rank LIMIT ?",
+                    (query, floor, limit),
+                )
+            )
+        hits.sort(key=lambda h: h.rank)
+        return hits[:limit]
+
+    def thread(self, post_id: str) -> List[Dict[str, Any]]:
+        """Comments of one stored thread in DFS order (``depth`` for indentation)."""
+        return [
+            dict(zip(("id", "author", "body", "score", "created_utc", "depth"), r))
+            for r in self.conn.execute(
+                "SELECT c.id, c.author, c.body, c.score, c.created_utc, c.depth "
+                "FROM comments c JOIN posts p ON p.rowid = c.post WHERE p.id = ? "
+                "ORDER BY c.rowid",
+                (post_id,),
+            )
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        posts = self.conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+        comments = self.conn.execute("SELECT COUNT(*) FROM comments").fetchone()[0]
+        return {"posts": posts, "comments": comments}
+
+    def optimize(self) -> None:
+        """Merge FTS segments (worth it after a large ingest)."""
+        with self.conn:
+            self.conn.execute("INSERT INTO posts_fts(posts_fts) VALUES ('optimize')")
+            self.conn.execute("INSERT INTO comments_fts(comments_fts) VALUES ('optimize')")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # --------- Internals -----------------------------------------
+
+    def _load(self, lines: List[bytes], source: str, watermark: int) -> int:
+        """Insert one batch and advance the source's watermark, atomically."""
+        trees: Dict[str, Dict[str, Any]] = {}
+        for line in lines:  # within a batch the last copy of a post wins
+            tree = jsonio.loads(line)
+            trees.pop(tree["id"], None)
+            trees[tree["id"]] = tree
+
+        cur = self.conn.cursor()
+        comments = 0
+        with self.conn:
+            self._drop(cur, trees)
+            last_post = _max_rowid(cur, "posts")
+            last_comment = _max_rowid(cur, "comments")
+            for tree in trees.values():
+                cur.execute(
+                    "INSERT INTO posts (id, title, selftext, author, score, num_comments, "
+                    "created_utc, flair, permalink, url) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (tree["id"], tree.get("title"), tree.get("selftext"), tree.get("author"),
+                     tree.get("score"), tree.get("num_comments"), tree.get("created_utc"),
+                     tree.get("link_flair_text"), tree.get("permalink"), tree.get("url")),
+                )
+                comments += self._insert_comments(cur, cur.lastrowid, tree.get("comments") or [])
+            # bulk-feed the external-content FTS tables from the new rows
+            cur.execute(
+                "INSERT INTO posts_fts (rowid, title, selftext) "
+                "SELECT rowid, title, selftext FROM posts WHERE rowid > ?", (last_post,),
+            )
+            cur.execute(
+                "INSERT INTO comments_fts (rowid, body) "
+                "SELECT rowid, body FROM comments WHERE rowid > ?", (last_comment,),
+            )
+            cur.execute(
+                "INSERT OR REPLACE INTO sources (path, watermark) VALUES (?, ?)",
+                (source, watermark),
+            )
+        return comments
+
+    def _insert_comments(self, cur: sqlite3.Cursor, post: int, nested: List[Dict]) -> int:
+        table = CommentTable.from_nested(nested)
+        if not len(table):
+            return 0
+        base = _max_rowid(cur, "comments") + 1  # AUTOINCREMENT → rows land at base + i
+        cur.executemany(
+            "INSERT INTO comments (rowid, id, post, parent, author, body, score, created_utc, "
+            "depth) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            _comment_rows(table, post, base),
+        )
+        return len(table)
+
+    @staticmethod
+    def _drop(cur: sqlite3.Cursor, trees: Dict[str, Dict[str, Any]]) -> None:
+        """Remove stored copies of posts about to be re-inserted (FTS rows first)."""
+        for (post,) in _existing(cur, trees):
+            cur.execute(
+                "INSERT INTO comments_fts (comments_fts, rowid, body) "
+                "SELECT 'delete', rowid, body FROM comments WHERE post = ?", (post,),
+            )
+            cur.execute("DELETE FROM comments WHERE post = ?", (post,))
+            cur.execute(
+                "INSERT INTO posts_fts (posts_fts, rowid, title, selftext) "
+                "SELECT 'delete', rowid, title, selftext FROM posts WHERE rowid = ?", (post,),
+            )
+            cur.execute("DELETE FROM posts WHERE rowid = ?", (post,))
+
+    # --------- Context-manager sugar -----------------------------
+
+    def __enter__(self) -> "SearchStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+# --------- helpers --------------------------------------------------------- #
+def ingest_files(
+    db_path: str | Path, files: Iterable[str | Path], *, optimize: bool = False
+) -> IngestStats:
+    """
+    Ingest every existing file in ``files`` into the store at ``db_path``.
+
+    ``optimize`` also merges all FTS segments afterwards – that rewrites the
+    whole index, so it is opt-in; FTS5's automerge keeps incremental ingests
+    in shape on its own.
+    """
+    posts = comments = size = 0
+    t0 = time.perf_counter()
+    with SearchStore(db_path) as store:
+        for f in files:
+            if Path(f).exists():
+                s = store.ingest(f)
+                posts, comments, size = posts + s.posts, comments + s.comments, size + s.bytes
+        if optimize:
+            store.optimize()
+    logger.debug("Ingest took %.2fs", time.perf_counter() - t0)
+    return IngestStats(posts, comments, size)
+
+
+def _max_rowid(cur: sqlite3.Cursor, table: str) -> int:
+    row = cur.execute(f"SELECT seq FROM sqlite_sequence WHERE name = '{table}'").fetchone()
+    return row[0] if row else 0
+
+
+def _existing(cur: sqlite3.Cursor, trees: Dict[str, Any]) -> List[Tuple[int]]:
+    ids = list(trees)
+    found: List[Tuple[int]] = []
+    for i in range(0, len(ids), 500):  # stay under SQLite's host-parameter limit
+        chunk = ids[i:i + 500]
+        found.extend(cur.execute(
+            f"SELECT rowid FROM posts WHERE id IN ({','.join('?' * len(chunk))})", chunk
+        ))
+    return found
+
+
+def _comment_rows(table: CommentTable, post: int, base: int) -> Iterable[Tuple]:
+    for i in range(len(table)):
+        p = table.parent[i]
+        yield (
+            base + i, table.ids[i], post, None if p == NO_PARENT else base + p,
+            table.author_name(i), table.body(i), table.score[i], table.created_utc[i],
+            table.depth[i],
+        )
@@ -0,0 +1,143 @@
+# reddit_scraper/services/sinks.py
+"""
+Destinations for fetched records.
+
+A sink receives every record as soon as it is fetched (``write``) and must
+make everything written so far durable on ``flush`` – the ``GroupCommitter``
+flushes all sinks before it checkpoints a group, so a checkpointed ID is
+always safe in every sink.
+
+* ``NDJSONSink``   – the scraper's output file (plain or framed ``.gz`` /
+  ``.zst``) plus its offset index
+* ``CallbackSink`` – hand records to a function (in-process pipelines)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from reddit_scraper.core import metrics
+from reddit_scraper.core.framed import FRAME_RECORDS, FramedWriter, codec_for, repair_plain_tail
+from reddit_scraper.core.models import Record
+from reddit_scraper.services.offsets import Entry, OffsetIndex
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = 1 << 20  # 1 MiB userspace buffer
+
+
+class Sink:
+    """Base class: ``write`` each record, ``flush`` = durable, ``close`` once."""
+
+    def write(self, record: Record, extra: Optional[Dict[str, Any]] = None) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+class CallbackSink(Sink):
+    """Call ``fn(record, extra)`` for every record."""
+
+    def __init__(self, fn: Callable[[Record, Optional[Dict[str, Any]]], Any]) -> None:
+        self.fn = fn
+
+    def write(self, record: Record, extra: Optional[Dict[str, Any]] = None) -> None:
+        self.fn(record, extra)
+
+
+class NDJSONSink(Sink):
+    """
+    Append records to an NDJSON file, one JSON line each.
+
+    A ``.ndjson.gz`` / ``.ndjson.zst`` path writes compressed frames of up to
+    ``frame_records`` records instead; every ``flush`` closes the current
+    frame. Re-opening cuts off whatever a crash left half-written, and each
+    flush records where the new lines landed in ``<path>.offsets.sqlite``
+    (see ``services.offsets``) after the data fsync.
+    """
+
+    def __init__(self, path: str | Path, *, frame_records: int = FRAME_RECORDS) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._framed: Optional[FramedWriter] = None
+        if codec_for(self.path) is not None:
+            self._fp = self._framed = FramedWriter(self.path, frame_records=frame_records)
+        else:
+            repair_plain_tail(self.path)
+            self._fp = self.path.open("ab", buffering=BUFFER_SIZE)
+        self.index = OffsetIndex(self.path)
+        self.index.catch_up()  # records written before the index existed
+        self._pos = self.path.stat().st_size if self._framed is None else 0
+        self._frames_seen = len(self._framed.frames) if self._framed is not None else 0
+        # id, length, created_utc, fetched_at per unflushed record
+        self._rows: List[Tuple[str, int, Optional[int], Optional[int]]] = []
+        self._closed = False
+
+    def write(self, record: Record, extra: Optional[Dict[str, Any]] = None) -> None:
+        """Append one record; ``extra`` keys are added to the JSON line as-is."""
+        with metrics.timer("encode_seconds"):
+            line = record.to_json_bytes(extra) + b"\n"
+        self.write_line(line, record.id, record.created_utc, record.fetched_at)
+        metrics.incr("posts_written")
+
+    def write_line(
+        self, line: bytes, sid: str, created: Optional[int], fetched: Optional[int]
+    ) -> None:
+        """Append an already encoded record (``line`` ends with a newline)."""
+        self._fp.write(line)
+        metrics.incr("bytes_written", len(line))
+        self._rows.append((sid, len(line), created, fetched))
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        with metrics.timer("fsync_seconds"):  # compressed: incl. compressing the frame
+            if self._framed is not None:
+                self._framed.sync()
+            else:
+                self._fp.flush()
+                os.fsync(self._fp.fileno())
+        with metrics.timer("offset_index_seconds"):
+            self.index.add(*self._index_rows())
+        self._rows.clear()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.flush()
+        finally:
+            self._fp.close()
+            self.index.close()
+
+    # --------- Internals -----------------------------------------
+
+    def _index_rows(self) -> Tuple[List[Entry], int]:
+        """Index entries for the unflushed rows, plus the new covered offset."""
+        entries: List[Entry] = []
+        if self._framed is None:
+            for sid, length, created, fetched in self._rows:
+                entries.append(Entry(sid, None, None, self._pos, length, created, fetched))
+                self._pos += length
+            return entries, self._pos
+
+        frames = self._framed.frames
+        rows = iter(self._rows)
+        for frame in frames[self._frames_seen:]:
+            pos = 0
+            for _ in range(frame.records):
+                sid, length, created, fetched = next(rows)
+                entries.append(
+                    Entry(sid, frame.offset, frame.length, pos, length, created, fetched)
+                )
+                pos += length
+        self._frames_seen = len(frames)
+        return entries, frames[-1].end if frames else 0
@@ -1,19 +1,32 @@
 # reddit_scraper/services/txt_export.py
 """
-Convert an ND-JSON file (one submission per line) into **individual** TXT files.
+Convert an ND-JSON file (one submission per line) into **individual** TXT files,
+and optionally one merged TXT, in a single pass.
 
-Called programmatically by the CLI.
+Posts are rendered iteratively (no recursion, output assembled with one
+``join``) by a process pool in batches of lines. Workers write the per-post
+files; the parent streams the merged file in input order from the rendered
+text, so nothing is read back from disk.
+
+Called programmatically by the CLI and by ``scripts/output_to_text.py``.
 """
 
 from __future__ import annotations
 
-import json, re
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from textwrap import indent, wrap
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from reddit_scraper.core import jsonio, metrics
+from reddit_scraper.core.framed import iter_lines
+from reddit_scraper.services.pipeline import ordered_map
 
 LINE_WIDTH = 100
 INDENT = "    "
+BATCH_BYTES = 1 << 20  # input handed to a worker at a time
 
 
 def _sanitize(s: str) -> str:
@@ -24,37 +37,118 @@ def _wrap(t: str) -> str:
     return "\n".join(wrap(t, LINE_WIDTH)) if t else ""
 
 
-def _fmt(c: Dict[str, Any], depth: int = 0) -> str:
-    pad = INDENT * depth
-    header = f"[+{c['score']}] {c.get('author') or '[deleted]'}:"
-    body = _wrap(c["body"])
-    block = "\n".join([header, body] if body else [header])
-    out = indent(block, pad)
-    for r in c.get("replies", []):
-        out += "\n" + _fmt(r, depth + 1)
-    return out
+def post_filename(tree: Dict[str, Any]) -> str:
+    return f"{tree['id']}_{_sanitize(tree['title'])}.txt"
+
 
+def render_post(tree: Dict[str, Any]) -> str:
+    """One submission tree → conversation text."""
+    title = tree["title"]
+    parts: List[str] = [
+        f"{title}\n{'-'*len(title)}\n",
+        f"Author: {tree.get('author') or '[deleted]'} | "
+        f"Score: {tree['score']} | Flair: {tree.get('link_flair_text')}\n\n",
+    ]
+    body = _wrap(tree["selftext"])
+    if body:
+        parts.append(body + "\n\n")
+    parts.append("Comments\n--------\n")
 
-def ndjson_to_txt(ndjson_path: str | Path, out_dir: str | Path) -> None:
+    for top in tree["comments"]:
+        # a top-level comment and all its replies in pre-order, one block each
+        stack: List[Tuple[Dict[str, Any], int]] = [(top, 0)]
+        first = True
+        while stack:
+            c, depth = stack.pop()
+            if not first:
+                parts.append("\n")
+            first = False
+            header = f"[+{c['score']}] {c.get('author') or '[deleted]'}:"
+            text = _wrap(c["body"])
+            parts.append(indent(f"{header}\n{text}" if text else header, INDENT * depth))
+            stack.extend((r, depth + 1) for r in reversed(c.get("replies") or ()))
+        parts.append("\n")
+    return "".join(parts)
+
+
+@metrics.timed("export_txt_seconds")
+def ndjson_to_txt(
+    ndjson_path: str | Path,
+    out_dir: str | Path,
+    *,
+    merged: Optional[str | Path] = None,
+    workers: Optional[int] = None,
+) -> int:
+    """
+    Write one TXT per post into ``out_dir`` (and all of them into ``merged``).
+    Returns the number of posts rendered.
+    """
     ndjson_path = Path(ndjson_path)
     out_dir = Path(out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    want_text = merged is not None
+
+    batches = ((str(out_dir), lines, want_text) for lines in _batches(ndjson_path))
+    merged_fp: Optional[TextIO] = None
+    if merged is not None:
+        Path(merged).parent.mkdir(parents=True, exist_ok=True)
+        merged_fp = Path(merged).open("w", encoding="utf-8")
+
+    count = 0
+    try:
+        if workers == 1:
+            results: Iterable[List[Tuple[str, Optional[str]]]] = map(_render_batch, batches)
+            count = _consume(results, merged_fp)
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                count = _consume(ordered_map(_render_batch, batches, pool, depth=workers * 2),
+                                 merged_fp)
+    finally:
+        if merged_fp is not None:
+            merged_fp.close()
+    metrics.incr("export_txt_posts", count)
+    return count
+
+
+# --------- internals ------------------------------------------------------- #
+def _batches(path: Path) -> Iterator[List[bytes]]:
+    batch: List[bytes] = []
+    size = 0
+    for line in iter_lines(path):
+        batch.append(line)
+        size += len(line)
+        if size >= BATCH_BYTES:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def _render_batch(job: Tuple[str, List[bytes], bool]) -> List[Tuple[str, Optional[str]]]:
+    """Worker: render + write each post; hand the text back only if it is merged."""
+    out_dir, lines, want_text = job
+    done = []
+    for line in lines:
+        tree = jsonio.loads(line)
+        name = post_filename(tree)
+        text = render_post(tree)
+        with open(os.path.join(out_dir, name), "w", encoding="utf-8") as out:
+            out.write(text)
+        done.append((name, text if want_text else None))
+    return done
+
 
-    with ndjson_path.open(encoding="utf-8") as fp:
-        for line in fp:
-            tree = json.loads(line)
-            fname = f"{tree['id']}_{_sanitize(tree['title'])}.txt"
-            path = out_dir / fname
-            with path.open("w", encoding="utf-8") as out:
-                out.write(f"{tree['title']}\n{'-'*len(tree['title'])}\n")
-                meta = (
-                    f"Author: {tree.get('author') or '[deleted]'} | "
-                    f"Score: {tree['score']} | Flair: {tree.get('link_flair_text')}\n\n"
-                )
-                out.write(meta)
-                body = _wrap(tree["selftext"])
-                if body:
-                    out.write(body + "\n\n")
-                out.write("Comments\n--------\n")
-                for c in tree["comments"]:
-                    out.write(_fmt(c) + "\n")
+def _consume(
+    results: Iterable[List[Tuple[str, Optional[str]]]], merged_fp: Optional[TextIO]
+) -> int:
+    count = 0
+    for batch in results:
+        count += len(batch)
+        if merged_fp is None:
+            continue
+        for name, text in batch:
+            merged_fp.write(f"// Content from: {name}\n\n")
+            merged_fp.write(text)
+            merged_fp.write("\n\n")
+    return count
@@ -0,0 +1,264 @@
+# reddit_scraper/services/workqueue.py
+"""
+Cooperative scraping: several worker processes, one progress DB.
+
+The frontier table of the progress DB doubles as the work queue (see
+``ProgressTracker.claim``). A worker
+
+* takes the ``ENUM_LEASE`` to walk the listing – only one worker enumerates,
+  the others start fetching as soon as pages land in the frontier
+* claims batches of IDs with a time-limited lease, kept alive by a
+  ``LeaseKeeper`` heartbeat thread, and retakes leases whose worker died
+* writes to its own part file next to the output (``part_path``), locked
+  while the worker lives (``hold_part``), and folds it into the output when
+  it is done (``fold_part``) – along with parts whose worker died
+  (``fold_orphans``, which also checkpoints what it folds)
+
+A worker stuck longer than the lease TTL may see its IDs fetched a second
+time elsewhere; both copies are written and readers keep the newest.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - optional dependency
+    fcntl = None
+
+from reddit_scraper.core import jsonio, metrics
+from reddit_scraper.core.framed import (
+    FramedWriter,
+    codec_for,
+    index_path,
+    iter_blocks,
+    repair_plain_tail,
+)
+from reddit_scraper.services.offsets import OffsetIndex, offsets_path
+from reddit_scraper.services.progress import ProgressTracker
+
+logger = logging.getLogger(__name__)
+
+ENUM_LEASE = "~enumerate"  # never a Reddit ID (base-36)
+
+
+def part_path(output: str | Path, worker: str) -> Path:
+    """``output_x.ndjson.zst`` → ``output_x.part-<worker>.ndjson.zst``."""
+    output = Path(output)
+    stem, dot, suffix = output.name.partition(".ndjson")
+    return output.with_name(f"{stem}.part-{worker}{dot}{suffix}")
+
+
+def list_parts(output: str | Path) -> List[Path]:
+    output = Path(output)
+    stem, dot, suffix = output.name.partition(".ndjson")
+    pattern = re.compile(re.escape(f"{stem}.part-") + r"[^/]+" + re.escape(f"{dot}{suffix}"))
+    return sorted(p for p in output.parent.glob(f"{stem}.part-*") if pattern.fullmatch(p.name))
+
+
+def iter_claimed(
+    progress: ProgressTracker,
+    worker: str,
+    *,
+    batch: int,
+    ttl: float,
+    stop: threading.Event,
+    skip_failed: bool = True,
+    min_score: Optional[int] = None,
+    flairs: Optional[List[str]] = None,
+    idle: Optional[Callable[[], None]] = None,
+) -> Iterator[Dict]:
+    """
+    Frontier rows leased to ``worker``, ``batch`` at a time.
+
+    Ends once nothing is left to claim, no worker is enumerating and every
+    unfetched row is leased to this worker itself; while other workers still
+    hold leases it polls, so it can take over if one of them dies. ``idle``
+    runs before each poll – the caller's chance to checkpoint what it has,
+    since finished-but-uncheckpointed posts keep their leases.
+    """
+    filters = dict(skip_failed=skip_failed, min_score=min_score, flairs=flairs)
+    poll = min(1.0, ttl / 4)
+    while not stop.is_set():
+        items, reclaimed = progress.claim(worker, batch, ttl, **filters)
+        if reclaimed:
+            logger.warning("Took over %d post(s) from expired leases", reclaimed)
+            metrics.incr("leases_reclaimed", reclaimed)
+        if items:
+            metrics.incr("leases_claimed", len(items))
+            for item in items:
+                if stop.is_set():
+                    return
+                yield item
+            continue
+        if not progress.lease_held(ENUM_LEASE) and not progress.outstanding(worker, **filters):
+            return
+        if idle is not None:
+            idle()
+        stop.wait(poll)
+
+
+class LeaseKeeper:
+    """Background heartbeat: renews every lease of ``worker`` each ``ttl / 3`` seconds."""
+
+    def __init__(self, progress: ProgressTracker, worker: str, ttl: float) -> None:
+        self.progress = progress
+        self.worker = worker
+        self.ttl = ttl
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="lease-keeper", daemon=True)
+
+    # --------- Public API ----------------------------------------
+
+    def start(self) -> "LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    # --------- Internals -----------------------------------------
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                self.progress.heartbeat(self.worker, self.ttl)
+            except Exception as exc:  # a missed beat is retried; the TTL has slack
+                logger.warning("Lease heartbeat failed: %s", exc)
+
+    # --------- Context-manager sugar -----------------------------
+
+    def __enter__(self) -> "LeaseKeeper":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+@contextlib.contextmanager
+def file_lock(path: str | Path) -> Iterator[None]:
+    """Exclusive ``flock`` on ``path`` (created if missing), across processes."""
+    if fcntl is None:
+        raise RuntimeError("worker mode needs fcntl (POSIX systems only)")
+    with open(path, "a+b") as fp:
+        fcntl.flock(fp.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fp.fileno(), fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def hold_part(part: str | Path) -> Iterator[None]:
+    """Keep an exclusive ``flock`` on ``part`` (creating it) so nobody folds it meanwhile."""
+    if fcntl is None:
+        raise RuntimeError("worker mode needs fcntl (POSIX systems only)")
+    part = Path(part)
+    while True:
+        fp = open(part, "a+b")
+        fcntl.flock(fp.fileno(), fcntl.LOCK_EX)
+        try:
+            if os.fstat(fp.fileno()).st_ino == part.stat().st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        fp.close()  # folded and deleted while we waited for the lock
+    try:
+        yield
+    finally:
+        fp.close()
+
+
+def fold_orphans(output: str | Path, progress: Optional[ProgressTracker] = None) -> int:
+    """
+    Fold every part of ``output`` that no live worker holds; returns the records moved.
+
+    With ``progress`` the folded records are checkpointed as well: a worker
+    killed between a group's fsync and its checkpoint left them durable but
+    unmarked, and they would otherwise be fetched – and written – again.
+    """
+    if fcntl is None:
+        return 0  # no worker mode, so no parts
+    moved = 0
+    for part in list_parts(output):
+        try:
+            fp = open(part, "rb")
+        except FileNotFoundError:
+            continue
+        with fp:
+            try:
+                fcntl.flock(fp.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue  # its worker is still running
+            if part.exists():
+                logger.warning("Folding %s left behind by a stopped worker", part.name)
+                moved += fold_part(part, output, progress=progress)
+    return moved
+
+
+def fold_part(
+    part: str | Path, output: str | Path, *, progress: Optional[ProgressTracker] = None
+) -> int:
+    """
+    Append ``part``'s records to ``output``, update its offset index and
+    delete the part. Returns the records moved.
+
+    Runs under ``<output>.lock``, so workers finishing together take turns.
+    A crash mid-fold leaves the part in place; the next fold of the same
+    worker appends it again, and the duplicates are harmless.
+    """
+    part, output = Path(part), Path(output)
+    if not part.exists():
+        return 0
+    moved = 0
+    rows: List[Tuple[str, Optional[int], Optional[int], Optional[int]]] = []
+    with file_lock(output.with_name(output.name + ".lock")):
+        if codec_for(output) is not None:
+            with FramedWriter(output) as out:
+                for lines, _ in iter_blocks(part):
+                    for line in lines:
+                        out.write(line)
+                    moved += len(lines)
+                    out.end_frame()
+                    if progress is not None:
+                        rows += _checkpoint_rows(lines)
+        else:
+            repair_plain_tail(output)
+            with output.open("ab") as out:
+                for lines, _ in iter_blocks(part):
+                    out.writelines(lines)
+                    moved += len(lines)
+                    if progress is not None:
+                        rows += _checkpoint_rows(lines)
+                out.flush()
+                os.fsync(out.fileno())
+        with OffsetIndex(output) as index:
+            index.catch_up()
+        if rows:  # after the data is durable, like a normal group commit
+            progress.mark_batch_fetched(rows)
+        for leftover in (part, index_path(part), *_sqlite_files(offsets_path(part))):
+            leftover.unlink(missing_ok=True)
+    logger.info("Folded %d record(s) from %s into %s", moved, part.name, output.name)
+    return moved
+
+
+# --------- helpers --------------------------------------------------------- #
+def _checkpoint_rows(
+    lines: List[bytes],
+) -> List[Tuple[str, Optional[int], Optional[int], Optional[int]]]:
+    """``mark_batch_fetched`` rows for record lines."""
+    recs = [jsonio.loads(line) for line in lines]
+    return [(r["id"], r.get("num_comments"), r.get("score"), r.get("fetched_at")) for r in recs]
+
+
+def _sqlite_files(db: Path) -> List[Path]:
+    return [db, db.with_name(db.name + "-wal"), db.with_name(db.name + "-shm")]
@@ -11,13 +11,23 @@ python scripts/merge_contents.py src --ext .py
 
 # merge .txt files under conversations/ → ../outputs/merged/conversations.txt
 python scripts/merge_contents.py conversations --ext .txt
+
+# same, split into ~500 MB shards + conversations.manifest.json
+python scripts/merge_contents.py conversations --ext .txt --shard-mb 500
+
+The work is done by ``reddit_scraper.services.merge``.
 """
 
 from __future__ import annotations
 
 import argparse
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # works without pip install
+
+from reddit_scraper.services.merge import merge  # noqa: E402
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -39,40 +49,37 @@ def parse_args() -> argparse.Namespace:
         help="Destination directory for the merged file "
         "(default: ../outputs/merged/ relative to project root).",
     )
+    parser.add_argument(
+        "--shard-mb",
+        type=float,
+        help="Split the output into shards of at most this many MB "
+        "(writes a manifest of byte offsets per source file).",
+    )
+    parser.add_argument(
+        "--manifest",
+        action="store_true",
+        help="Write <name>.manifest.json even without sharding.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Threads used to list directories (default: 8).",
+    )
     return parser.parse_args()
 
 
-# --------------------------------------------------------------------------- #
-#   main                                                                      #
-# --------------------------------------------------------------------------- #
-def merge(directory: str | Path, ext: str, out_dir: str | Path) -> None:
-    root = Path(directory).expanduser().resolve()
-    if not root.exists():
-        raise FileNotFoundError(f"{root} does not exist")
-
-    ext = ext if ext.startswith(".") else f".{ext}"  # normalise ".py" vs "py"
-    out_dir = Path(out_dir).expanduser().resolve()
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    # ---------- output file name (prevent double-suffix) ------------------ #
-    top_name = root.name
-    if top_name.endswith(ext):
-        top_name = top_name[: -len(ext)]  # strip ext if present
-    out_file = out_dir / f"{top_name}.txt"
-
-    count = 0
-    with out_file.open("w", encoding="utf-8") as merged:
-        for path in sorted(root.rglob(f"*{ext}")):
-            if path.name.endswith(".g.py"):   # legacy exclusion
-                continue
-            count += 1
-            merged.write(f"// Content from: {path.relative_to(root)}\n\n")
-            merged.write(path.read_text(encoding="utf-8"))
-            merged.write("\n\n")
-
-    print(f"✓ merged {count} file(s) → {out_file}")
-
-
 if __name__ == "__main__":
     args = parse_args()
-    merge(args.directory, args.ext, args.out_dir)
+    result = merge(
+        args.directory,
+        args.ext,
+        args.out_dir,
+        shard_bytes=int(args.shard_mb * 1_000_000) if args.shard_mb else None,
+        manifest=args.manifest,
+        workers=args.workers,
+    )
+    target = result.outputs[0] if len(result.outputs) == 1 else f"{len(result.outputs)} shards"
+    print(f"✓ merged {result.files} file(s) → {target}")
+    if result.manifest:
+        print(f"  manifest: {result.manifest}")
@@ -0,0 +1,55 @@
+# tests/conftest.py
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fake_reddit import FakeReddit, add_data_args, build_server  # noqa: E402
+
+
+@pytest.fixture
+def fake_reddit() -> Iterator[Callable[..., FakeReddit]]:
+    """Start ``benchmarks/fake_reddit.py`` servers: ``fake_reddit("--posts", "60", …)``."""
+    servers: List[FakeReddit] = []
+
+    def start(*argv: str) -> FakeReddit:
+        p = argparse.ArgumentParser()
+        add_data_args(p)
+        server = build_server(p.parse_args(list(argv))).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def cli_env(tmp_path, monkeypatch) -> Callable[[FakeReddit], Dict[str, str]]:
+    """Environment for ``python -m reddit_scraper.cli`` against a fake server."""
+    outputs = tmp_path / "outputs"
+    monkeypatch.setenv("REDDIT_SCRAPER_OUTPUTS", str(outputs))  # for cli.build_paths here
+
+    def make(server: FakeReddit) -> Dict[str, str]:
+        return {
+            **os.environ,
+            "REDDIT_OAUTH_URL": server.url,
+            "REDDIT_URL": server.url,
+            "REDDIT_CLIENT_ID": "test",
+            "REDDIT_CLIENT_SECRET": "test",
+            "REDDIT_USER_AGENT": "reddit-scraper-tests",
+            "REDDIT_SCRAPER_OUTPUTS": str(outputs),
+            "PYTHONPATH": str(ROOT),
+        }
+
+    return make
+
@@ -0,0 +1,31 @@
+# tests/test_cli.py
+"""Command-line parsing."""
+
+from __future__ import annotations
+
+import pytest
+
+from reddit_scraper.cli import parse_args
+
+START, END = "2025-06-15", "2025-06-20"
+
+
+@pytest.mark.parametrize("sub", ["learnpython", "jobs", "stats", "search"])
+def test_legacy_form_scrapes_any_subreddit(sub):
+    args = parse_args([sub, START, END])
+
+    assert (args.command, args.subreddit, args.start_date, args.end_date) == \
+        ("scrape", sub, START, END)
+
+
+def test_legacy_form_after_options():
+    args = parse_args(["--log-level", "DEBUG", "learnpython", START, END, "--workers", "2"])
+
+    assert (args.command, args.subreddit, args.log_level, args.workers) == \
+        ("scrape", "learnpython", "DEBUG", 2)
+
+
+def test_subcommands_are_not_rewritten():
+    assert parse_args(["jobs", "jobs.json"]).command == "jobs"
+    assert parse_args(["stats", "learnpython", START, END]).command == "stats"
+    assert parse_args(["scrape", "search", START, END]).subreddit == "search"
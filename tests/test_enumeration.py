@@ -0,0 +1,136 @@
+# tests/test_enumeration.py
+from __future__ import annotations
+
+import random
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from reddit_scraper.infra.reddit import RedditClient
+from reddit_scraper.services.enumeration import ShardedEnumerator
+from reddit_scraper.services.scraper import Scraper
+
+START, END = "2025-06-01", "2025-06-07"
+T0 = RedditClient._to_ts(START)
+T1 = RedditClient._to_ts(END) + 86_400
+
+
+class FakeSource:
+    """
+    Search-like window source over synthetic posts: at most ``max_results``
+    newest posts per window. ``inclusive`` also returns posts exactly on
+    ``end_ts``, so neighbouring windows overlap the way sloppy APIs do.
+    """
+
+    def __init__(
+        self,
+        times: List[int],
+        *,
+        max_results: Optional[int] = 100,
+        inclusive: bool = False,
+        fail_after: Optional[int] = None,
+    ) -> None:
+        self.max_results = max_results
+        self.inclusive = inclusive
+        self.fail_after = fail_after
+        self.posts = [
+            {"id": f"p{k}", "created_utc": t, "score": 1, "link_flair_text": None}
+            for k, t in enumerate(times)
+        ]
+        self.calls: List[Tuple[int, int, int]] = []  # start, end, items returned
+        self._lock = threading.Lock()
+
+    def fetch_window(self, start_ts: int, end_ts: int) -> List[Dict]:
+        with self._lock:
+            if self.fail_after is not None and len(self.calls) >= self.fail_after:
+                raise ConnectionError("fake source went away")
+            hits = [
+                p for p in self.posts
+                if start_ts <= p["created_utc"] < end_ts
+                or (self.inclusive and p["created_utc"] == end_ts)
+            ]
+            hits.sort(key=lambda p: p["created_utc"], reverse=True)
+            if self.max_results is not None:
+                hits = hits[: self.max_results]
+            self.calls.append((start_ts, end_ts, len(hits)))
+            return hits
+
+
+def skewed_times(n: int, seed: int = 7) -> List[int]:
+    """Most posts in a burst near the end of the range, a thin tail before it."""
+    rng = random.Random(seed)
+    burst = T1 - 6 * 3_600
+    times = [min(T1 - 1, burst + int(rng.expovariate(1 / 1_800))) for _ in range(n * 4 // 5)]
+    times += [rng.randrange(T0, T1) for _ in range(n - len(times))]
+    return times
+
+
+def test_saturated_windows_are_split_until_complete():
+    source = FakeSource(skewed_times(3_000), max_results=100)
+    engine = ShardedEnumerator(source, workers=4, initial_windows=8, min_window=1)
+
+    windows = list(engine.iter_windows(T0, T1))
+    ids = [item["id"] for w in windows for item in w.items]
+
+    assert sorted(ids) == sorted(p["id"] for p in source.posts)
+    assert any(n >= 100 for _, _, n in source.calls)  # the burst did saturate
+    # leaf windows tile the range newest → oldest, each under the cap
+    assert [(w.start, w.end) for w in windows] == sorted(
+        ((w.start, w.end) for w in windows), reverse=True
+    )
+    assert windows[0].end == T1 and windows[-1].start == T0
+    assert all(a.start == b.end for a, b in zip(windows, windows[1:]))
+    leaf_counts = {(s, e): n for s, e, n in source.calls}
+    assert all(leaf_counts[(w.start, w.end)] < 100 for w in windows)
+
+
+def test_overlapping_windows_are_merged_without_duplicates():
+    times = skewed_times(1_000)
+    edges = [T0 + (T1 - T0) * k // 8 for k in range(1, 8)]
+    times += edges * 3  # several posts exactly on the initial window boundaries
+    source = FakeSource(times, max_results=None, inclusive=True)
+    engine = ShardedEnumerator(source, workers=4, initial_windows=8)
+
+    items = list(engine.iter_items(T0, T1))
+    ids = [item["id"] for item in items]
+
+    assert len(ids) == len(set(ids))
+    assert set(ids) == {p["id"] for p in source.posts if p["created_utc"] < T1}
+
+
+def test_enumeration_resumes_from_persisted_cursor(tmp_path):
+    times = skewed_times(2_000)
+
+    def scraper(source: FakeSource) -> Scraper:
+        s = Scraper(
+            "fakesub", START, END,
+            output=tmp_path / "out.ndjson",
+            progress_db=tmp_path / "progress.sqlite",
+            enumerate_via="search",
+            enum_workers=2,
+            clients=lambda: None,  # never called: the fake source answers everything
+            stop=threading.Event(),
+        )
+        s._window_source = lambda: source
+        return s
+
+    first = scraper(FakeSource(times, max_results=100, fail_after=12))
+    with pytest.raises(ConnectionError):
+        first.enumerate_frontier()
+    cursor = first.progress.listing_cursor()
+    saved = first.progress.counts()["frontier"]
+    first.progress.close()
+    assert cursor is not None and cursor.startswith("ts:")
+    assert 0 < saved < len(times)
+
+    source = FakeSource(times, max_results=100)
+    second = scraper(source)
+    second.enumerate_frontier()
+    try:
+        assert all(end <= int(cursor[3:]) for _, end, _ in source.calls)
+        assert second.progress.counts()["frontier"] == len(times)
+        assert second.progress.listing_cursor() is None
+        assert second.progress.enumeration_finished_at() is not None
+    finally:
+        second.progress.close()
@@ -0,0 +1,33 @@
+# tests/test_flat.py
+"""CommentTable round trips."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from reddit_scraper.core.flat import CommentTable
+
+
+def comment(cid: str, parent: str, depth: int, replies: List[Dict[str, Any]],
+            author: Optional[str] = "a") -> Dict[str, Any]:
+    return {"id": cid, "parent_id": parent, "link_id": "t3_p", "author": author,
+            "body": f"body of {cid} – ünïcode", "created_utc": 1700000000, "score": depth,
+            "depth": depth, "replies": replies}
+
+
+NESTED = [
+    comment("a", "t3_p", 0, [
+        comment("b", "t1_a", 1, [comment("c", "t1_b", 2, [], author=None)]),
+        comment("d", "t1_a", 1, []),
+    ]),
+    comment("e", "t1_gone", 3, []),  # orphan: its parent is not in the thread
+]
+
+
+def test_nested_round_trip():
+    table = CommentTable.from_nested(NESTED)
+
+    assert table.ids == ["a", "b", "c", "d", "e"]
+    assert [table.ids[i] for i in table.bfs()] == ["a", "e", "b", "d", "c"]
+    assert table.to_nested() == NESTED
+    assert CommentTable.from_bytes(table.to_bytes()).to_nested() == NESTED
@@ -0,0 +1,48 @@
+# tests/test_parquet_export.py
+"""Parquet datasets are replaced, not added to, on every export."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import List
+
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from reddit_scraper.services.parquet_export import ndjson_to_parquet  # noqa: E402
+
+JAN, FEB = 1735732800, 1738411200  # 2025-01-01, 2025-02-01 12:00 UTC
+
+
+def write_posts(path: Path, created: List[int]) -> None:
+    path.write_text("".join(
+        json.dumps({"id": f"p{i}", "title": "t", "created_utc": ts, "comments": [
+            {"id": f"c{i}", "parent_id": f"t3_p{i}", "link_id": f"t3_p{i}", "depth": 0,
+             "body": "b", "author": "a", "created_utc": ts, "score": 1, "replies": []},
+        ]}) + "\n"
+        for i, ts in enumerate(created)
+    ))
+
+
+def files(root: Path) -> List[str]:
+    return sorted(str(p.relative_to(root)) for p in root.rglob("*.parquet"))
+
+
+def test_rerun_leaves_no_stale_partitions(tmp_path):
+    src, subs, coms = tmp_path / "in.ndjson", tmp_path / "subs", tmp_path / "coms"
+
+    write_posts(src, [JAN, FEB])
+    ndjson_to_parquet(src, subs, coms, partition_by_month=True)
+    assert files(subs) == ["month=2025-01/part-0.parquet", "month=2025-02/part-0.parquet"]
+
+    write_posts(src, [FEB])  # shorter range
+    assert ndjson_to_parquet(src, subs, coms, partition_by_month=True) == \
+        {"submissions": 1, "comments": 1}
+    assert files(subs) == files(coms) == ["month=2025-02/part-0.parquet"]
+
+    ndjson_to_parquet(src, subs, coms)  # partitioning toggled off
+    assert files(subs) == files(coms) == ["part-0.parquet"]
+    assert pq.read_table(subs).num_rows == pq.read_table(coms).num_rows == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["coms", "in.ndjson", "subs"]
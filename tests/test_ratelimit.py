@@ -0,0 +1,17 @@
+# tests/test_ratelimit.py
+"""Rate limiter counters."""
+
+from __future__ import annotations
+
+from reddit_scraper.infra.ratelimit import RateLimiter
+
+
+def test_one_429_counts_once():
+    limiter = RateLimiter(rate=1000.0)
+    limiter.penalize(0.05)  # what LimitedSession does on an HTTP 429
+    limiter.acquire()
+    limiter.acquire()
+
+    st = limiter.stats.snapshot()
+    assert (st["requests"], st["rate_limited"], st["throttled"]) == (2, 1, 1)
+    assert st["throttle_seconds"] >= 0.04
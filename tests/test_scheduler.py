@@ -0,0 +1,45 @@
+# tests/test_scheduler.py
+"""``reddit-scraper jobs`` against the fake server."""
+
+from __future__ import annotations
+
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from reddit_scraper.cli import build_paths
+
+ROOT = Path(__file__).resolve().parent.parent
+SUB = "benchsub"  # fake_reddit's default
+JOBS = [("2025-06-01", "2025-06-03", 1), ("2025-06-04", "2025-06-07", 3)]
+
+
+def test_jobs_report_progress_at_default_log_level(fake_reddit, cli_env, tmp_path):
+    env = cli_env(fake_reddit("--posts", "40", "--comments", "3", "--latency-ms", "20"))
+    job_file = tmp_path / "jobs.json"
+    job_file.write_text(json.dumps(
+        [{"subreddit": SUB, "start": s, "end": e, "weight": w} for s, e, w in JOBS]
+    ))
+
+    proc = subprocess.run(
+        [sys.executable, "-m", "reddit_scraper.cli", "jobs", str(job_file),
+         "--report-interval", "0.2"],
+        env=env, cwd=ROOT, capture_output=True, text=True, timeout=180,
+    )
+
+    assert proc.returncode == 0, proc.stderr
+    total = 0
+    for start, end, _ in JOBS:
+        name = build_paths(SUB, start, end)["tag"]
+        # periodic progress / ETA lines, logged at the default level
+        assert re.search(rf"{name}\s+\w+\s+\d+/\d+\s+failed \d+\s+\S+ posts/s\s+ETA \S+",
+                         proc.stderr), proc.stderr
+        # final summary on stdout
+        done = re.search(rf"^{name}\s+done\s+(\d+) saved\s+0 failed$", proc.stdout, re.M)
+        assert done, proc.stdout
+        lines = build_paths(SUB, start, end)["ndjson"].read_text().splitlines()
+        assert len(lines) == int(done.group(1))
+        total += len(lines)
+    assert total == 40
@@ -0,0 +1,27 @@
+# tests/test_search.py
+"""Search store against a database another process is writing to."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+
+from reddit_scraper.services.search import SearchStore
+
+
+def test_search_does_not_wait_for_a_writer(tmp_path):
+    db, src = tmp_path / "search.sqlite", tmp_path / "in.ndjson"
+    src.write_text(json.dumps({
+        "id": "p1", "title": "billing bug", "selftext": "", "score": 3, "created_utc": 1,
+        "comments": [],
+    }) + "\n")
+    SearchStore(db).ingest(src)
+
+    writer = sqlite3.connect(db)
+    writer.execute("BEGIN IMMEDIATE")  # an ingest holding the write lock
+    try:
+        store = SearchStore(db)
+        store.conn.execute("PRAGMA busy_timeout = 0")
+        assert [h.post_id for h in store.search("billing")] == ["p1"]
+    finally:
+        writer.rollback()
@@ -0,0 +1,78 @@
+# tests/test_startup.py
+"""
+CLI startup budget (see also ``benchmarks/bench_startup.py``).
+
+``REDDIT_SCRAPER_STARTUP_BUDGET_MS`` overrides the budget on slow machines.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_MS = float(os.getenv("REDDIT_SCRAPER_STARTUP_BUDGET_MS") or 100)
+HEAVY = (
+    "praw", "prawcore", "asyncpraw", "tqdm", "pyarrow", "pandas", "dotenv",
+    "requests", "httpx", "pydantic", "zstandard", "orjson", "sqlite3",
+)
+
+
+@pytest.fixture
+def env(tmp_path) -> Dict[str, str]:
+    return {
+        **os.environ,
+        "REDDIT_SCRAPER_OUTPUTS": str(tmp_path / "outputs"),
+        "PYTHONPATH": str(ROOT),
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+
+
+def _python(args: List[str], env: Dict[str, str], cwd: Path) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], env=env, cwd=cwd, check=True,
+                          capture_output=True, text=True)
+
+
+def _median_ms(args: List[str], env: Dict[str, str], cwd: Path, runs: int = 5) -> float:
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        _python(args, env, cwd)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def test_import_is_light_and_has_no_side_effects(env, tmp_path):
+    work = tmp_path / "cwd"
+    work.mkdir()
+    probe = (
+        "import sys, reddit_scraper.cli; "
+        f"print(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    proc = _python(["-X", "importtime", "-c", probe], env, work)
+
+    assert proc.stdout.split() == []  # no heavy backend in sys.modules
+    cumulative = {
+        m.group(2): int(m.group(1))
+        for m in re.finditer(r"import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)", proc.stderr)
+    }
+    assert cumulative["reddit_scraper.cli"] / 1000 < BUDGET_MS
+    assert not (tmp_path / "outputs").exists()
+    assert list(work.iterdir()) == []
+
+
+@pytest.mark.parametrize("argv", [["--help"], ["export", "--help"]])
+def test_help_within_budget(env, tmp_path, argv):
+    bare = _median_ms(["-c", "pass"], env, tmp_path)
+    took = _median_ms(["-m", "reddit_scraper.cli", *argv], env, tmp_path)
+
+    assert took - bare < BUDGET_MS, f"{' '.join(argv)}: {took - bare:.0f} ms over bare python"
+    assert not (tmp_path / "outputs").exists()
@@ -0,0 +1,82 @@
+# tests/test_workers.py
+"""Cooperating ``--worker-id`` processes on one progress DB, against the fake server."""
+
+from __future__ import annotations
+
+import json
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from reddit_scraper.cli import build_paths
+from reddit_scraper.services.workqueue import list_parts, part_path
+
+ROOT = Path(__file__).resolve().parent.parent
+SUB, START, END = "benchsub", "2025-06-01", "2025-06-07"  # fake_reddit's defaults
+POSTS = 60
+
+
+def scrape(worker: str, env: Dict[str, str], *extra: str) -> subprocess.Popen:
+    argv = [sys.executable, "-m", "reddit_scraper.cli", "scrape", SUB, START, END,
+            "--worker-id", worker, "--group-size", "5", "--lease-ttl", "3", *extra]
+    return subprocess.Popen(argv, env=env, cwd=ROOT, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True)
+
+
+def output_ids(path: Path) -> List[str]:
+    return [json.loads(line)["id"] for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def leases_of(db: Path, worker: str) -> int:
+    with sqlite3.connect(db, timeout=30) as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM leases WHERE worker = ? AND id NOT LIKE '~%'", (worker,)
+        ).fetchone()[0]
+
+
+def frontier_size(db: Path) -> int:
+    with sqlite3.connect(db, timeout=30) as conn:
+        return conn.execute("SELECT COUNT(*) FROM frontier").fetchone()[0]
+
+
+def test_workers_split_the_frontier(fake_reddit, cli_env):
+    env = cli_env(fake_reddit("--posts", str(POSTS), "--comments", "5", "--latency-ms", "5"))
+    paths = build_paths(SUB, START, END)
+
+    procs = [scrape(f"w{i}", env) for i in range(3)]
+    errors = [p.communicate(timeout=180)[1] for p in procs]
+
+    assert [p.returncode for p in procs] == [0, 0, 0], errors
+    ids = output_ids(paths["ndjson"])
+    assert len(ids) == len(set(ids)) == POSTS == frontier_size(paths["progress"])
+    assert list_parts(paths["ndjson"]) == []
+
+
+def test_killed_worker_is_taken_over(fake_reddit, cli_env):
+    env = cli_env(fake_reddit("--posts", str(POSTS), "--comments", "5", "--latency-ms", "30"))
+    paths = build_paths(SUB, START, END)
+    part = part_path(paths["ndjson"], "A")
+
+    a = scrape("A", env, "--lease-size", "20")
+    deadline = time.monotonic() + 60
+    while not (part.exists() and part.stat().st_size):  # first group checkpointed
+        assert a.poll() is None and time.monotonic() < deadline, "worker A never wrote"
+        time.sleep(0.05)
+    a.send_signal(signal.SIGKILL)
+    a.communicate()
+    assert leases_of(paths["progress"], "A") > 0  # died holding leased work
+
+    b = scrape("B", env)
+    _, err = b.communicate(timeout=180)
+
+    assert b.returncode == 0, err
+    assert "Took over" in err  # A's expired leases were reclaimed
+    assert "left behind by a stopped worker" in err  # and its part file folded
+    ids = output_ids(paths["ndjson"])
+    assert len(ids) == len(set(ids)) == POSTS == frontier_size(paths["progress"])
+    assert list_parts(paths["ndjson"]) == []
+    assert leases_of(paths["progress"], "A") == 0